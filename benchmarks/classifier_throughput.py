@@ -0,0 +1,65 @@
+"""Classifier throughput microbenchmark: compiled single-pass engine vs. per-pattern scans.
+
+Usage: python benchmarks/classifier_throughput.py
+"""
+
+from __future__ import annotations
+
+import re
+import time
+
+from ai_decision_router.classifier import classify_task
+
+
+def legacy_classify_task(prompt: str) -> str:
+    """The previous implementation: pattern lists rebuilt and scanned one by one per call."""
+    text = prompt.lower().strip()
+    if not text:
+        return "chat/general"
+
+    code_patterns = [r"```", r"\bpython\b", r"\bjava\b", r"\bdebug\b", r"\bfunction\b"]
+    reasoning_patterns = [r"\bwhy\b", r"\bprove\b", r"\bstep by step\b", r"\blogic\b"]
+    data_patterns = [r"\bcsv\b", r"\btable\b", r"\bquery\b", r"\bsql\b", r"\bdata\b"]
+    writing_patterns = [r"\bblog\b", r"\bessay\b", r"\brewrite\b", r"\btone\b", r"\bsummary\b"]
+
+    if any(re.search(p, text) for p in code_patterns):
+        return "code"
+    if any(re.search(p, text) for p in data_patterns):
+        return "data"
+    if any(re.search(p, text) for p in reasoning_patterns):
+        return "reasoning"
+    if any(re.search(p, text) for p in writing_patterns):
+        return "writing"
+    return "chat/general"
+
+
+def _prompt(size: int) -> str:
+    # Worst case for both engines: no keyword matches, so the whole text is scanned.
+    filler = "lorem ipsum dolor sit amet consectetur adipiscing elit 12,34,56\n"
+    return (filler * (size // len(filler) + 1))[:size]
+
+
+def _throughput(fn, prompt: str, min_seconds: float = 0.5) -> float:
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_seconds:
+        fn(prompt)
+        calls += 1
+    return calls / elapsed
+
+
+def main() -> None:
+    print(f"{'size':>8} {'legacy/s':>12} {'compiled/s':>12} {'MB/s':>8} {'speedup':>8}")
+    for size in (1_000, 10_000, 100_000):
+        prompt = _prompt(size)
+        assert legacy_classify_task(prompt) == classify_task(prompt)
+        legacy = _throughput(legacy_classify_task, prompt)
+        compiled = _throughput(classify_task, prompt)
+        print(
+            f"{size:>8} {legacy:>12.0f} {compiled:>12.0f} "
+            f"{compiled * size / 1e6:>8.1f} {compiled / legacy:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Cold start vs. a resident router: CLI import time, one-shot `router explain` and
+`router run` processes, and per-request latency against `router serve` over keep-alive.
+
+Usage: python benchmarks/cold_start.py [--runs 5] [--requests 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import http.client
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from ai_decision_router.config import default_config
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.server import RouterServer
+
+PROMPT = "Write a python function that parses a CSV file"
+CLI = "from ai_decision_router.cli import app; app()"
+
+
+def _process_ms(args: list[str], runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def _serve(router: DecisionRouter) -> tuple[RouterServer, asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    server = RouterServer(router, port=0)
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server, loop
+
+
+def _request_ms(port: int, path: str, requests: int) -> float:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    times = []
+    for i in range(requests):
+        body = json.dumps({"prompt": f"{PROMPT} #{i % 50}"})
+        start = time.perf_counter()
+        conn.request("POST", path, body=body)
+        conn.getresponse().read()
+        times.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'measurement':<36} {'median_ms':>10}")
+    rows = [
+        ("import ai_decision_router.cli", ["-c", "import ai_decision_router.cli"]),
+        ("router --help", ["-c", CLI, "--help"]),
+        ("router explain (new process)", ["-c", CLI, "explain", PROMPT]),
+        ("router run (new process)", ["-c", CLI, "run", PROMPT]),
+    ]
+    for name, argv in rows:
+        print(f"{name:<36} {_process_ms(argv, args.runs):>10.1f}")
+
+    config = default_config()
+    config.trace.enabled = False
+    router = DecisionRouter(config)
+    server, loop = _serve(router)
+    # /route repeats 50 prompts, so after warm-up it measures the resident cache.
+    for path in ("/explain", "/route"):
+        ms = _request_ms(server.port, path, args.requests)
+        print(f"{'serve ' + path + ' (keep-alive)':<36} {ms:>10.3f}")
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    router.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""HTTP adapter throughput against the local mock server: pooled keep-alive vs. a new
+connection per request.
+
+Usage: python benchmarks/http_pool.py [--requests 2000] [--concurrency 8] [--latency-ms 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_decision_router.adapters import OpenAIAdapter
+from ai_decision_router.mock_server import MockOpenAIServer
+from ai_decision_router.models import ModelSpec
+
+MODEL = ModelSpec("mock-gpt", "openai", 0.9, 0.01, 500)
+
+
+def _pooled(base_url: str, pool_size: int):
+    adapter = OpenAIAdapter(api_key="bench", base_url=base_url, pool_size=pool_size)
+    return lambda prompt: adapter.generate(prompt, MODEL)
+
+
+def _fresh(base_url: str, pool_size: int):
+    def call(prompt: str):
+        # The previous behaviour: a new adapter (and connection) for every request.
+        adapter = OpenAIAdapter(api_key="bench", base_url=base_url, pool_size=pool_size)
+        try:
+            return adapter.generate(prompt, MODEL)
+        finally:
+            adapter.close()
+
+    return call
+
+
+def _run(call, requests: int, concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, (f"prompt {i}" for i in range(requests))))
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{'client':>8} {'req/s':>10} {'connections':>12}")
+    for name, factory in (("fresh", _fresh), ("pooled", _pooled)):
+        with MockOpenAIServer(latency_ms=args.latency_ms) as server:
+            rps = _run(factory(server.base_url, args.concurrency), args.requests, args.concurrency)
+            print(f"{name:>8} {rps:>10.0f} {server.connections:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Micro-batching on vs. off: throughput, simulated latency and batch sizes offline.
+
+Routes distinct prompts through `DecisionRouter.arun_batch` (all in flight at once, capped
+by `execution.max_concurrency`) against `MockAdapter`'s batched latency model, where a
+batch costs its slowest prompt plus `--item-fraction` of that per extra prompt. The mock
+sleeps `--time-scale` of the simulated latency, so wall time shows the throughput gain.
+
+Usage: python benchmarks/micro_batching.py [--requests 2000] [--concurrency 16]
+           [--time-scale 0.01] [--item-fraction 0.1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from ai_decision_router.adapters import MockAdapter
+from ai_decision_router.benchmark import load_prompts
+from ai_decision_router.config import default_config
+from ai_decision_router.router import DecisionRouter
+
+
+def run(args: argparse.Namespace, batch: bool) -> tuple[float, list[dict], dict]:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.max_concurrency = args.concurrency
+    config.execution.batch = batch
+    config.execution.batch_max_size = args.max_batch
+    adapter = MockAdapter(time_scale=args.time_scale, batch_item_fraction=args.item_fraction)
+    router = DecisionRouter(config, adapters={"mock": adapter})
+    base = load_prompts("medium")
+    prompts = [f"{base[i % len(base)]} #{i}" for i in range(args.requests)]
+    start = time.perf_counter()
+    results = asyncio.run(router.arun_batch(prompts))
+    elapsed = time.perf_counter() - start
+    router.close()
+    return elapsed, results, router.batch_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--time-scale", type=float, default=0.01)
+    parser.add_argument("--item-fraction", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(
+        f"{'batching':>8} {'req/s':>9} {'p50_ms':>8} {'p95_ms':>8} "
+        f"{'mean_batch':>10} {'cost_usd':>9}"
+    )
+    for batch in (False, True):
+        elapsed, results, stats = run(args, batch)
+        latencies = sorted(r["latency_ms"] for r in results)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(
+            f"{'on' if batch else 'off':>8} {len(results) / elapsed:>9.0f} "
+            f"{statistics.median(latencies):>8.0f} {p95:>8.0f} "
+            f"{stats['mean_batch_size'] or 1.0:>10.2f} "
+            f"{sum(r['est_cost'] for r in results):>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Rules vs. score vs. learned policy: decision time and realized utility.
+
+The learned policy is trained on the first half of the suite's exploration rows (every
+prompt on every model) and evaluated on the second half. Realized utility uses the
+latency and cost each chosen model actually produced, weighted like the score policy.
+
+Usage: python benchmarks/policy_compare.py [--suite medium] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from ai_decision_router.benchmark import exploration_rows, load_prompts
+from ai_decision_router.classifier import classify_task
+from ai_decision_router.config import default_config
+from ai_decision_router.learned_policy import LearnedPolicy, train_learned_policy
+from ai_decision_router.policies import RulesPolicy, ScorePolicy
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.tokens import count_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suite", default="medium")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    config = default_config()
+    config.trace.enabled = False
+    weights = config.policy
+    router = DecisionRouter(config=config)
+    prompts = load_prompts(args.suite)
+    rows = list(exploration_rows(router, args.suite))
+    router.close()
+    n_models = len(router.models)
+    split = len(prompts) // 2 * n_models
+    # Ground truth per (prompt tokens, task, model) from the held-out half.
+    outcome = {(r["prompt_tokens"], r["task_type"], r["chosen_model"]): r for r in rows[split:]}
+    test = prompts[len(prompts) // 2 :]
+    policies = {
+        "rules": RulesPolicy(),
+        "score": ScorePolicy(weights.quality_weight, weights.cost_weight, weights.latency_weight),
+        "learned": LearnedPolicy(
+            train_learned_policy(rows[:split], list(router.models.values())),
+            weights.quality_weight,
+            weights.cost_weight,
+            weights.latency_weight,
+        ),
+    }
+    budgets = config.budgets
+    tasks = [classify_task(p) for p in test]
+
+    print(f"{'policy':>8} {'us/decision':>12} {'utility':>9} {'latency_ms':>11} {'cost_usd':>10}")
+    for name, policy in policies.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            decisions = [
+                policy.choose(p, t, router.columns, budgets.max_cost_usd, budgets.max_latency_ms)
+                for p, t in zip(test, tasks, strict=True)
+            ]
+        us = (time.perf_counter() - start) / (args.repeat * len(test)) * 1e6
+        utility = latency = cost = 0.0
+        for prompt, task, decision in zip(test, tasks, decisions, strict=True):
+            row = outcome[(count_tokens(prompt), task, decision.model_name)]
+            quality = router.models[decision.model_name].expected_quality
+            utility += (
+                weights.quality_weight * quality
+                - weights.cost_weight * row["est_cost"]
+                - weights.latency_weight * row["latency_ms"] / 1000
+            )
+            latency += row["latency_ms"]
+            cost += row["est_cost"]
+        n = len(test)
+        print(f"{name:>8} {us:>12.1f} {utility / n:>9.4f} {latency / n:>11.1f} {cost / n:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Routing cost vs. registry size: 10, 1k and 10k models.
+
+Compares the indexed policies against a linear scan over every model (the selection
+loop before sorted indexes), per decision, plus the one-off cost of indexing a registry.
+
+Complexity per decision, n models, k = models checked before the answer is certain:
+
+    linear scan             O(n)
+    rules, indexed select   O(k) walking the task's precomputed order
+    score, indexed select   O(k) branch and bound over models sorted by zero-cost utility
+    candidates (ranked)     O(log n + m) range queries, m = size of the tightest range
+    build + prepare         O(n log n) once per registry and budget
+
+Usage: python benchmarks/registry_scale.py [--sizes 10 1000 10000] [--decisions 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from ai_decision_router.models import ModelColumns, ModelSpec
+from ai_decision_router.policies import ColumnarPolicy, PolicyContext, RulesPolicy, ScorePolicy
+
+TASKS = ("code", "writing", "data", "reasoning", "chat/general")
+BUDGET_COST = 0.02
+BUDGET_LATENCY = 1000.0
+
+
+def registry(n: int, seed: int = 0) -> list[ModelSpec]:
+    rng = random.Random(seed)
+    return [
+        ModelSpec(
+            f"model-{i}",
+            "mock",
+            round(rng.uniform(0.4, 0.97), 3),
+            round(rng.uniform(0.0002, 0.03), 5),
+            round(rng.uniform(60, 2500)),
+            max_context_tokens=rng.choice([4096, 8192, 32768, 131072]),
+        )
+        for i in range(n)
+    ]
+
+
+def linear_select(policy: ColumnarPolicy, ctx: PolicyContext, task: str, tokens: int) -> int:
+    costs = ctx.costs(tokens)
+    viable = [
+        i
+        for i in range(len(ctx.cols))
+        if ctx.cols.latency_ms[i] <= ctx.budget_latency
+        and costs[i] <= ctx.budget_cost
+        and ctx.fits(i, tokens)
+    ]
+    if not viable:
+        return ctx.cheapest_fitting(tokens)
+    if isinstance(policy, RulesPolicy):
+        key, higher, _ = policy._rule(ctx, task, 1000, costs)
+        return (max if higher else min)(viable, key=key)
+    assert isinstance(policy, ScorePolicy)
+    return max(viable, key=lambda i: policy._utility(ctx, i, costs[i], task))
+
+
+def indexed_select(policy: ColumnarPolicy, ctx: PolicyContext, task: str, tokens: int) -> int:
+    return policy.select(ctx, task, tokens, 1000)[0]
+
+
+def candidates(policy: ColumnarPolicy, ctx: PolicyContext, task: str, tokens: int) -> list[int]:
+    return ctx.candidates(tokens)
+
+
+def _us(fn, policy: ColumnarPolicy, ctx: PolicyContext, workload: list[tuple[str, int]]) -> float:
+    start = time.perf_counter()
+    for task, tokens in workload:
+        fn(policy, ctx, task, tokens)
+    return (time.perf_counter() - start) / len(workload) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--decisions", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    workload = [
+        (rng.choice(TASKS), rng.choice([20, 200, 2000, 20000])) for _ in range(args.decisions)
+    ]
+    print(
+        f"{'models':>7} {'policy':>6} {'index_ms':>9} {'linear_us':>10} "
+        f"{'select_us':>10} {'candidates_us':>14} {'speedup':>8}"
+    )
+    for n in args.sizes:
+        specs = registry(n)
+        start = time.perf_counter()
+        cols = ModelColumns.from_specs(specs)
+        build_ms = (time.perf_counter() - start) * 1000
+        for name, policy in (("rules", RulesPolicy()), ("score", ScorePolicy(0.7, 0.2, 0.1))):
+            start = time.perf_counter()
+            ctx = policy.prepare(cols, BUDGET_COST, BUDGET_LATENCY)
+            index_ms = build_ms + (time.perf_counter() - start) * 1000
+            for task, tokens in workload:
+                assert indexed_select(policy, ctx, task, tokens) == linear_select(
+                    policy, ctx, task, tokens
+                )
+            linear = _us(linear_select, policy, ctx, workload)
+            indexed = _us(indexed_select, policy, ctx, workload)
+            ranged = _us(candidates, policy, ctx, workload)
+            print(
+                f"{n:>7} {name:>6} {index_ms:>9.2f} {linear:>10.1f} "
+                f"{indexed:>10.1f} {ranged:>14.1f} {linear / indexed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
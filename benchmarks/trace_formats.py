@@ -0,0 +1,71 @@
+"""Trace sink microbenchmark: JSONL vs. binary write throughput and file size, with the
+router's default buffered writer.
+
+Usage: python benchmarks/trace_formats.py [--rows 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.tracing import TraceLogger
+
+
+def _rows(router: DecisionRouter, count: int) -> list[tuple[str, dict]]:
+    """Realistic trace payloads: what ``DecisionRouter.run`` logs for the medium suite."""
+    suite = json.loads(Path("benchmarks/medium.json").read_text(encoding="utf-8"))
+    prompts = [item["prompt"] for item in suite]
+    rows = []
+    for i in range(count):
+        prompt = f"{prompts[i % len(prompts)]} #{i}"
+        decision = router.explain(prompt)
+        model = router.models[decision.model_name]
+        response = router._adapter(model.provider).generate(prompt, model)
+        rows.append(
+            (
+                prompt,
+                {
+                    **asdict(decision),
+                    "chosen_model": decision.model_name,
+                    "response": response.text,
+                    "latency_ms": response.latency_ms,
+                    "est_cost": response.estimated_cost_usd,
+                    "metadata": response.metadata,
+                    "cache_hit": False,
+                },
+            )
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rows = _rows(DecisionRouter(), args.rows)
+
+    print(f"{'format':>8} {'rows/s':>10} {'bytes/row':>10} {'size_MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("jsonl", "binary"):
+            path = Path(tmp) / f"traces.{fmt}"
+            logger = TraceLogger(str(path), buffer_size=10_000, format=fmt)
+            start = time.perf_counter()
+            for prompt, payload in rows:
+                logger.log(prompt, payload)
+            logger.close()
+            elapsed = time.perf_counter() - start
+            size = path.stat().st_size
+            print(
+                f"{fmt:>8} {len(rows) / elapsed:>10.0f} {size / len(rows):>10.1f} "
+                f"{size / 1e6:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,25 @@
 """ai_decision_router package."""
 
-from .config import RouterConfig
-from .router import DecisionRouter
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import RouterConfig
+    from .router import DecisionRouter
 
 __all__ = ["DecisionRouter", "RouterConfig"]
+
+
+def __getattr__(name: str) -> object:
+    # Imported on first use so that `router --help` and light subcommands skip pydantic
+    # and the router.
+    if name == "DecisionRouter":
+        from .router import DecisionRouter
+
+        return DecisionRouter
+    if name == "RouterConfig":
+        from .config import RouterConfig
+
+        return RouterConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
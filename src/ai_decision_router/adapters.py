@@ -1,24 +1,95 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import os
+import threading
 import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import replace
+from typing import TYPE_CHECKING
 
 from .models import ModelResponse, ModelSpec
+from .tokens import count_tokens
+
+if TYPE_CHECKING:
+    from .httpclient import HTTPConnectionPool
 
 
 class BaseAdapter(ABC):
+    # Whether generate_batch is a real batched call the router should collect prompts for.
+    supports_batching: bool = False
+
     @abstractmethod
     def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
         raise NotImplementedError
 
+    async def agenerate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        """Async entry point; blocking adapters run in a worker thread by default."""
+        return await asyncio.to_thread(self.generate, prompt, model)
+
+    def generate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        """Responses for ``prompts`` in input order. Adapters with a batch endpoint send
+        one request; the default calls :meth:`generate` per prompt."""
+        return [self.generate(prompt, model) for prompt in prompts]
+
+    async def agenerate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        return list(await asyncio.gather(*(self.agenerate(p, model) for p in prompts)))
+
+    def stream(self, prompt: str, model: ModelSpec) -> Iterator[str]:
+        """Yield response text in chunks as it is produced; concatenated, the chunks are
+        the full response. Adapters without streaming yield one chunk."""
+        yield self.generate(prompt, model).text
+
+    def close(self) -> None:
+        """Release pooled connections or other long-lived resources."""
+        return None
+
 
 class MockAdapter(BaseAdapter):
+    """Offline adapter. ``time_scale`` scales the real sleep done by :meth:`agenerate`.
+
+    ``extra_delay_ms`` injects a real, unscaled delay per model name into
+    :meth:`generate`, :meth:`agenerate` and :meth:`stream`, e.g. to simulate a slow
+    provider. :meth:`stream` emits ``chunk_words`` words per chunk: the first after
+    ``ttft_fraction`` of the simulated latency, the rest evenly over the remainder.
+
+    Batched calls model a server that runs a batch in one pass: the batch takes its
+    slowest prompt's latency plus ``batch_item_fraction`` of that per additional prompt,
+    every prompt in it sees that latency, and costs are reduced by
+    ``batch_cost_discount``.
+    """
+
+    supports_batching = True
+
+    def __init__(
+        self,
+        time_scale: float = 1.0,
+        extra_delay_ms: dict[str, float] | None = None,
+        ttft_fraction: float = 0.3,
+        chunk_words: int = 1,
+        batch_item_fraction: float = 0.1,
+        batch_cost_discount: float = 0.0,
+    ) -> None:
+        self.time_scale = time_scale
+        self.extra_delay_ms = dict(extra_delay_ms or {})
+        self.ttft_fraction = ttft_fraction
+        self.chunk_words = chunk_words
+        self.batch_item_fraction = batch_item_fraction
+        self.batch_cost_discount = batch_cost_discount
+
     def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        extra_ms = self.extra_delay_ms.get(model.name, 0.0)
+        if extra_ms:
+            time.sleep(extra_ms / 1000)
+        return self.respond(prompt, model, extra_ms)
+
+    def respond(self, prompt: str, model: ModelSpec, extra_ms: float = 0.0) -> ModelResponse:
+        """The deterministic mock response, without sleeping."""
         seed = int(hashlib.sha256(f"{prompt}:{model.name}".encode()).hexdigest()[:8], 16)
-        latency_ms = max(30, int(model.expected_latency_ms + (seed % 90) - 45))
-        token_estimate = max(20, min(4000, len(prompt.split()) * 3))
+        latency_ms = max(30, int(model.expected_latency_ms + (seed % 90) - 45)) + extra_ms
+        token_estimate = count_tokens(prompt)
         estimated_cost = (token_estimate / 1000) * model.expected_cost_per_1k_tokens
         text = (
             f"[mock:{model.name}] task handled with expected quality "
@@ -32,25 +103,148 @@ class MockAdapter(BaseAdapter):
             metadata={"token_estimate": token_estimate, "seed": seed},
         )
 
+    async def agenerate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        extra_ms = self.extra_delay_ms.get(model.name, 0.0)
+        response = self.respond(prompt, model, extra_ms)
+        await asyncio.sleep(((response.latency_ms - extra_ms) * self.time_scale + extra_ms) / 1000)
+        return response
+
+    def respond_batch(
+        self, prompts: list[str], model: ModelSpec, extra_ms: float = 0.0
+    ) -> list[ModelResponse]:
+        """The deterministic responses of one batched call, without sleeping."""
+        single = [self.respond(prompt, model) for prompt in prompts]
+        slowest = max(r.latency_ms for r in single)
+        latency_ms = slowest * (1 + self.batch_item_fraction * (len(prompts) - 1)) + extra_ms
+        return [
+            replace(
+                r,
+                latency_ms=latency_ms,
+                estimated_cost_usd=r.estimated_cost_usd * (1 - self.batch_cost_discount),
+                metadata={**r.metadata, "batch_size": len(prompts)},
+            )
+            for r in single
+        ]
+
+    def generate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        extra_ms = self.extra_delay_ms.get(model.name, 0.0)
+        if extra_ms:
+            time.sleep(extra_ms / 1000)
+        return self.respond_batch(prompts, model, extra_ms)
+
+    async def agenerate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        extra_ms = self.extra_delay_ms.get(model.name, 0.0)
+        responses = self.respond_batch(prompts, model, extra_ms)
+        latency_ms = responses[0].latency_ms - extra_ms
+        await asyncio.sleep((latency_ms * self.time_scale + extra_ms) / 1000)
+        return responses
+
+    def stream(self, prompt: str, model: ModelSpec) -> Iterator[str]:
+        extra_ms = self.extra_delay_ms.get(model.name, 0.0)
+        response = self.respond(prompt, model, extra_ms)
+        words = response.text.split(" ")
+        n = self.chunk_words
+        chunks = [
+            ("" if i == 0 else " ") + " ".join(words[i : i + n]) for i in range(0, len(words), n)
+        ]
+        delays = self.stream_schedule(response.latency_ms - extra_ms, len(chunks))
+        delays[0] += extra_ms
+        for delay_ms, chunk in zip(delays, chunks, strict=True):
+            time.sleep(delay_ms / 1000)
+            yield chunk
+
+    def stream_schedule(self, latency_ms: float, chunks: int) -> list[float]:
+        """Real delay in ms before each chunk of a response with ``latency_ms`` simulated
+        latency: ``ttft_fraction`` of it before the first, the rest spread evenly."""
+        total = latency_ms * self.time_scale
+        first = total * self.ttft_fraction
+        if chunks == 1:
+            return [total]
+        return [first] + [(total - first) / (chunks - 1)] * (chunks - 1)
+
 
 class OpenAIAdapter(BaseAdapter):
-    """Structure-ready adapter. Network call intentionally stubbed for offline default usage."""
+    """OpenAI-compatible ``/chat/completions`` adapter over a pooled keep-alive client.
 
-    def __init__(self) -> None:
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    The connection pool is created on first use and reused by every call, so a single
+    instance (the router keeps one per provider) pays connection and TLS setup once per
+    pooled connection rather than once per request. :meth:`agenerate` runs the blocking
+    call in a worker thread; the pool is thread-safe and caps open connections.
+    """
 
-    def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
-        start = time.perf_counter()
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        pool_size: int = 8,
+        timeout_s: float | None = 30.0,
+        max_retries: int = 2,
+        backoff_s: float = 0.25,
+    ) -> None:
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.pool_size = pool_size
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self._pool: HTTPConnectionPool | None = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> HTTPConnectionPool:
         if not self.api_key:
             raise RuntimeError(
                 "OPENAI_API_KEY is not set. Configure env vars to enable OpenAI adapter."
             )
+        with self._pool_lock:
+            if self._pool is None:
+                # http.client is only loaded once a real provider is called.
+                from .httpclient import HTTPConnectionPool
+
+                self._pool = HTTPConnectionPool(
+                    self.base_url,
+                    pool_size=self.pool_size,
+                    timeout_s=self.timeout_s,
+                    max_retries=self.max_retries,
+                    backoff_s=self.backoff_s,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                )
+            return self._pool
+
+    def _payload(self, prompt: str, model: ModelSpec, stream: bool) -> dict:
+        payload = {"model": model.name, "messages": [{"role": "user", "content": prompt}]}
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        pool = self.pool
+        start = time.perf_counter()
+        data = pool.request("POST", "/chat/completions", self._payload(prompt, model, False))
         elapsed_ms = (time.perf_counter() - start) * 1000
+        usage = data.get("usage") or {}
+        tokens = usage.get("total_tokens", count_tokens(prompt))
         return ModelResponse(
-            text="OpenAIAdapter stub response: integrate provider SDK/API call here.",
+            text=data["choices"][0]["message"]["content"] or "",
             model_name=model.name,
             latency_ms=elapsed_ms,
-            estimated_cost_usd=0.0,
-            metadata={"base_url": self.base_url, "stub": True},
+            estimated_cost_usd=(tokens / 1000) * model.expected_cost_per_1k_tokens,
+            metadata={"base_url": self.base_url, "usage": usage},
         )
+
+    def stream(self, prompt: str, model: ModelSpec) -> Iterator[str]:
+        """Yield response text deltas as the server streams them."""
+        for event in self.pool.stream(
+            "POST", "/chat/completions", self._payload(prompt, model, True)
+        ):
+            for choice in event.get("choices") or ():
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
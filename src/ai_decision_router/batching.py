@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from .adapters import BaseAdapter
+from .models import ModelResponse, ModelSpec
+
+
+class AdaptiveBatchSize:
+    """AIMD controller for one model's batch size.
+
+    Starts at 1, so a lone request is dispatched without waiting. The size grows by one
+    after a full batch that met the latency target while more requests were queued
+    behind it, halves when a batch misses the target, and drops to the demand actually
+    seen when a batch is dispatched on timeout before filling up.
+    """
+
+    __slots__ = ("size", "max_size", "target_ms")
+
+    def __init__(self, max_size: int, target_ms: float) -> None:
+        self.size = 1
+        self.max_size = max_size
+        self.target_ms = target_ms
+
+    def update(self, items: int, limit: int, latency_ms: float, backlog: int) -> None:
+        """Record a finished batch of ``items`` prompts dispatched with size ``limit``."""
+        # Many batches can be in flight at once; only one dispatched at the current size
+        # grows it, and misses halve from the missing batch's size, not once per miss.
+        if latency_ms > self.target_ms:
+            self.size = max(1, min(self.size, limit // 2))
+        elif items >= limit:
+            if backlog and limit >= self.size:
+                self.size = min(self.max_size, self.size + 1)
+        else:
+            self.size = max(1, min(self.size, items))
+
+
+class MicroBatcher:
+    """Collects prompts routed to the same model into one ``generate_batch`` call.
+
+    A batch is dispatched once it holds the model's current batch size or
+    ``max_wait_ms`` after its first prompt arrived, whichever comes first, and each
+    caller gets its own response back. Batch sizes adapt per model
+    (:class:`AdaptiveBatchSize`) to keep a batch's latency within ``latency_factor``
+    times the model's expected latency; the backlog that lets a size grow is the number
+    of other requests for the model still waiting or in flight.
+
+    :meth:`generate` serves threads: the first caller of a batch waits for the others
+    and makes the call. :meth:`agenerate` serves coroutines on one event loop: a
+    collector per model takes the next batch only once it holds a ``limiter`` slot, so
+    prompts that arrive while the provider is saturated are batched together.
+    """
+
+    def __init__(
+        self, max_size: int = 32, max_wait_ms: float = 5.0, latency_factor: float = 1.5
+    ) -> None:
+        self.max_size = max_size
+        self.max_wait_ms = max_wait_ms
+        self.latency_factor = latency_factor
+        self.batches = 0
+        self.items = 0
+        self._lock = threading.Lock()
+        self._sizes: dict[str, AdaptiveBatchSize] = {}
+        self._inflight: dict[str, int] = {}
+        self._open: dict[str, _Batch] = {}
+        self._queues: dict[str, _Queue] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "batch_size": {name: c.size for name, c in sorted(self._sizes.items())},
+            }
+
+    def _size(self, model: ModelSpec) -> int:
+        with self._lock:
+            controller = self._sizes.get(model.name)
+            if controller is None:
+                controller = self._sizes[model.name] = AdaptiveBatchSize(
+                    self.max_size, model.expected_latency_ms * self.latency_factor
+                )
+            # A lowered max_size (config reload) applies from the next batch.
+            controller.max_size = self.max_size
+            controller.size = min(controller.size, self.max_size)
+            return controller.size
+
+    def _enter(self, model: ModelSpec) -> None:
+        with self._lock:
+            self._inflight[model.name] = self._inflight.get(model.name, 0) + 1
+
+    def _done(
+        self, model: ModelSpec, items: int, limit: int, responses: list[ModelResponse] | None
+    ) -> None:
+        with self._lock:
+            self._inflight[model.name] -= items
+            if responses is None:
+                return
+            self.batches += 1
+            self.items += items
+            latency_ms = max(r.latency_ms for r in responses)
+            backlog = self._inflight[model.name]
+            self._sizes[model.name].update(items, limit, latency_ms, backlog)
+
+    def generate(self, adapter: BaseAdapter, prompt: str, model: ModelSpec) -> ModelResponse:
+        limit = self._size(model)
+        future: Future = Future()
+        with self._lock:
+            self._inflight[model.name] = self._inflight.get(model.name, 0) + 1
+            batch = self._open.get(model.name)
+            leader = batch is None
+            if batch is None:
+                batch = self._open[model.name] = _Batch(limit)
+            batch.prompts.append(prompt)
+            batch.futures.append(future)
+            if len(batch.prompts) >= batch.limit:
+                del self._open[model.name]
+                batch.full.set()
+        if leader:
+            if batch.limit > 1:
+                batch.full.wait(self.max_wait_ms / 1000)
+            with self._lock:
+                if self._open.get(model.name) is batch:
+                    del self._open[model.name]
+            try:
+                responses = adapter.generate_batch(batch.prompts, model)
+            except BaseException as exc:
+                self._done(model, len(batch.prompts), batch.limit, None)
+                for waiter in batch.futures:
+                    waiter.set_exception(exc)
+            else:
+                self._done(model, len(batch.prompts), batch.limit, responses)
+                for waiter, response in zip(batch.futures, responses, strict=True):
+                    waiter.set_result(response)
+        return future.result()
+
+    async def agenerate(
+        self,
+        adapter: BaseAdapter,
+        prompt: str,
+        model: ModelSpec,
+        limiter: asyncio.Semaphore | None = None,
+    ) -> ModelResponse:
+        """Async :meth:`generate`. ``limiter`` (e.g. the provider's concurrency
+        semaphore) is held once per batch rather than once per prompt."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues, futures and collectors belong to the loop they were created on.
+            self._queues = {}
+            self._loop = loop
+        queue = self._queues.get(model.name)
+        if queue is None:
+            queue = self._queues[model.name] = _Queue()
+        future = loop.create_future()
+        self._enter(model)
+        queue.items.append((prompt, future))
+        queue.arrived.set()
+        if not queue.collecting:
+            queue.collecting = True
+            self._spawn(self._collect(adapter, model, queue, limiter))
+        return await future
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        # The loop keeps only weak references to tasks.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _collect(
+        self,
+        adapter: BaseAdapter,
+        model: ModelSpec,
+        queue: _Queue,
+        limiter: asyncio.Semaphore | None,
+    ) -> None:
+        try:
+            while queue.items:
+                size = self._size(model)
+                deadline = asyncio.get_running_loop().time() + self.max_wait_ms / 1000
+                while len(queue.items) < size:
+                    queue.arrived.clear()
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(queue.arrived.wait(), timeout)
+                    except TimeoutError:
+                        break
+                if limiter is not None:
+                    await limiter.acquire()
+                # Prompts that arrived while waiting for the slot join this batch.
+                limit = self._size(model)
+                batch = queue.items[:limit]
+                del queue.items[:limit]
+                self._spawn(self._run(adapter, model, batch, limit, limiter))
+        finally:
+            queue.collecting = False
+
+    async def _run(
+        self,
+        adapter: BaseAdapter,
+        model: ModelSpec,
+        batch: list[tuple[str, asyncio.Future]],
+        limit: int,
+        limiter: asyncio.Semaphore | None,
+    ) -> None:
+        try:
+            responses = await adapter.agenerate_batch([prompt for prompt, _ in batch], model)
+        except asyncio.CancelledError:
+            self._done(model, len(batch), limit, None)
+            for _, waiter in batch:
+                waiter.cancel()
+            raise
+        except Exception as exc:
+            self._done(model, len(batch), limit, None)
+            for _, waiter in batch:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        finally:
+            if limiter is not None:
+                limiter.release()
+        self._done(model, len(batch), limit, responses)
+        # Callers that timed out or were cancelled have already stopped waiting.
+        for (_, waiter), response in zip(batch, responses, strict=True):
+            if not waiter.done():
+                waiter.set_result(response)
+
+
+@dataclass(slots=True)
+class _Batch:
+    limit: int
+    prompts: list[str] = field(default_factory=list)
+    futures: list[Future] = field(default_factory=list)
+    full: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass(slots=True)
+class _Queue:
+    items: list[tuple[str, asyncio.Future]] = field(default_factory=list)
+    arrived: asyncio.Event = field(default_factory=asyncio.Event)
+    collecting: bool = False
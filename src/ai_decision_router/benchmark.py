@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import json
+import math
+import sys
+import threading
+import time
 from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+from .adapters import BaseAdapter
 from .classifier import classify_task
+from .models import ModelResponse, ModelSpec
 from .router import DecisionRouter
+from .tokens import count_tokens
 
 SUITES = {
     "quick": "benchmarks/quick.json",
@@ -49,12 +58,180 @@ def run_benchmark(router: DecisionRouter, suite: str) -> dict:
     return report
 
 
+def load_prompts(source: str) -> list[str]:
+    """Prompts from a suite name, a JSON suite file or a JSONL file with a ``prompt`` field."""
+    path = Path(SUITES.get(source, source))
+    if path.suffix == ".jsonl":
+        with path.open(encoding="utf-8") as f:
+            return [json.loads(line)["prompt"] for line in f if line.strip()]
+    return [item["prompt"] for item in json.loads(path.read_text(encoding="utf-8"))]
+
+
+def exploration_rows(router: DecisionRouter, source: str) -> Iterator[dict]:
+    """Run every prompt of ``source`` on every registered model, bypassing the policy.
+
+    Yields trace-shaped rows (not written to the trace) so offline training sees each
+    model on every kind of prompt, not only on the ones the current policy sends it.
+    """
+    for prompt in load_prompts(source):
+        task_type = classify_task(prompt)
+        tokens = count_tokens(prompt)
+        for spec in router.models.values():
+            response = router._adapter(spec.provider).generate(prompt, spec)
+            yield {
+                "task_type": task_type,
+                "chosen_model": spec.name,
+                "prompt_tokens": tokens,
+                "latency_ms": response.latency_ms,
+                "est_cost": response.estimated_cost_usd,
+            }
+
+
+class _TimedAdapter(BaseAdapter):
+    """Records the wall time of each adapter call on the calling thread.
+
+    Batching support and the native async and batch entry points are forwarded, so load
+    mode exercises the same adapter paths as production. A batched call is timed on the
+    thread that makes it; prompts that joined its batch count their wait as overhead.
+    """
+
+    def __init__(self, inner: BaseAdapter, local: threading.local) -> None:
+        self.inner = inner
+        self.local = local
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.inner.supports_batching
+
+    def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        start = time.perf_counter()
+        try:
+            return self.inner.generate(prompt, model)
+        finally:
+            self._add(start)
+
+    async def agenerate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        start = time.perf_counter()
+        try:
+            return await self.inner.agenerate(prompt, model)
+        finally:
+            self._add(start)
+
+    def generate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        start = time.perf_counter()
+        try:
+            return self.inner.generate_batch(prompts, model)
+        finally:
+            self._add(start)
+
+    async def agenerate_batch(self, prompts: list[str], model: ModelSpec) -> list[ModelResponse]:
+        start = time.perf_counter()
+        try:
+            return await self.inner.agenerate_batch(prompts, model)
+        finally:
+            self._add(start)
+
+    def _add(self, start: float) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.local.adapter_ms = getattr(self.local, "adapter_ms", 0.0) + elapsed_ms
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_load_test(
+    router: DecisionRouter,
+    source: str,
+    requests: int | None = None,
+    concurrency: int = 1,
+    qps: float | None = None,
+) -> dict:
+    """Replay prompts through ``router.run`` with ``concurrency`` worker threads, optionally
+    paced to ``qps``, and report router overhead separately from adapter time.
+
+    Router overhead is the wall time of ``run`` minus the wall time spent inside the
+    adapter call; adapter latency is the latency reported by the adapter response.
+    """
+    prompts = load_prompts(source)
+    if not prompts:
+        raise ValueError(f"No prompts in {source}")
+    total = requests or len(prompts)
+    local = threading.local()
+    saved_adapters = dict(router.adapters)
+    for provider in {m.provider for m in router.models.values()}:
+        router.adapters[provider] = _TimedAdapter(router._adapter(provider), local)
+
+    overhead_ms: list[float] = []
+    adapter_ms: list[float] = []
+    cache_hits = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal cache_hits
+        if qps:
+            delay = start + i / qps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        local.adapter_ms = 0.0
+        began = time.perf_counter()
+        result = router.run(prompts[i % len(prompts)])
+        elapsed = (time.perf_counter() - began) * 1000
+        with lock:
+            overhead_ms.append(elapsed - local.adapter_ms)
+            adapter_ms.append(result["latency_ms"])
+            cache_hits += result["cache_hit"]
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            list(pool.map(one, range(total)))
+    finally:
+        router.adapters = saved_adapters
+    wall_s = time.perf_counter() - start
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "suite": Path(source).stem if source not in SUITES else source,
+        "mode": "load",
+        "num_requests": total,
+        "concurrency": concurrency,
+        "target_qps": qps,
+        "requests_per_sec": total / wall_s if wall_s else 0.0,
+        "cache_hit_rate": cache_hits / total,
+        "router_overhead_ms": {
+            f"p{int(q * 100)}": _percentile(overhead_ms, q) for q in (0.5, 0.95, 0.99)
+        },
+        "adapter_latency_ms": {
+            f"p{int(q * 100)}": _percentile(adapter_ms, q) for q in (0.5, 0.95, 0.99)
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    _write_reports(report, report["suite"])
+    return report
+
+
 def _write_reports(report: dict, suite: str) -> None:
     Path("reports").mkdir(exist_ok=True)
     ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
     json_path = Path(f"reports/{suite}-{ts}.json")
     md_path = Path(f"reports/{suite}-{ts}.md")
     json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if report.get("mode") == "load":
+        md_path.write_text(_load_markdown(report, suite), encoding="utf-8")
+        return
     md = (
         f"# Benchmark Report ({suite})\n\n"
         f"- prompts: {report['num_prompts']}\n"
@@ -67,3 +244,24 @@ def _write_reports(report: dict, suite: str) -> None:
     for model, count in report["policy_distribution"].items():
         md += f"- {model}: {count}\n"
     md_path.write_text(md, encoding="utf-8")
+
+
+def _load_markdown(report: dict, suite: str) -> str:
+    rss = report["peak_rss_mb"]
+    md = (
+        f"# Load Test Report ({suite})\n\n"
+        f"- requests: {report['num_requests']}\n"
+        f"- concurrency: {report['concurrency']}\n"
+        f"- target_qps: {report['target_qps'] or 'unbounded'}\n"
+        f"- requests_per_sec: {report['requests_per_sec']:.1f}\n"
+        f"- cache_hit_rate: {report['cache_hit_rate']:.3f}\n"
+        f"- peak_rss_mb: {'n/a' if rss is None else f'{rss:.1f}'}\n\n"
+        "| stage | p50 ms | p95 ms | p99 ms |\n|---|---|---|---|\n"
+    )
+    for label, key in (
+        ("router overhead", "router_overhead_ms"),
+        ("adapter", "adapter_latency_ms"),
+    ):
+        q = report[key]
+        md += f"| {label} | {q['p50']:.3f} | {q['p95']:.3f} | {q['p99']:.3f} |\n"
+    return md
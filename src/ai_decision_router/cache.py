@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+def cache_key(prompt: str, model_name: str, policy_fingerprint: str) -> str:
+    """Stable key for a response: prompt, chosen model and the policy configuration."""
+    digest = hashlib.sha256()
+    for part in (policy_fingerprint, model_name, prompt):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class CacheBackend(ABC):
+    """Persistent tier behind the in-memory LRU. Values are JSON text."""
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[str, float | None] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: str, expires_at: float | None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class SQLiteCacheBackend(CacheBackend):
+    def __init__(self, path: str, max_entries: int = 100_000) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> tuple[str, float | None] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, expires_at: float | None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._prune()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _prune(self) -> None:
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+        )
+        self._conn.execute(
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+
+class ResponseCache:
+    """Thread-safe LRU response cache with TTL, entry and byte caps, and an optional
+    persistent backend used as a write-through second tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float | None = None,
+        backend: CacheBackend | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.backend = backend
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[dict[str, Any], int, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                self._drop(key)
+                self.stats.expirations += 1
+
+        if self.backend is not None:
+            stored = self.backend.get(key)
+            if stored is not None:
+                text, expires_at = stored
+                if expires_at is None or expires_at > now:
+                    value = json.loads(text)
+                    with self._lock:
+                        self._insert(key, value, len(text), expires_at)
+                        self.stats.hits += 1
+                    return value
+                self.backend.delete(key)
+                with self._lock:
+                    self.stats.expirations += 1
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        text = json.dumps(value, default=str)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._insert(key, value, len(text), expires_at)
+        if self.backend is not None:
+            self.backend.set(key, text, expires_at)
+
+    def resize(self, max_entries: int, max_bytes: int, ttl_seconds: float | None = None) -> None:
+        """Apply new limits, evicting least recently used entries that no longer fit."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.ttl_seconds = ttl_seconds or None
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.entries = 0
+            self.stats.bytes = 0
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, key: str, value: dict[str, Any], size: int, expires_at: float | None) -> None:
+        if key in self._entries:
+            self._drop(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, expires_at)
+        self.stats.entries += 1
+        self.stats.bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.stats.bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= size
+
+
+_WHITESPACE = re.compile(r"\s+")
+_HASH_MASK = (1 << 64) - 1
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", prompt.casefold()).strip().rstrip(".!?;:, ")
+
+
+@dataclass
+class NearDuplicateStats:
+    hits: int = 0
+    misses: int = 0
+    verified: int = 0
+    false_hits: int = 0
+    entries: int = 0
+
+
+class NearDuplicateCache:
+    """Second cache tier matching prompts by estimated Jaccard similarity.
+
+    Prompts are normalized (:func:`normalize_prompt`) and split into word shingles; a
+    one-permutation MinHash signature of ``num_perm`` bins (one hash per shingle, densified
+    so short prompts fill every bin) estimates shingle-set similarity. Signatures are
+    indexed by LSH: ``bands`` groups of bins, any exactly matching band makes an entry a
+    candidate, and the most similar candidate at or above the threshold is returned.
+    Entries live in ``namespace``s (model plus policy fingerprint) and are evicted LRU.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_words: int = 2,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_words = shingle_words
+        self.ttl_seconds = ttl_seconds or None
+        self.stats = NearDuplicateStats()
+        self._rows = num_perm // bands
+        # entry id -> (namespace, signature, value, prompt hash, expires_at)
+        self._entries: OrderedDict[int, tuple[str, tuple[int, ...], dict, str, float | None]] = (
+            OrderedDict()
+        )
+        self._index: dict[tuple, set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def shingles(self, text: str) -> set[str]:
+        """Word shingles of normalized ``text``; empty if it normalizes to nothing."""
+        words = normalize_prompt(text).split(" ")
+        if words == [""]:
+            return set()
+        n = self.shingle_words
+        if len(words) <= n:
+            return {" ".join(words)}
+        return {" ".join(words[i : i + n]) for i in range(len(words) - n + 1)}
+
+    def signature(self, text: str) -> tuple[int, ...] | None:
+        """MinHash signature of ``text``, or ``None`` if it normalizes to nothing.
+
+        Shingles are hashed with keyless BLAKE2b rather than ``hash()``, which is salted
+        per process, so signatures and similarities are the same in every run.
+        """
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        k = self.num_perm
+        bins = [-1] * k
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+            slot, value = h % k, h // k
+            if bins[slot] < 0 or value < bins[slot]:
+                bins[slot] = value
+        # Rotation densification: an empty bin borrows the next filled bin's value, offset
+        # by the distance so borrowed values stay distinguishable.
+        filled = [i for i in range(k) if bins[i] >= 0]
+        if len(filled) < k:
+            for i in range(k):
+                if bins[i] < 0:
+                    j = next((f for f in filled if f > i), filled[0] + k)
+                    bins[i] = bins[j % k] + (j - i) * (_HASH_MASK // k + 1)
+        return tuple(bins)
+
+    @staticmethod
+    def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b, strict=True)) / len(a)
+
+    def jaccard(self, a: str, b: str) -> float:
+        """Exact Jaccard similarity of two texts' shingle sets (1.0 if both are empty)."""
+        x, y = self.shingles(a), self.shingles(b)
+        return len(x & y) / len(x | y) if x or y else 1.0
+
+    def get(
+        self, namespace: str, signature: tuple[int, ...], threshold: float, count: bool = True
+    ) -> tuple[dict[str, Any], float, str] | None:
+        """Best entry at or above ``threshold``: ``(value, similarity, prompt_hash)``.
+
+        ``count=False`` peeks without touching hit/miss stats or LRU order.
+        """
+        now = time.time()
+        with self._lock:
+            best, best_sim = None, threshold
+            for candidate in self._candidates(namespace, signature):
+                _, sig, _, _, expires_at = self._entries[candidate]
+                if expires_at is not None and expires_at <= now:
+                    continue
+                sim = self.similarity(signature, sig)
+                if sim >= best_sim:
+                    best, best_sim = candidate, sim
+            if best is None:
+                self.stats.misses += count
+                return None
+            if count:
+                self.stats.hits += 1
+                self._entries.move_to_end(best)
+            _, _, value, prompt_hash, _ = self._entries[best]
+            return value, best_sim, prompt_hash
+
+    def set(
+        self, namespace: str, signature: tuple[int, ...], value: dict[str, Any], prompt_hash: str
+    ) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (namespace, signature, value, prompt_hash, expires_at)
+            for key in self._band_keys(namespace, signature):
+                self._index.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            self.stats.entries = len(self._entries)
+
+    def record_verification(self, false_hit: bool) -> None:
+        with self._lock:
+            self.stats.verified += 1
+            self.stats.false_hits += false_hit
+
+    def resize(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds or None
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            self.stats.entries = len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, namespace: str, signature: tuple[int, ...]) -> list[tuple]:
+        r = self._rows
+        return [(namespace, b, signature[b * r : (b + 1) * r]) for b in range(self.bands)]
+
+    def _candidates(self, namespace: str, signature: tuple[int, ...]) -> set[int]:
+        found: set[int] = set()
+        for key in self._band_keys(namespace, signature):
+            found.update(self._index.get(key, ()))
+        return found
+
+    def _drop(self, entry_id: int) -> None:
+        namespace, signature, _, _, _ = self._entries.pop(entry_id)
+        for key in self._band_keys(namespace, signature):
+            ids = self._index.get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._index[key]
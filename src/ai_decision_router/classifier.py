@@ -1,26 +1,58 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 
 TASK_TYPES = ["code", "reasoning", "data", "writing", "chat/general"]
 
+# Categories in priority order: the first category with any keyword match wins.
+# Keywords match on word boundaries; a code fence marks a prompt as code.
+_CODE_FENCE = "```"
+_CATEGORY_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("code", ("python", "java", "debug", "function")),
+    ("data", ("csv", "table", "query", "sql", "data")),
+    ("reasoning", ("why", "prove", "step by step", "logic")),
+    ("writing", ("blog", "essay", "rewrite", "tone", "summary")),
+)
+_NO_MATCH = len(_CATEGORY_KEYWORDS)
+
+
+def _compile() -> re.Pattern[str]:
+    """Compile every category into one alternation with a named group per category.
+
+    The leading lookahead on keyword first characters lets the scanner skip most
+    positions without entering the alternation at all.
+    """
+    first_chars = {_CODE_FENCE[0]} | {kw[0] for _, kws in _CATEGORY_KEYWORDS for kw in kws}
+    groups = "|".join(
+        f"(?P<c{rank}>{'|'.join(re.escape(kw) for kw in kws)})"
+        for rank, (_, kws) in enumerate(_CATEGORY_KEYWORDS)
+    )
+    charset = "".join(re.escape(c) for c in sorted(first_chars))
+    return re.compile(f"(?=[{charset}])(?:(?P<fence>{re.escape(_CODE_FENCE)})|\\b(?:{groups})\\b)")
+
+
+_COMBINED = _compile()
+_GROUP_RANKS = {"fence": 0} | {f"c{rank}": rank for rank in range(_NO_MATCH)}
+
 
 def classify_task(prompt: str) -> str:
-    text = prompt.lower().strip()
-    if not text:
+    text = prompt.lower()
+    if not text or text.isspace():
+        return "chat/general"
+
+    best = _NO_MATCH
+    for match in _COMBINED.finditer(text):
+        rank = _GROUP_RANKS[match.lastgroup]
+        if rank < best:
+            best = rank
+            if rank == 0:
+                break
+    if best == _NO_MATCH:
         return "chat/general"
+    return _CATEGORY_KEYWORDS[best][0]
+
 
-    code_patterns = [r"```", r"\bpython\b", r"\bjava\b", r"\bdebug\b", r"\bfunction\b"]
-    reasoning_patterns = [r"\bwhy\b", r"\bprove\b", r"\bstep by step\b", r"\blogic\b"]
-    data_patterns = [r"\bcsv\b", r"\btable\b", r"\bquery\b", r"\bsql\b", r"\bdata\b"]
-    writing_patterns = [r"\bblog\b", r"\bessay\b", r"\brewrite\b", r"\btone\b", r"\bsummary\b"]
-
-    if any(re.search(p, text) for p in code_patterns):
-        return "code"
-    if any(re.search(p, text) for p in data_patterns):
-        return "data"
-    if any(re.search(p, text) for p in reasoning_patterns):
-        return "reasoning"
-    if any(re.search(p, text) for p in writing_patterns):
-        return "writing"
-    return "chat/general"
+def classify_many(prompts: Iterable[str]) -> list[str]:
+    """Classify prompts in bulk with the shared compiled pattern."""
+    return [classify_task(p) for p in prompts]
@@ -1,29 +1,66 @@
 from __future__ import annotations
 
+import itertools
+import json
+import sys
+from collections import deque
+from dataclasses import asdict
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import typer
 
-from .benchmark import run_benchmark
-from .config import RouterConfig, default_config
-from .router import DecisionRouter
+# Subcommands import what they use, so startup (and `--help`) does not pay for pydantic,
+# the router, adapters or benchmarks unless the command needs them.
+if TYPE_CHECKING:
+    from .config import RouterConfig
+    from .replay import ReplayProgress
+    from .router import DecisionRouter
 
 app = typer.Typer(help="LLM decision router CLI")
+traces_app = typer.Typer(help="Inspect trace files")
+app.add_typer(traces_app, name="traces")
 
 
-def _load_router(config_path: str | None) -> DecisionRouter:
-    config = default_config()
+def _load_config(config_path: str | None) -> RouterConfig:
+    from .config import RouterConfig, default_config
+
     if config_path:
-        config = RouterConfig.from_toml(config_path)
-    elif Path("router.toml").exists():
-        config = RouterConfig.from_toml("router.toml")
-    return DecisionRouter(config=config)
+        return RouterConfig.from_toml(config_path)
+    if Path("router.toml").exists():
+        return RouterConfig.from_toml("router.toml")
+    return default_config()
+
+
+def _load_router(config_path: str | None) -> DecisionRouter:
+    from .router import DecisionRouter
+
+    return DecisionRouter(config=_load_config(config_path))
 
 
 @app.command()
-def run(prompt: str, config: str | None = typer.Option(None, help="Path to router.toml")) -> None:
+def run(
+    prompt: str,
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+    stream: bool = typer.Option(False, help="Print the response as it is generated"),
+) -> None:
     """Route and run a prompt."""
-    result = _load_router(config).run(prompt)
+    router = _load_router(config)
+    if stream:
+        response = router.run_stream(prompt)
+        for chunk in response:
+            typer.echo(chunk, nl=False)
+        typer.echo()
+        result = response.result
+        ttft = result.get("ttft_ms")
+        typer.echo(
+            f"model={result['chosen_model']} task={result['task_type']} "
+            f"latency={result['latency_ms']:.1f}ms"
+            + (f" ttft={ttft:.1f}ms" if ttft is not None else ""),
+            err=True,
+        )
+        return
+    result = router.run(prompt)
     typer.echo(
         f"model={result['chosen_model']} task={result['task_type']} "
         f"latency={result['latency_ms']:.1f}ms"
@@ -45,12 +82,160 @@ def explain(
     )
 
 
+@app.command("verify-table")
+def verify_table(config: str | None = typer.Option(None, help="Path to router.toml")) -> None:
+    """Check the precompiled routing table against the live policy at every token count."""
+    router = _load_router(config)
+    if router.routing_table is None:
+        typer.echo("routing table disabled for this configuration")
+        return
+    mismatches = router.routing_table.verify()
+    for m in mismatches[:20]:
+        typer.echo(
+            f"mismatch task={m.task_type} length_class={m.length_class} tokens={m.tokens} "
+            f"table={m.table_model} live={m.live_model}"
+        )
+    typer.echo(f"buckets={len(router.routing_table)} mismatches={len(mismatches)}")
+    if mismatches:
+        raise typer.Exit(code=1)
+
+
+@app.command("run-file")
+def run_file(
+    input_path: str = typer.Argument(..., help="JSONL file with one prompt record per line"),
+    output: str | None = typer.Option(None, help="Output JSONL path (default: stdout)"),
+    workers: int = typer.Option(1, help="Routing worker processes"),
+    chunk_size: int = typer.Option(64, help="Prompts sent to a worker at a time"),
+    field: str = typer.Option("prompt", help="Record field holding the prompt"),
+    explain_only: bool = typer.Option(False, "--explain-only", help="Route without running"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Route every prompt in a JSONL file across a pool of worker processes.
+
+    Records without a string prompt field are skipped and counted on stderr.
+    """
+    from .pool import RouterPool
+    from .replay import iter_jsonl_offsets
+
+    ids: deque[object] = deque()
+    skipped = 0
+
+    def prompts():
+        nonlocal skipped
+        for record, _ in iter_jsonl_offsets(input_path, field=field):
+            prompt = record.get(field)
+            if not isinstance(prompt, str):
+                skipped += 1
+                continue
+            ids.append(record.get("id"))
+            yield prompt
+
+    out = Path(output).open("w", encoding="utf-8") if output else sys.stdout
+    try:
+        if workers > 1:
+            with RouterPool(_load_config(config), workers=workers, chunk_size=chunk_size) as pool:
+                results = pool.map(prompts(), execute=not explain_only)
+                _write_results(out, results, ids)
+        else:
+            router = _load_router(config)
+            route = router.explain if explain_only else router.run
+            results = (r if isinstance(r, dict) else asdict(r) for r in map(route, prompts()))
+            _write_results(out, results, ids)
+    finally:
+        if output:
+            out.close()
+    if skipped:
+        typer.echo(f"skipped={skipped} records without a string {field!r} field", err=True)
+
+
+def _write_results(out, results, ids: deque[object]) -> None:
+    for result in results:
+        record_id = ids.popleft()
+        record = {"id": record_id, **result} if record_id is not None else result
+        out.write(json.dumps(record) + "\n")
+
+
+@app.command("replay")
+def replay_cmd(
+    input_path: str = typer.Argument(..., help="JSONL request log to re-route"),
+    output: str = typer.Option(..., help="Output JSONL path"),
+    field: str = typer.Option("prompt", help="Record field holding the prompt"),
+    explain_only: bool = typer.Option(False, "--explain-only", help="Route without running"),
+    offset: int = typer.Option(0, help="Input byte offset to start from (a line boundary)"),
+    resume: bool = typer.Option(False, "--resume", help="Continue from <output>.checkpoint"),
+    batch_size: int = typer.Option(256, help="Prompts routed per batch"),
+    progress_every: int = typer.Option(10_000, help="Records between progress reports"),
+    watch: bool = typer.Option(False, "--watch", help="Hot-reload router.toml while running"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Stream a JSONL request log through the router in constant memory."""
+    from .replay import replay
+    from .watcher import ConfigWatcher
+
+    def report(progress: ReplayProgress) -> None:
+        typer.echo(
+            f"records={progress.records} skipped={progress.skipped} offset={progress.offset} "
+            f"elapsed={progress.elapsed_s:.1f}s",
+            err=True,
+        )
+
+    router = _load_router(config)
+    config_path = config or "router.toml"
+    watcher = None
+    if watch and Path(config_path).exists():
+        watcher = ConfigWatcher(
+            router,
+            config_path,
+            on_reload=lambda snap: typer.echo(f"reloaded config version={snap.version}", err=True),
+            on_error=lambda exc: typer.echo(f"config reload failed: {exc}", err=True),
+        ).start()
+    try:
+        progress = replay(
+            router,
+            input_path,
+            output,
+            field=field,
+            execute=not explain_only,
+            offset=offset,
+            resume=resume,
+            batch_size=batch_size,
+            progress_every=progress_every,
+            on_progress=report,
+        )
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        router.close()
+    report(progress)
+
+
 @app.command()
 def bench(
-    suite: str = typer.Option("quick", help="Benchmark suite: quick|medium"),
+    suite: str = typer.Option(
+        "quick", help="Benchmark suite: quick|medium, or a .json/.jsonl prompt file (load mode)"
+    ),
     config: str | None = typer.Option(None, help="Path to router.toml"),
+    mode: str = typer.Option("accuracy", help="accuracy|load"),
+    requests: int | None = typer.Option(None, help="Load mode: total requests to replay"),
+    concurrency: int = typer.Option(1, help="Load mode: concurrent workers"),
+    qps: float | None = typer.Option(None, help="Load mode: target requests per second"),
 ) -> None:
     """Run benchmark suite and save reports."""
+    from .benchmark import run_benchmark, run_load_test
+
+    if mode == "load":
+        report = run_load_test(
+            _load_router(config), suite, requests=requests, concurrency=concurrency, qps=qps
+        )
+        overhead = report["router_overhead_ms"]
+        typer.echo(
+            f"suite={report['suite']} requests={report['num_requests']} "
+            f"rps={report['requests_per_sec']:.1f} overhead_p50={overhead['p50']:.3f}ms "
+            f"p95={overhead['p95']:.3f}ms p99={overhead['p99']:.3f}ms"
+        )
+        return
+    if mode != "accuracy":
+        raise typer.BadParameter(f"Unknown mode: {mode}", param_hint="--mode")
     report = run_benchmark(_load_router(config), suite=suite)
     typer.echo(
         f"suite={report['suite']} prompts={report['num_prompts']} "
@@ -58,5 +243,238 @@ def bench(
     )
 
 
+@app.command()
+def stats(
+    url: str | None = typer.Option(
+        None, help="Read a running `router serve` (e.g. http://127.0.0.1:8000)"
+    ),
+    suite: str = typer.Option(
+        "quick", help="Without --url: run this suite (or prompt file) with metrics enabled"
+    ),
+    prometheus: bool = typer.Option(False, "--prometheus", help="Print Prometheus text"),
+    json_output: bool = typer.Option(False, "--json", help="Print the snapshot as JSON"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Per-stage routing latency and counters, from a server or a local suite run."""
+    from .metrics import STAGES
+
+    if url:
+        import urllib.request
+
+        path = "/metrics" if prometheus else "/stats"
+        with urllib.request.urlopen(url.rstrip("/") + path) as response:
+            body = response.read().decode("utf-8")
+        if prometheus:
+            typer.echo(body, nl=False)
+            return
+        snapshot = json.loads(body)
+    else:
+        from .benchmark import load_prompts
+        from .router import DecisionRouter
+
+        cfg = _load_config(config)
+        cfg.metrics.enabled = True
+        router = DecisionRouter(config=cfg)
+        try:
+            for prompt in load_prompts(suite):
+                router.run(prompt)
+        finally:
+            router.close()
+        if prometheus:
+            typer.echo(router.metrics.prometheus(), nl=False)
+            return
+        snapshot = router.metrics.snapshot()
+    if json_output:
+        typer.echo(json.dumps(snapshot, indent=2))
+        return
+    typer.echo(
+        f"{'stage':<14} {'count':>8} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}"
+    )
+    stages = snapshot["stages"]
+    for stage in sorted(stages, key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES))):
+        row = stages[stage]
+        typer.echo(
+            f"{stage:<14} {row['count']:>8} {row['mean_ms']:>9.3f} {row['p50_ms']:>9.3f} "
+            f"{row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f}"
+        )
+    for counter in snapshot["counters"]:
+        labels = ",".join(f"{k}={v}" for k, v in counter.items() if k not in ("name", "value"))
+        name = f"{counter['name']}{{{labels}}}" if labels else counter["name"]
+        typer.echo(f"{name:<48} {counter['value']:>10g}")
+
+
+_TRAIN_TRACES = typer.Option(None, "--traces", help="Trace file to learn from (repeatable)")
+
+
+@app.command("train-policy")
+def train_policy(
+    traces: list[str] | None = _TRAIN_TRACES,
+    suite: str | None = typer.Option(
+        None, help="Also run this benchmark suite (or prompt file) on every model"
+    ),
+    output: str | None = typer.Option(None, help="Model file (default: [policy] model_path)"),
+    ridge: float = typer.Option(1.0, help="Shrinkage towards the registry's static values"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Fit the learned policy from trace files and benchmark runs."""
+    from .benchmark import exploration_rows
+    from .learned_policy import save_learned_policy, train_learned_policy
+    from .router import DecisionRouter
+    from .trace_format import iter_trace_rows
+
+    if not traces and not suite:
+        raise typer.BadParameter("Give --traces and/or --suite", param_hint="--traces")
+    cfg = _load_config(config)
+    # Training neither routes nor traces, so the policy being trained need not exist yet.
+    router = DecisionRouter(
+        config=cfg.model_copy(
+            update={
+                "policy": cfg.policy.model_copy(update={"name": "rules"}),
+                "trace": cfg.trace.model_copy(update={"enabled": False}),
+            }
+        )
+    )
+    rows = itertools.chain.from_iterable(iter_trace_rows(p) for p in traces or [])
+    if suite:
+        rows = itertools.chain(rows, exploration_rows(router, suite))
+    try:
+        model = train_learned_policy(rows, list(router.models.values()), ridge)
+    finally:
+        router.close()
+    output = output or cfg.policy.model_path
+    save_learned_policy(model, output)
+    samples = " ".join(f"{name}={m['samples']}" for name, m in model["models"].items())
+    typer.echo(f"output={output} {samples}")
+
+
+_TRACE_PATHS = typer.Argument(
+    None, help="Trace files, plain or .gz (default: the configured trace file and rotations)"
+)
+
+
+@traces_app.command("stats")
+def traces_stats(
+    paths: list[str] | None = _TRACE_PATHS,
+    by: str = typer.Option("model", help="Comma-separated grouping: model, task"),
+    workers: int = typer.Option(1, help="Processes aggregating byte ranges in parallel"),
+    json_output: bool = typer.Option(False, "--json", help="Print the full report as JSON"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Aggregate counts, cost, latency quantiles and cache hit rate from trace files."""
+    from .trace_stats import trace_stats
+    from .tracing import rotated_files
+
+    if not paths:
+        output_path = Path(_load_config(config).trace.output_path)
+        paths = [str(p) for p in rotated_files(output_path)]
+        if output_path.exists():
+            paths.append(str(output_path))
+    if not paths:
+        raise typer.BadParameter("No trace files found", param_hint="PATHS")
+    try:
+        stats = trace_stats(paths, by=by.split(","), workers=workers)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--by") from exc
+    report = stats.report()
+    if json_output:
+        typer.echo(json.dumps(report, indent=2))
+        return
+    typer.echo(
+        f"{'group':<32} {'requests':>9} {'hit_rate':>9} {'cost_usd':>10} "
+        f"{'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}"
+    )
+    for row in [*report["groups"], {"total": "total", **report["total"]}]:
+        name = "/".join(str(row[k]) for k in [*report["by"], "total"] if k in row)
+        latency = row["latency_ms"]
+        typer.echo(
+            f"{name:<32} {row['requests']:>9} {row['cache_hit_rate']:>9.3f} "
+            f"{row['cost_usd']:>10.6f} {latency['p50']:>9.1f} {latency['p95']:>9.1f} "
+            f"{latency['p99']:>9.1f}"
+        )
+    if report["malformed"]:
+        typer.echo(f"skipped {report['malformed']} malformed lines", err=True)
+
+
+@traces_app.command("convert")
+def traces_convert(
+    input_path: str = typer.Argument(..., help="Trace file to convert (plain or .gz)"),
+    output: str = typer.Argument(..., help="Output path"),
+) -> None:
+    """Convert a binary trace to JSONL, or a JSONL trace to binary."""
+    from .trace_format import convert_trace
+
+    rows = convert_trace(input_path, output)
+    typer.echo(f"rows={rows} output={output}")
+
+
+@app.command()
+def serve(
+    host: str | None = typer.Option(None, help="Interface to bind (default: [server] host)"),
+    port: int | None = typer.Option(None, help="Port to listen on (default: [server] port)"),
+    watch: bool = typer.Option(False, "--watch", help="Hot-reload router.toml while serving"),
+    config: str | None = typer.Option(None, help="Path to router.toml"),
+) -> None:
+    """Serve /route, /explain and /batch over HTTP from one resident router."""
+    import asyncio
+
+    from .server import RouterServer
+    from .watcher import ConfigWatcher
+
+    router = _load_router(config)
+    settings = router.config.server
+    server = RouterServer(
+        router,
+        host or settings.host,
+        settings.port if port is None else port,
+        max_body_bytes=settings.max_body_bytes,
+        max_batch=settings.max_batch,
+    )
+    config_path = config or "router.toml"
+    watcher = None
+    if watch and Path(config_path).exists():
+        watcher = ConfigWatcher(
+            router,
+            config_path,
+            on_reload=lambda snap: typer.echo(f"reloaded config version={snap.version}", err=True),
+            on_error=lambda exc: typer.echo(f"config reload failed: {exc}", err=True),
+        ).start()
+
+    async def main() -> None:
+        await server.start()
+        typer.echo(f"Serving on {server.base_url}", err=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        router.close()
+
+
+@app.command("mock-server")
+def mock_server(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(8765, help="Port to listen on"),
+    latency_ms: float = typer.Option(0.0, help="Simulated delay before the first token"),
+    token_interval_ms: float = typer.Option(0.0, help="Simulated delay between streamed tokens"),
+) -> None:
+    """Serve a local OpenAI-compatible /v1/chat/completions stand-in for offline testing."""
+    from .mock_server import MockOpenAIServer
+
+    server = MockOpenAIServer(
+        host, port, latency_ms=latency_ms, token_interval_ms=token_interval_ms
+    )
+    typer.echo(f"Serving on {server.base_url} (set [http] base_url or OPENAI_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
 if __name__ == "__main__":
     app()
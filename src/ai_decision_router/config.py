@@ -9,11 +9,34 @@ class BudgetConfig(BaseModel):
     max_latency_ms: float = 2500.0
 
 
+class RateLimitConfig(BaseModel):
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+    max_cost_usd: float = 0.0
+
+
+class LimitsConfig(BaseModel):
+    enabled: bool = False
+    path: str = "cache/limits.bin"
+    window_s: float = 3600.0
+    window_buckets: int = 60
+    slots: int = 256
+    max_cost_usd: float = 0.0
+    models: dict[str, RateLimitConfig] = Field(default_factory=dict)
+    providers: dict[str, RateLimitConfig] = Field(default_factory=dict)
+
+
 class PolicyConfig(BaseModel):
     name: str = "rules"
     quality_weight: float = 0.6
     cost_weight: float = 0.2
     latency_weight: float = 0.2
+    model_path: str = "models/learned_policy.json"
+    latency_source: str = "static"
+    latency_metric: str = "total"
+    observed_latency_stat: str = "ewma"
+    latency_min_samples: int = 5
+    latency_ewma_alpha: float = 0.2
 
 
 class ModelConfig(BaseModel):
@@ -28,14 +51,87 @@ class ModelConfig(BaseModel):
 class TraceConfig(BaseModel):
     enabled: bool = True
     output_path: str = "traces/router_traces.jsonl"
+    buffer_size: int = 10_000
+    flush_batch_size: int = 256
+    flush_interval_s: float = 1.0
+    when_full: str = "block"
+    max_bytes: int = 0
+    rotate_interval_s: float = 0.0
+    compress: bool = False
+    backup_count: int = 0
+    format: str = "jsonl"
+
+
+class NearDuplicateConfig(BaseModel):
+    enabled: bool = False
+    threshold: float = 0.9
+    task_types: list[str] = Field(default_factory=lambda: ["writing", "chat/general"])
+    max_entries: int = 10_000
+    num_perm: int = 64
+    bands: int = 16
+    shingle_words: int = 2
+    verify_rate: float = 0.0
+
+
+class CacheConfig(BaseModel):
+    max_entries: int = 1024
+    max_bytes: int = 16 * 1024 * 1024
+    ttl_seconds: float | None = 3600.0
+    backend: str = "memory"
+    path: str = "cache/router_cache.sqlite3"
+    near_duplicate: NearDuplicateConfig = Field(default_factory=NearDuplicateConfig)
+
+
+class ExecutionConfig(BaseModel):
+    timeout_s: float | None = 30.0
+    max_concurrency: int = 16
+    provider_concurrency: dict[str, int] = Field(default_factory=dict)
+    hedge: bool = False
+    hedge_stat: str = "p95"
+    hedge_min_samples: int = 5
+    hedge_multiplier: float = 1.0
+    batch: bool = False
+    batch_max_size: int = 32
+    batch_max_wait_ms: float = 5.0
+    batch_latency_factor: float = 1.5
+
+
+class HTTPConfig(BaseModel):
+    base_url: str | None = None
+    pool_size: int = 8
+    max_retries: int = 2
+    retry_backoff_s: float = 0.25
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False
+    slow_request_ms: float = 0.0
+    profile_sample_rate: float = 0.0
+    profile_dir: str = "reports/profiles"
+
+
+class ServerConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8000
+    max_body_bytes: int = 1024 * 1024
+    max_batch: int = 1024
 
 
 class RouterConfig(BaseModel):
     default_adapter: str = "mock"
     enable_cache: bool = True
+    coalesce_inflight: bool = True
+    routing_table: bool = True
+    verify_routing_table: bool = False
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     budgets: BudgetConfig = Field(default_factory=BudgetConfig)
+    limits: LimitsConfig = Field(default_factory=LimitsConfig)
     policy: PolicyConfig = Field(default_factory=PolicyConfig)
     trace: TraceConfig = Field(default_factory=TraceConfig)
+    execution: ExecutionConfig = Field(default_factory=ExecutionConfig)
+    http: HTTPConfig = Field(default_factory=HTTPConfig)
+    server: ServerConfig = Field(default_factory=ServerConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     model_registry: list[ModelConfig] = Field(default_factory=list)
 
     @classmethod
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import http.client
+import json
+import queue
+import random
+import select
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Methods that are safe to send twice when a connection fails after the request went out.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class HTTPError(RuntimeError):
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+        self.status = status
+        self.body = body
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive connections to one host.
+
+    At most ``pool_size`` connections are open at once; callers beyond that wait for a
+    free one. Idle connections are reused LIFO so the warmest socket (and TLS session)
+    serves the next request; idle connections the server has closed are discarded
+    rather than reused. Failed requests are retried ``max_retries`` times with jittered
+    exponential backoff on 429/5xx responses and on connection errors raised before the
+    request was sent. Once it has been sent, a connection error (e.g. a read timeout)
+    is only retried for :data:`IDEMPOTENT_METHODS`, so a completion is never billed twice.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 8,
+        timeout_s: float | None = 30.0,
+        max_retries: int = 2,
+        backoff_s: float = 0.25,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.headers = {**(headers or {}), "Content-Type": "application/json"}
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self._closed = False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return cls(self.host, self.port, timeout=self.timeout_s)
+
+    @contextmanager
+    def _connection(self) -> Iterator[http.client.HTTPConnection]:
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def _checkout(self) -> http.client.HTTPConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if not _dropped(conn):
+                return conn
+            conn.close()
+
+    def _send(
+        self, conn: http.client.HTTPConnection, method: str, path: str, payload: dict | None
+    ) -> None:
+        """Connect if needed and write the request. http.client sends a bytes body in the
+        same ``sendall`` as the headers, so if this raises the server never saw the whole
+        request and it is safe to retry."""
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        conn.request(method, self.base_path + path, body=body, headers=self.headers)
+
+    def _retry_after_send(self, method: str, attempt: int, exc: BaseException) -> None:
+        if method.upper() not in IDEMPOTENT_METHODS:
+            raise exc
+        self._retry(attempt, exc)
+
+    def _retry(self, attempt: int, exc: BaseException) -> None:
+        if attempt >= self.max_retries:
+            raise exc
+        time.sleep(self.backoff_s * 2**attempt * (0.5 + random.random() / 2))
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        """Send one JSON request and return the decoded JSON body."""
+        attempt = 0
+        while True:
+            sent = False
+            try:
+                with self._connection() as conn:
+                    self._send(conn, method, path, payload)
+                    sent = True
+                    response = conn.getresponse()
+                    body = response.read()
+                if response.status >= 400:
+                    raise HTTPError(response.status, body)
+                return json.loads(body)
+            except HTTPError as exc:
+                if exc.status not in RETRY_STATUSES:
+                    raise
+                self._retry(attempt, exc)
+            except (OSError, http.client.HTTPException) as exc:
+                if sent:
+                    self._retry_after_send(method, attempt, exc)
+                else:
+                    self._retry(attempt, exc)
+            attempt += 1
+
+    def stream(self, method: str, path: str, payload: dict | None = None) -> Iterator[dict]:
+        """Send one request and yield the JSON payload of each server-sent event.
+
+        Only establishing the stream is retried, under the same rules as :meth:`request`;
+        once events have been yielded, a broken stream raises.
+        """
+        attempt = 0
+        started = False
+        while True:
+            sent = False
+            try:
+                with self._connection() as conn:
+                    self._send(conn, method, path, payload)
+                    sent = True
+                    response = conn.getresponse()
+                    if response.status >= 400:
+                        raise HTTPError(response.status, response.read())
+                    for event in _sse_events(response):
+                        started = True
+                        yield event
+                    return
+            except HTTPError as exc:
+                if exc.status not in RETRY_STATUSES:
+                    raise
+                self._retry(attempt, exc)
+            except (OSError, http.client.HTTPException) as exc:
+                if started:
+                    raise
+                if sent:
+                    self._retry_after_send(method, attempt, exc)
+                else:
+                    self._retry(attempt, exc)
+            attempt += 1
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """Whether an idle keep-alive connection was closed by the server: an idle socket
+    only becomes readable at EOF (or on unexpected data, equally unusable)."""
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _sse_events(response: http.client.HTTPResponse) -> Iterator[dict]:
+    for raw in response:
+        line = raw.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            # Drain so the connection can be reused for the next request.
+            response.read()
+            return
+        yield json.loads(data)
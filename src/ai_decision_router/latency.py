@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+
+LATENCY_STATS = ("ewma", "p50", "p95")
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (Jain & Chlamtac P-squared)."""
+
+    __slots__ = ("q", "_heights", "_positions", "_desired", "_increments", "count")
+
+    def __init__(self, q: float) -> None:
+        self.q = q
+        self.count = 0
+        self._heights: list[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0]
+        self._increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if heights[i] <= x < heights[i + 1])
+
+        pos = self._positions
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        pos[i + step] - pos[i]
+                    )
+                heights[i] = candidate
+                pos[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        h, n = self._heights, self._positions
+        return h[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        if not self._heights:
+            return 0.0
+        if self.count <= 5:
+            ordered = sorted(self._heights)
+            return ordered[min(len(ordered) - 1, int(self.q * len(ordered)))]
+        return self._heights[2]
+
+
+class LogHistogram:
+    """Mergeable quantile sketch: counts in log-spaced buckets, so any quantile is within
+    ``relative_error`` of a sample and memory grows with the value range, not the count.
+
+    Unlike :class:`P2Quantile`, two histograms can be merged exactly, which is what lets
+    partial aggregates computed in parallel be combined.
+    """
+
+    __slots__ = ("relative_error", "_log_gamma", "counts", "zeros", "count")
+
+    def __init__(self, relative_error: float = 0.01) -> None:
+        self.relative_error = relative_error
+        self._log_gamma = math.log((1 + relative_error) / (1 - relative_error))
+        self.counts: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        if x <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(x) / self._log_gamma)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def merge(self, other: LogHistogram) -> None:
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge histograms with different relative_error")
+        self.count += other.count
+        self.zeros += other.zeros
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket (gamma^(key-1), gamma^key].
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self.counts) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+
+@dataclass
+class LatencySnapshot:
+    count: int
+    ewma: float
+    p50: float
+    p95: float
+
+
+class LatencyEstimator:
+    """Online latency estimate for one model: EWMA plus streaming p50/p95."""
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        self.alpha = alpha
+        self.count = 0
+        self.ewma = 0.0
+        self._p50 = P2Quantile(0.5)
+        self._p95 = P2Quantile(0.95)
+
+    def observe(self, latency_ms: float) -> None:
+        self.count += 1
+        self.ewma = (
+            latency_ms if self.count == 1 else self.ewma + self.alpha * (latency_ms - self.ewma)
+        )
+        self._p50.add(latency_ms)
+        self._p95.add(latency_ms)
+
+    def snapshot(self) -> LatencySnapshot:
+        return LatencySnapshot(self.count, self.ewma, self._p50.value(), self._p95.value())
+
+
+class LatencyTracker:
+    """Thread-safe per-model latency estimators fed from observed responses."""
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        self.alpha = alpha
+        self._estimators: dict[str, LatencyEstimator] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model_name: str, latency_ms: float) -> None:
+        with self._lock:
+            estimator = self._estimators.get(model_name)
+            if estimator is None:
+                estimator = self._estimators[model_name] = LatencyEstimator(self.alpha)
+            estimator.observe(latency_ms)
+
+    def estimate(self, model_name: str, stat: str = "ewma", min_samples: int = 1) -> float | None:
+        """Observed latency for ``model_name``, or ``None`` until ``min_samples`` are seen."""
+        if stat not in LATENCY_STATS:
+            raise ValueError(f"Unknown latency stat: {stat}")
+        with self._lock:
+            estimator = self._estimators.get(model_name)
+            if estimator is None or estimator.count < max(1, min_samples):
+                return None
+            return getattr(estimator.snapshot(), stat)
+
+    def snapshot(self) -> dict[str, LatencySnapshot]:
+        with self._lock:
+            return {name: e.snapshot() for name, e in self._estimators.items()}
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from operator import mul
+from pathlib import Path
+
+from .classifier import TASK_TYPES
+from .models import ModelColumns, ModelSpec, RoutingDecision
+from .policies import ColumnarPolicy, PolicyContext, _decision
+
+# chat/general is the baseline the task indicators are measured against.
+FEATURES = (
+    "bias",
+    "log_tokens",
+    "tokens_k",
+    *(f"task:{t}" for t in TASK_TYPES if t != "chat/general"),
+)
+TARGETS = ("quality", "latency_ms")
+FORMAT_VERSION = 1
+
+
+def features(task_type: str, tokens: int) -> tuple[float, ...]:
+    """Cheap per-prompt features: size and task type."""
+    return (
+        1.0,
+        math.log1p(tokens),
+        tokens / 1000,
+        *(1.0 if task_type == t else 0.0 for t in TASK_TYPES if t != "chat/general"),
+    )
+
+
+def _solve(a: list[list[float]], b: list[float]) -> list[float]:
+    """Solve ``a x = b`` by Gaussian elimination with partial pivoting (``a`` is small)."""
+    n = len(b)
+    m = [row[:] + [rhs] for row, rhs in zip(a, b, strict=True)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, n):
+            f = m[r][col] / m[col][col]
+            for c in range(col, n + 1):
+                m[r][c] -= f * m[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (m[r][n] - sum(m[r][c] * x[c] for c in range(r + 1, n))) / m[r][r]
+    return x
+
+
+@dataclass
+class _Accumulator:
+    """Sufficient statistics for a ridge regression: X^T X and X^T y per target."""
+
+    xtx: list[list[float]] = field(
+        default_factory=lambda: [[0.0] * len(FEATURES) for _ in FEATURES]
+    )
+    xty: dict[str, list[float]] = field(
+        default_factory=lambda: {t: [0.0] * len(FEATURES) for t in TARGETS}
+    )
+    samples: int = 0
+
+    def add(self, x: tuple[float, ...], targets: dict[str, float]) -> None:
+        self.samples += 1
+        for i, xi in enumerate(x):
+            if xi:
+                row = self.xtx[i]
+                for j, xj in enumerate(x):
+                    row[j] += xi * xj
+                for name, y in targets.items():
+                    self.xty[name][i] += xi * y
+
+    def solve(self, prior: dict[str, float], ridge: float) -> dict[str, list[float]]:
+        # Ridge shrinks towards the registry's static expectation (a bias-only model),
+        # so models with few samples stay close to their configured values.
+        a = [
+            [v + (ridge if i == j else 0.0) for j, v in enumerate(row)]
+            for i, row in enumerate(self.xtx)
+        ]
+        weights = {}
+        for name in TARGETS:
+            b = list(self.xty[name])
+            b[0] += ridge * prior[name]
+            weights[name] = _solve(a, b)
+        return weights
+
+
+def _row_tokens(row: dict, cost_per_1k: dict[str, float]) -> int | None:
+    if row.get("prompt_tokens") is not None:
+        return int(row["prompt_tokens"])
+    metadata = row.get("metadata") or {}
+    if isinstance(metadata, dict) and metadata.get("token_estimate") is not None:
+        return int(metadata["token_estimate"])
+    per_1k = cost_per_1k.get(row.get("chosen_model", ""))
+    if per_1k and row.get("expected_cost") is not None:
+        return round(row["expected_cost"] * 1000 / per_1k)
+    return None
+
+
+def train_learned_policy(
+    rows: Iterable[dict],
+    models: Sequence[ModelSpec],
+    ridge: float = 1.0,
+) -> dict:
+    """Fit per-model linear predictors of quality and latency from trace rows.
+
+    Only rows that executed a model are used (cache hits and coalesced rows repeat an
+    earlier response). Quality comes from a ``quality`` feedback field when present and
+    otherwise from the model's ``expected_quality``. Returns the serializable model.
+    """
+    static = {
+        spec.name: {"quality": spec.expected_quality, "latency_ms": spec.expected_latency_ms}
+        for spec in models
+    }
+    cost_per_1k = {spec.name: spec.expected_cost_per_1k_tokens for spec in models}
+    accumulators: dict[str, _Accumulator] = {}
+    for row in rows:
+        model = row.get("chosen_model")
+        if model not in static or row.get("cache_hit") or row.get("coalesced"):
+            continue
+        if row.get("latency_ms") is None:
+            continue
+        tokens = _row_tokens(row, cost_per_1k)
+        if tokens is None:
+            continue
+        quality = row.get("quality")
+        targets = {
+            "quality": float(static[model]["quality"] if quality is None else quality),
+            "latency_ms": float(row["latency_ms"]),
+        }
+        accumulators.setdefault(model, _Accumulator()).add(
+            features(row.get("task_type", "chat/general"), tokens), targets
+        )
+    return {
+        "version": FORMAT_VERSION,
+        "features": list(FEATURES),
+        "ridge": ridge,
+        "models": {
+            name: {"samples": acc.samples, **acc.solve(static[name], ridge)}
+            for name, acc in sorted(accumulators.items())
+        },
+    }
+
+
+def save_learned_policy(model: dict, path: str | Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(model, separators=(",", ":")), encoding="utf-8")
+
+
+class LearnedPolicy(ColumnarPolicy):
+    """Utility from learned per-model quality and latency predictors.
+
+    ``quality_weight * q(x) - cost_weight * cost - latency_weight * latency_s(x)``, where
+    ``x`` is :func:`features` of the prompt and cost is exact. The two predictors are
+    folded into one weight vector per model when the context is prepared, so scoring a
+    prompt is a single dot product per model. Models the file has no data for fall back
+    to their static expected quality and latency.
+    """
+
+    name = "learned"
+
+    FALLBACK = "No model fit budget constraints; used cheapest fallback."
+    # Utility is non-linear in the token count, so there are no exact breakpoints to
+    # compile into a routing table.
+    tabulable = False
+
+    def __init__(
+        self,
+        model: dict,
+        quality_weight: float,
+        cost_weight: float,
+        latency_weight: float,
+    ) -> None:
+        if model.get("version") != FORMAT_VERSION or model.get("features") != list(FEATURES):
+            raise ValueError("Incompatible learned policy file; retrain it with this version")
+        self.model = model
+        self.quality_weight = quality_weight
+        self.cost_weight = cost_weight
+        self.latency_weight = latency_weight
+        self.fingerprint = hashlib.sha256(json.dumps(model, sort_keys=True).encode()).hexdigest()[
+            :16
+        ]
+
+    @classmethod
+    def load(
+        cls, path: str | Path, quality_weight: float, cost_weight: float, latency_weight: float
+    ) -> LearnedPolicy:
+        model = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(model, quality_weight, cost_weight, latency_weight)
+
+    def _predictors(self, cols: ModelColumns) -> tuple[list, list]:
+        zeros = [0.0] * (len(FEATURES) - 1)
+        quality, latency = [], []
+        for spec, q, lat in zip(cols.models, cols.quality, cols.latency_ms, strict=True):
+            learned = self.model["models"].get(spec.name)
+            quality.append(tuple(learned["quality"]) if learned else (q, *zeros))
+            latency.append(tuple(learned["latency_ms"]) if learned else (lat, *zeros))
+        return quality, latency
+
+    def _terms(self, cols: ModelColumns) -> dict[str, tuple]:
+        quality, latency = self._predictors(cols)
+        wq, wl = self.quality_weight, self.latency_weight / 1000
+        return {
+            "quality": tuple(quality),
+            "latency": tuple(latency),
+            "theta": tuple(
+                tuple(wq * a - wl * b for a, b in zip(qw, lw, strict=True))
+                for qw, lw in zip(quality, latency, strict=True)
+            ),
+        }
+
+    def _scores(self, ctx: PolicyContext, task_type: str, tokens: int) -> list[tuple[int, float]]:
+        x = features(task_type, tokens)
+        theta = ctx.terms["theta"]
+        costs = ctx.costs(tokens)
+        cw = self.cost_weight
+        return [
+            (i, sum(map(mul, theta[i], x)) - cw * costs[i])
+            for i in ctx.in_latency
+            if costs[i] <= ctx.budget_cost and ctx.fits(i, tokens)
+        ]
+
+    def select(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> tuple[int, str]:
+        scores = self._scores(ctx, task_type, tokens)
+        if not scores:
+            return ctx.cheapest_fitting(tokens), self.FALLBACK
+        return max(scores, key=lambda s: s[1])[0], ""
+
+    def ranked(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> list[tuple[int, str]]:
+        scores = self._scores(ctx, task_type, tokens)
+        if not scores:
+            return [(i, self.FALLBACK) for i in ctx.fitting_by_cost(tokens)]
+        return [(i, "") for i, _ in sorted(scores, key=lambda s: s[1], reverse=True)]
+
+    def describe(
+        self, ctx: PolicyContext, index: int, branch: str, task_type: str, tokens: int
+    ) -> RoutingDecision:
+        cost = tokens / 1000 * ctx.cols.cost_per_1k[index]
+        model = ctx.cols.models[index]
+        if branch:
+            return _decision(self.name, task_type, model, cost, branch)
+        x = features(task_type, tokens)
+        quality = sum(map(mul, ctx.terms["quality"][index], x))
+        latency = sum(map(mul, ctx.terms["latency"][index], x))
+        return _decision(
+            self.name,
+            task_type,
+            model,
+            cost,
+            f"Learned utility: predicted quality={quality:.3f}, latency={latency:.0f}ms.",
+        )
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so only threads of one process are serialized
+    fcntl = None
+
+MAGIC = b"ADRLIM\x01\n"
+GLOBAL = "global"
+# magic, slot count, window buckets, window length (s).
+_HEADER = struct.Struct("<8sIId")
+# key digest; request bucket level and refill time; token bucket level and refill time;
+# newest window epoch seen and the spend total over the window ending there.
+_SLOT_HEAD = struct.Struct("<16sddddqd")
+_BUCKETS_AT = 16
+_TOTAL_AT = 48
+_TOTAL = struct.Struct("<qd")
+# One rolling-window bucket: its epoch (window-bucket number since 1970) and spend.
+_WINDOW = struct.Struct("<qd")
+
+
+class BudgetExhausted(RuntimeError):
+    """No model may take the request without exceeding a rate limit or spend window."""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Limits for one key; 0 disables that limit.
+
+    Request and token buckets hold one minute's worth (the burst) and refill continuously;
+    ``max_cost_usd`` caps the estimated spend over the rolling window.
+    """
+
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+    max_cost_usd: float = 0.0
+
+
+class SharedLimits:
+    """Token buckets and rolling spend windows shared by every process on a host.
+
+    State lives in a memory-mapped file, one fixed-size slot per key (``model:<name>``,
+    ``provider:<name>`` or ``global``); the limits themselves come from each process's
+    config. Every read-modify-write holds an exclusive ``flock`` on the file (plus a
+    thread lock, since ``flock`` does not exclude threads sharing a descriptor), so all
+    workers see and update the same counters without a network service.
+
+    The rolling window is ``window_buckets`` sub-windows of ``window_s / window_buckets``
+    seconds: spend older than the window drops out one sub-window at a time. Clocks are
+    wall time, so the file stays valid across restarts.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        limits: Mapping[str, Limit],
+        window_s: float = 3600.0,
+        window_buckets: int = 60,
+        slots: int = 256,
+    ) -> None:
+        if window_s <= 0 or window_buckets < 1:
+            raise ValueError("window_s and window_buckets must be positive")
+        self.path = Path(path)
+        self.limits = dict(limits)
+        self.window_s = float(window_s)
+        self.window_buckets = window_buckets
+        self.slots = slots
+        self._slot_size = _SLOT_HEAD.size + window_buckets * _WINDOW.size
+        self._windows = struct.Struct("<" + "qd" * window_buckets)
+        self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = _HEADER.size + slots * self._slot_size
+        try:
+            with self._locked():
+                current = os.fstat(self._fd).st_size
+                if current == 0:
+                    os.ftruncate(self._fd, size)
+                    os.pwrite(
+                        self._fd, _HEADER.pack(MAGIC, slots, window_buckets, self.window_s), 0
+                    )
+                elif current != size or os.pread(self._fd, _HEADER.size, 0) != _HEADER.pack(
+                    MAGIC, slots, window_buckets, self.window_s
+                ):
+                    raise ValueError(
+                        f"{self.path} was created with a different slots/window layout; "
+                        "remove it or use another path"
+                    )
+            self._map = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self._map.close()
+        os.close(self._fd)
+        self._fd = -1
+
+    def __enter__(self) -> SharedLimits:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def keys_for(self, model: str, provider: str) -> list[str]:
+        """The limited keys a call to ``model`` counts against."""
+        return list(_limited(self.limits, model, provider))
+
+    def acquire(
+        self, model: str, provider: str, tokens: int, cost: float, now: float | None = None
+    ) -> str | None:
+        """Take one request, ``tokens`` tokens and ``cost`` of spend for a call to
+        ``model``, all or nothing.
+
+        Returns ``None`` when admitted, else the first exhausted limit, e.g.
+        ``"provider:openai tokens_per_minute"``, and leaves every counter untouched.
+        """
+        # One lookup of the mapping, which a config reload may replace concurrently.
+        limited = _limited(self.limits, model, provider)
+        if not limited:
+            return None
+        now = time.time() if now is None else now
+        with self._locked():
+            updates = []
+            for key, limit in limited.items():
+                offset = self._slot(key, limit)
+                requests, tokens_left, spent = self._read(offset, limit, now)
+                if limit.requests_per_minute and requests < 1:
+                    return f"{key} requests_per_minute"
+                if limit.tokens_per_minute and tokens_left < tokens:
+                    return f"{key} tokens_per_minute"
+                if limit.max_cost_usd and spent + cost > limit.max_cost_usd:
+                    return f"{key} max_cost_usd"
+                # Disabled buckets are left as they are.
+                if limit.requests_per_minute:
+                    requests -= 1
+                if limit.tokens_per_minute:
+                    tokens_left -= tokens
+                updates.append((offset, requests, tokens_left))
+            for offset, requests, tokens_left in updates:
+                self._write_buckets(offset, requests, tokens_left, now)
+                self._add_cost(offset, cost, now)
+        return None
+
+    def charge(self, model: str, provider: str, cost: float, now: float | None = None) -> None:
+        """Add ``cost`` (negative to refund) to the spend windows without admission
+        checks, e.g. the difference between a call's estimated and actual cost."""
+        limited = _limited(self.limits, model, provider)
+        if not limited or not cost:
+            return
+        now = time.time() if now is None else now
+        with self._locked():
+            for key, limit in limited.items():
+                self._add_cost(self._slot(key, limit), cost, now)
+
+    def usage(self, now: float | None = None) -> dict[str, dict[str, float]]:
+        """Per key: requests and tokens left in the buckets and spend in the window."""
+        now = time.time() if now is None else now
+        limits = self.limits
+        with self._locked():
+            states = {
+                key: self._read(self._slot(key, limit), limit, now) for key, limit in limits.items()
+            }
+        return {
+            key: {"requests_left": requests, "tokens_left": tokens, "window_cost_usd": spent}
+            for key, (requests, tokens, spent) in sorted(states.items())
+        }
+
+    def _locked(self) -> _FileLock:
+        return _FileLock(self._lock, self._fd)
+
+    def _slot(self, key: str, limit: Limit) -> int:
+        """Byte offset of ``key``'s slot, claimed on first use (under the file lock)."""
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        start = int.from_bytes(digest[:8], "little") % self.slots
+        for probe in range(self.slots):
+            offset = _HEADER.size + (start + probe) % self.slots * self._slot_size
+            stored = self._map[offset : offset + 16]
+            if stored == digest:
+                break
+            if stored == bytes(16):
+                now = time.time()
+                _SLOT_HEAD.pack_into(
+                    self._map,
+                    offset,
+                    digest,
+                    limit.requests_per_minute,
+                    now,
+                    limit.tokens_per_minute,
+                    now,
+                    0,
+                    0.0,
+                )
+                break
+        else:
+            raise ValueError(f"{self.path} has no free slot for {key!r}; raise limits.slots")
+        self._offsets[key] = offset
+        return offset
+
+    def _read(self, offset: int, limit: Limit, now: float) -> tuple[float, float, float]:
+        _, requests, requests_at, tokens, tokens_at, _, _ = _SLOT_HEAD.unpack_from(
+            self._map, offset
+        )
+        requests = _refill(requests, requests_at, limit.requests_per_minute, now)
+        tokens = _refill(tokens, tokens_at, limit.tokens_per_minute, now)
+        return requests, tokens, self._roll(offset, now)[1]
+
+    def _write_buckets(self, offset: int, requests: float, tokens: float, now: float) -> None:
+        struct.pack_into("<dddd", self._map, offset + _BUCKETS_AT, requests, now, tokens, now)
+
+    def _roll(self, offset: int, now: float) -> tuple[int, float]:
+        """Advance ``offset``'s window to ``now``; returns the window's epoch and total.
+
+        The total is kept in the slot, so only crossing into a new sub-window re-sums the
+        buckets: once per sub-window rather than on every call.
+        """
+        epoch = self._epoch(now)
+        head, total = _TOTAL.unpack_from(self._map, offset + _TOTAL_AT)
+        if epoch <= head:
+            # Same sub-window, or the clock stepped back: count against the newest one.
+            return head, total
+        n = self.window_buckets
+        base = offset + _SLOT_HEAD.size
+        for expired in range(max(head + 1, epoch - n + 1), epoch + 1):
+            _WINDOW.pack_into(self._map, base + expired % n * _WINDOW.size, expired, 0.0)
+        windows = self._windows.unpack_from(self._map, base)
+        total = sum(
+            cost
+            for at, cost in zip(windows[::2], windows[1::2], strict=True)
+            if epoch - n < at <= epoch
+        )
+        _TOTAL.pack_into(self._map, offset + _TOTAL_AT, epoch, total)
+        return epoch, total
+
+    def _add_cost(self, offset: int, cost: float, now: float) -> None:
+        epoch, total = self._roll(offset, now)
+        at = offset + _SLOT_HEAD.size + epoch % self.window_buckets * _WINDOW.size
+        _, spent = _WINDOW.unpack_from(self._map, at)
+        _WINDOW.pack_into(self._map, at, epoch, spent + cost)
+        _TOTAL.pack_into(self._map, offset + _TOTAL_AT, epoch, total + cost)
+
+    def _epoch(self, now: float) -> int:
+        return int(now // (self.window_s / self.window_buckets))
+
+
+def _limited(limits: Mapping[str, Limit], model: str, provider: str) -> dict[str, Limit]:
+    keys = (f"model:{model}", f"provider:{provider}", GLOBAL)
+    return {key: limits[key] for key in keys if key in limits}
+
+
+def _refill(level: float, updated: float, per_minute: float, now: float) -> float:
+    # Clamped at zero elapsed time, so a clock step backwards never drains a bucket.
+    return min(per_minute, level + max(0.0, now - updated) * per_minute / 60)
+
+
+class _FileLock:
+    __slots__ = ("lock", "fd")
+
+    def __init__(self, lock: threading.Lock, fd: int) -> None:
+        self.lock = lock
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc: object) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.lock.release()
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import bisect
+import cProfile
+import hashlib
+import pstats
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+# Upper bounds in seconds, from 10us (cache lookups, classification) up to 10s (adapters).
+DEFAULT_BUCKETS_S = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STAGES = ("request", "classify", "policy", "cache_lookup", "adapter", "trace")
+PREFIX = "adr_"
+_HELP = {
+    "stage_seconds": "Wall time per routing stage.",
+    "requests_total": "Requests routed by run/arun.",
+    "cache_hits_total": "Requests served from the response cache, by tier.",
+    "fallbacks_total": "Decisions where no model met the budgets and the cheapest was used.",
+    "budget_rejections_total": "Models excluded from a decision by a budget, per model.",
+    "slow_requests_total": "Requests slower than metrics.slow_request_ms.",
+    "throttled_total": "Models skipped at admission by a rate or spend limit, per model.",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory, one bisect and two adds per sample."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS_S) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+@dataclass
+class SlowRequest:
+    prompt_hash: str
+    elapsed_ms: float
+    profile: pstats.Stats | None = None
+    profile_path: str | None = None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: Metrics, stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+
+class _RequestSpan:
+    __slots__ = ("metrics", "prompt", "profile", "profiler", "start")
+
+    def __init__(self, metrics: Metrics, prompt: str, profile: bool) -> None:
+        self.metrics = metrics
+        self.prompt = prompt
+        self.profile = profile
+        self.profiler: cProfile.Profile | None = None
+
+    def __enter__(self) -> None:
+        metrics = self.metrics
+        if self.profile and metrics.profile_sample_rate and metrics._sample():
+            if metrics._profiling.acquire(blocking=False):
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        elapsed = time.perf_counter() - self.start
+        metrics = self.metrics
+        if self.profiler is not None:
+            self.profiler.disable()
+            metrics._profiling.release()
+        metrics.observe("request", elapsed)
+        metrics.inc("requests_total")
+        if metrics.slow_request_ms and elapsed * 1000 >= metrics.slow_request_ms:
+            metrics._slow(self.prompt, elapsed * 1000, self.profiler)
+
+
+class Metrics:
+    """Per-stage timing histograms and counters for the routing hot path.
+
+    ``with metrics.span("classify"): ...`` times a stage on the monotonic clock. While
+    disabled, :meth:`span` returns a shared no-op context manager and :meth:`inc` returns
+    immediately, so instrumented code pays one attribute check per call site.
+
+    Slow requests (``slow_request_ms``) are counted and reported to ``on_slow``. A
+    ``profile_sample_rate`` share of synchronous requests runs under ``cProfile``; when
+    such a request is slow, its profile is written to ``profile_dir`` and passed along.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        buckets_s: Sequence[float] = DEFAULT_BUCKETS_S,
+        slow_request_ms: float = 0.0,
+        profile_sample_rate: float = 0.0,
+        profile_dir: str | None = None,
+        on_slow: Callable[[SlowRequest], None] | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.buckets_s = tuple(buckets_s)
+        self.slow_request_ms = slow_request_ms
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_dir = profile_dir
+        self.on_slow = on_slow
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        # cProfile profiles one thread at a time; concurrent samples are skipped.
+        self._profiling = threading.Lock()
+        self._sampled = 0.0
+
+    def span(self, stage: str) -> _Span | _NoopSpan:
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets_s)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def request(self, prompt: str, profile: bool = True) -> _RequestSpan | _NoopSpan:
+        """Time one request end to end; ``profile=False`` for async requests, whose
+        awaits would attribute other tasks' work to this one."""
+        if not self.enabled:
+            return _NOOP
+        return _RequestSpan(self, prompt, profile)
+
+    def _sample(self) -> bool:
+        # Deterministic 1-in-N sampling: an accumulator crossing 1 selects a request.
+        with self._lock:
+            self._sampled += self.profile_sample_rate
+            if self._sampled >= 1.0:
+                self._sampled -= 1.0
+                return True
+            return False
+
+    def _slow(self, prompt: str, elapsed_ms: float, profiler: cProfile.Profile | None) -> None:
+        self.inc("slow_requests_total")
+        slow = SlowRequest(hashlib.sha256(prompt.encode()).hexdigest()[:16], elapsed_ms)
+        if profiler is not None:
+            slow.profile = pstats.Stats(profiler)
+            if self.profile_dir:
+                path = Path(self.profile_dir)
+                path.mkdir(parents=True, exist_ok=True)
+                stamp = time.strftime("%Y%m%dT%H%M%S")
+                slow.profile_path = str(path / f"slow-{stamp}-{slow.prompt_hash}.prof")
+                profiler.dump_stats(slow.profile_path)
+        if self.on_slow is not None:
+            self.on_slow(slow)
+
+    def snapshot(self) -> dict:
+        """Stage latency summaries (milliseconds) and counters as plain data."""
+        with self._lock:
+            histograms = {
+                stage: (h.count, h.sum, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                for stage, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        return {
+            "stages": {
+                stage: {
+                    "count": count,
+                    "mean_ms": total / count * 1000 if count else 0.0,
+                    "p50_ms": p50 * 1000,
+                    "p95_ms": p95 * 1000,
+                    "p99_ms": p99 * 1000,
+                }
+                for stage, (count, total, p50, p95, p99) in sorted(histograms.items())
+            },
+            "counters": [
+                {"name": name, **dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    def prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = {
+                stage: (h.bounds, list(h.counts), h.sum, h.count)
+                for stage, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        lines = [
+            f"# HELP {PREFIX}stage_seconds {_HELP['stage_seconds']}",
+            f"# TYPE {PREFIX}stage_seconds histogram",
+        ]
+        for stage, (bounds, counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(bounds, counts, strict=False):
+                cumulative += n
+                lines.append(
+                    f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {total:.9g}')
+            lines.append(f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {count}')
+        by_name: dict[str, list] = {}
+        for (name, labels), value in sorted(counters.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, series in by_name.items():
+            lines.append(f"# HELP {PREFIX}{name} {_HELP.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for labels, value in series:
+                rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(
+                    f"{PREFIX}{name}{{{rendered}}} {value:g}"
+                    if labels
+                    else f"{PREFIX}{name} {value:g}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .tokens import count_tokens
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        model = body.get("model", "mock")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        words = f"[mock-server:{model}] handled {count_tokens(prompt)} prompt tokens.".split(" ")
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": len(words),
+            "total_tokens": count_tokens(prompt) + len(words),
+        }
+        if body.get("stream"):
+            self._stream(model, words, usage)
+            return
+        self._json(
+            200,
+            {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model: str, words: list[str], usage: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else f" {word}"}
+            last = i == len(words) - 1
+            event = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": "stop" if last else None}
+                ],
+            }
+            if last:
+                event["usage"] = usage
+            if i and self.server.token_interval_ms:
+                time.sleep(self.server.token_interval_ms / 1000)
+            self._chunk(f"data: {json.dumps(event)}\n\n")
+        self._chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], latency_ms: float, token_interval_ms: float):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.token_interval_ms = token_interval_ms
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+
+class MockOpenAIServer:
+    """Local stand-in for an OpenAI-compatible ``/v1/chat/completions`` endpoint.
+
+    Supports plain and ``"stream": true`` (server-sent events) requests over HTTP/1.1
+    keep-alive, with an optional simulated latency before the first token and between
+    streamed tokens. ``connections`` and ``requests`` count what the server has seen, so
+    connection reuse can be checked and benchmarked without network access.
+
+        with MockOpenAIServer() as server:
+            adapter = OpenAIAdapter(api_key="test", base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        token_interval_ms: float = 0.0,
+    ) -> None:
+        self._server = _Server((host, port), latency_ms, token_interval_ms)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def start(self) -> MockOpenAIServer:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="mock-openai-server", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> MockOpenAIServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -33,3 +34,64 @@ class ModelResponse:
     latency_ms: float
     estimated_cost_usd: float
     metadata: dict[str, Any] = field(default_factory=dict)
+    ttft_ms: float | None = None
+    inter_token_ms: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ModelColumns:
+    """Column layout of a model registry, built once and shared across batch scoring.
+
+    Besides one column per attribute, it holds the model indices sorted by cost per 1k
+    tokens, latency and context window (ties by registry order) with the sorted values,
+    so budget and context filters are binary searches instead of scans.
+    """
+
+    models: tuple[ModelSpec, ...]
+    quality: tuple[float, ...]
+    cost_per_1k: tuple[float, ...]
+    latency_ms: tuple[float, ...]
+    context_tokens: tuple[int, ...]
+    cheapest: int
+    by_cost: tuple[int, ...] = ()
+    sorted_cost: tuple[float, ...] = ()
+    by_latency: tuple[int, ...] = ()
+    sorted_latency: tuple[float, ...] = ()
+    by_context: tuple[int, ...] = ()
+    sorted_context: tuple[int, ...] = ()
+
+    @classmethod
+    def from_specs(cls, models: Sequence[ModelSpec]) -> ModelColumns:
+        if not models:
+            raise ValueError("No models available")
+        cost_per_1k = tuple(m.expected_cost_per_1k_tokens for m in models)
+        latency_ms = tuple(m.expected_latency_ms for m in models)
+        context_tokens = tuple(m.max_context_tokens for m in models)
+        by_cost = order_by(cost_per_1k)
+        by_latency = order_by(latency_ms)
+        by_context = order_by(context_tokens)
+        return cls(
+            models=tuple(models),
+            quality=tuple(m.expected_quality for m in models),
+            cost_per_1k=cost_per_1k,
+            latency_ms=latency_ms,
+            context_tokens=context_tokens,
+            cheapest=by_cost[0],
+            by_cost=by_cost,
+            sorted_cost=tuple(cost_per_1k[i] for i in by_cost),
+            by_latency=by_latency,
+            sorted_latency=tuple(latency_ms[i] for i in by_latency),
+            by_context=by_context,
+            sorted_context=tuple(context_tokens[i] for i in by_context),
+        )
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+
+def order_by(values: Sequence[float], descending: bool = False) -> tuple[int, ...]:
+    """Indices of ``values`` sorted by value, ties in index order either way."""
+    if descending:
+        return tuple(sorted(range(len(values)), key=lambda i: (-values[i], i)))
+    # sorted() is stable, so equal values keep index order.
+    return tuple(sorted(range(len(values)), key=values.__getitem__))
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
 
-from .models import ModelSpec, RoutingDecision
+from .models import ModelColumns, ModelSpec, RoutingDecision, order_by
+from .tokens import count_tokens
 
 
 class BasePolicy(ABC):
@@ -13,131 +17,458 @@ class BasePolicy(ABC):
         self,
         prompt: str,
         task_type: str,
-        models: list[ModelSpec],
+        models: Sequence[ModelSpec] | ModelColumns,
         budget_cost: float,
         budget_latency: float,
     ) -> RoutingDecision:
         raise NotImplementedError
 
+    def choose_batch(
+        self,
+        prompts: Sequence[str],
+        task_types: Sequence[str],
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> list[RoutingDecision]:
+        """Route many prompts at once. Policies override this with a columnar implementation."""
+        specs = list(models.models if isinstance(models, ModelColumns) else models)
+        return [
+            self.choose(prompt, task_type, specs, budget_cost, budget_latency)
+            for prompt, task_type in zip(prompts, task_types, strict=True)
+        ]
+
+    def rank(
+        self,
+        prompt: str,
+        task_type: str,
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> list[RoutingDecision]:
+        """Viable decisions best-first; the first is always what :meth:`choose` returns.
 
-def _estimate_cost(prompt: str, model: ModelSpec) -> float:
-    token_estimate = max(20, len(prompt.split()) * 3)
-    return token_estimate / 1000 * model.expected_cost_per_1k_tokens
+        Policies without a ranking only offer their single choice.
+        """
+        return [self.choose(prompt, task_type, models, budget_cost, budget_latency)]
 
 
-class RulesPolicy(BasePolicy):
-    name = "rules"
+@dataclass(frozen=True)
+class PolicyContext:
+    """Everything about a registry and budget that does not depend on the prompt."""
+
+    cols: ModelColumns
+    budget_cost: float
+    budget_latency: float
+    in_latency: tuple[int, ...]
+    min_context: int
+    max_context: int
+    terms: dict[str, tuple[float, ...]] = field(default_factory=dict)
+    latency_ok: tuple[bool, ...] = ()
+
+    def costs(self, tokens: int) -> list[float]:
+        scale = tokens / 1000
+        return [scale * c for c in self.cols.cost_per_1k]
+
+    def fits(self, i: int, tokens: int) -> bool:
+        return tokens <= self.min_context or tokens <= self.cols.context_tokens[i]
+
+    def viable(self, i: int, tokens: int) -> bool:
+        """Within both budgets and the context window; the same arithmetic as :meth:`costs`."""
+        return (
+            self.latency_ok[i]
+            and tokens / 1000 * self.cols.cost_per_1k[i] <= self.budget_cost
+            and self.fits(i, tokens)
+        )
+
+    def candidates(self, tokens: int) -> list[int]:
+        """Indices of all viable models in registry order.
+
+        Each constraint selects a range of one of the registry's sorted indexes; only the
+        smallest range is walked and checked against the other two.
+        """
+        cols = self.cols
+        n = len(cols)
+        scale = tokens / 1000
+        within_cost = n
+        if scale > 0:
+            # Locate the cut by division, then settle it with the exact comparison.
+            sorted_cost = cols.sorted_cost
+            within_cost = bisect_right(sorted_cost, self.budget_cost / scale)
+            while within_cost < n and scale * sorted_cost[within_cost] <= self.budget_cost:
+                within_cost += 1
+            while within_cost > 0 and scale * sorted_cost[within_cost - 1] > self.budget_cost:
+                within_cost -= 1
+        fit_from = 0 if tokens <= self.min_context else bisect_left(cols.sorted_context, tokens)
+        ranges = (
+            (within_cost, cols.by_cost[:within_cost]),
+            (n - fit_from, cols.by_context[fit_from:]),
+            (len(self.in_latency), self.in_latency),
+        )
+        smallest = min(ranges, key=lambda r: r[0])[1]
+        return sorted(i for i in smallest if self.viable(i, tokens))
+
+    def fitting_by_cost(self, tokens: int) -> list[int]:
+        if tokens <= self.min_context:
+            return list(self.cols.by_cost)
+        return [i for i in self.cols.by_cost if tokens <= self.cols.context_tokens[i]]
+
+    def cheapest_fitting(self, tokens: int) -> int:
+        if tokens <= self.min_context:
+            return self.cols.cheapest
+        return next(i for i in self.cols.by_cost if tokens <= self.cols.context_tokens[i])
+
+
+class ColumnarPolicy(BasePolicy):
+    """A policy split into prompt-independent :meth:`prepare`, per-prompt :meth:`select`
+    and :meth:`describe` steps.
+
+    The split lets the same selection run over a whole batch against one precomputed
+    context, and lets a routing table replay :meth:`select` offline and still build
+    decisions through the live :meth:`describe`.
+    """
+
+    # Prompt character lengths at which ``select`` changes behaviour.
+    length_thresholds: tuple[int, ...] = ()
+    # Whether :meth:`breakpoints` is exact, so a routing table can replace ``select``.
+    tabulable: bool = True
+
+    # The last prepared context, reused while the registry object and budgets are the same.
+    _prepared: tuple[ModelColumns, float, float, PolicyContext] | None = None
+
+    def prepare(
+        self,
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> PolicyContext:
+        cached = self._prepared
+        if (
+            cached is not None
+            and cached[0] is models
+            and cached[1] == budget_cost
+            and cached[2] == budget_latency
+        ):
+            return cached[3]
+        cols = models if isinstance(models, ModelColumns) else ModelColumns.from_specs(models)
+        in_latency = tuple(
+            sorted(cols.by_latency[: bisect_right(cols.sorted_latency, budget_latency)])
+        )
+        latency_ok = [False] * len(cols)
+        for i in in_latency:
+            latency_ok[i] = True
+        ctx = PolicyContext(
+            cols=cols,
+            budget_cost=budget_cost,
+            budget_latency=budget_latency,
+            in_latency=in_latency,
+            min_context=cols.sorted_context[0],
+            max_context=cols.sorted_context[-1],
+            terms=self._terms(cols),
+            latency_ok=tuple(latency_ok),
+        )
+        if isinstance(models, ModelColumns):
+            self._prepared = (models, budget_cost, budget_latency, ctx)
+        return ctx
+
+    def _terms(self, cols: ModelColumns) -> dict[str, tuple[float, ...]]:
+        return {}
+
+    @abstractmethod
+    def select(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> tuple[int, str]:
+        """Index of the chosen model and the rationale branch that chose it."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ranked(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> list[tuple[int, str]]:
+        """Every viable ``(index, branch)`` best-first, starting with :meth:`select`'s."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def describe(
+        self, ctx: PolicyContext, index: int, branch: str, task_type: str, tokens: int
+    ) -> RoutingDecision:
+        raise NotImplementedError
+
+    def breakpoints(self, ctx: PolicyContext, task_type: str) -> list[float]:
+        """Token counts near which :meth:`select` may change its answer.
+
+        Between consecutive breakpoints the selection must be constant. Budget and
+        context-window cutoffs apply to every columnar policy.
+        """
+        points = [float(c) for c in ctx.cols.context_tokens]
+        points += [ctx.budget_cost * 1000 / c for c in ctx.cols.cost_per_1k if c > 0]
+        return points
 
     def choose(
         self,
         prompt: str,
         task_type: str,
-        models: list[ModelSpec],
+        models: Sequence[ModelSpec] | ModelColumns,
         budget_cost: float,
         budget_latency: float,
     ) -> RoutingDecision:
-        if not models:
-            raise ValueError("No models available")
-        length = len(prompt)
+        return self.choose_batch([prompt], [task_type], models, budget_cost, budget_latency)[0]
 
-        candidates = []
-        for m in models:
-            est_cost = _estimate_cost(prompt, m)
-            if est_cost <= budget_cost and m.expected_latency_ms <= budget_latency:
-                candidates.append((m, est_cost))
+    def choose_batch(
+        self,
+        prompts: Sequence[str],
+        task_types: Sequence[str],
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> list[RoutingDecision]:
+        ctx = self.prepare(models, budget_cost, budget_latency)
+        decisions = []
+        for prompt, task_type in zip(prompts, task_types, strict=True):
+            tokens = prompt_tokens(prompt, ctx.max_context)
+            index, branch = self.select(ctx, task_type, tokens, len(prompt))
+            decisions.append(self.describe(ctx, index, branch, task_type, tokens))
+        return decisions
 
-        if not candidates:
-            fallback = min(models, key=lambda m: m.expected_cost_per_1k_tokens)
-            cost = _estimate_cost(prompt, fallback)
-            return RoutingDecision(
-                model_name=fallback.name,
-                policy=self.name,
-                task_type=task_type,
-                rationale="No candidate met budget; picked cheapest model.",
-                expected_quality=fallback.expected_quality,
-                expected_cost=cost,
-                expected_latency_ms=fallback.expected_latency_ms,
-            )
+    def rank(
+        self,
+        prompt: str,
+        task_type: str,
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> list[RoutingDecision]:
+        ctx = self.prepare(models, budget_cost, budget_latency)
+        tokens = prompt_tokens(prompt, ctx.max_context)
+        return [
+            self.describe(ctx, index, branch, task_type, tokens)
+            for index, branch in self.ranked(ctx, task_type, tokens, len(prompt))
+        ]
+
+
+def prompt_tokens(prompt: str, max_context: int) -> int:
+    tokens = count_tokens(prompt)
+    if tokens > max_context:
+        raise ValueError(f"Prompt of {tokens} tokens exceeds the context window of every model")
+    return tokens
 
+
+def _decision(
+    policy: str,
+    task_type: str,
+    model: ModelSpec,
+    cost: float,
+    rationale: str,
+) -> RoutingDecision:
+    return RoutingDecision(
+        model_name=model.name,
+        policy=policy,
+        task_type=task_type,
+        rationale=rationale,
+        expected_quality=model.expected_quality,
+        expected_cost=cost,
+        expected_latency_ms=model.expected_latency_ms,
+    )
+
+
+class RulesPolicy(ColumnarPolicy):
+    name = "rules"
+    length_thresholds = (400,)
+
+    FALLBACK = "No candidate met budget; picked cheapest model."
+
+    def _terms(self, cols: ModelColumns) -> dict[str, tuple[float, ...]]:
+        target_gap = tuple(abs(q - 0.8) for q in cols.quality)
+        return {
+            "target_gap": target_gap,
+            "by_quality": order_by(cols.quality, descending=True),
+            "by_target_gap": order_by(target_gap),
+        }
+
+    def _order(self, ctx: PolicyContext, task_type: str, prompt_chars: int) -> tuple[int, ...]:
+        """Models best-first under :meth:`_rule`'s key (cost order stands in for cost)."""
         if task_type == "code":
-            chosen, cost = max(candidates, key=lambda x: x[0].expected_quality)
-            rationale = "Code tasks prioritize quality within budget."
-        elif task_type == "writing" and length < 400:
-            chosen, cost = min(candidates, key=lambda x: x[0].expected_latency_ms)
-            rationale = "Short writing prompt prioritized low latency."
-        elif task_type == "data":
-            chosen, cost = min(candidates, key=lambda x: x[1])
-            rationale = "Data tasks default to lower estimated cost."
-        else:
-            chosen, cost = sorted(candidates, key=lambda x: abs(x[0].expected_quality - 0.8))[0]
-            rationale = "Balanced default selection by expected quality target."
-
-        return RoutingDecision(
-            model_name=chosen.name,
-            policy=self.name,
-            task_type=task_type,
-            rationale=rationale,
-            expected_quality=chosen.expected_quality,
-            expected_cost=cost,
-            expected_latency_ms=chosen.expected_latency_ms,
+            return ctx.terms["by_quality"]
+        if task_type == "writing" and prompt_chars < 400:
+            return ctx.cols.by_latency
+        if task_type == "data":
+            return ctx.cols.by_cost
+        return ctx.terms["by_target_gap"]
+
+    def _rule(
+        self, ctx: PolicyContext, task_type: str, prompt_chars: int, costs: list[float]
+    ) -> tuple[Callable[[int], float], bool, str]:
+        """Sort key, whether higher is better, and rationale for a task type."""
+        if task_type == "code":
+            return (
+                ctx.cols.quality.__getitem__,
+                True,
+                "Code tasks prioritize quality within budget.",
+            )
+        if task_type == "writing" and prompt_chars < 400:
+            return (
+                ctx.cols.latency_ms.__getitem__,
+                False,
+                "Short writing prompt prioritized low latency.",
+            )
+        if task_type == "data":
+            return costs.__getitem__, False, "Data tasks default to lower estimated cost."
+        return (
+            ctx.terms["target_gap"].__getitem__,
+            False,
+            "Balanced default selection by expected quality target.",
         )
 
+    def select(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> tuple[int, str]:
+        # The first viable model in the task's precomputed order is the argmax; usually
+        # only a few models are checked instead of the whole registry.
+        order = self._order(ctx, task_type, prompt_chars)
+        for pos, i in enumerate(order):
+            if ctx.viable(i, tokens):
+                if order is ctx.cols.by_cost:
+                    i = self._lowest_index_at_cost(ctx, order, pos, i, tokens)
+                return i, self._rule(ctx, task_type, prompt_chars, [])[2]
+        return ctx.cheapest_fitting(tokens), self.FALLBACK
+
+    @staticmethod
+    def _lowest_index_at_cost(
+        ctx: PolicyContext, order: tuple[int, ...], pos: int, best: int, tokens: int
+    ) -> int:
+        # Different prices can round to the same prompt cost; min() over the costs would
+        # then pick the lowest registry index among them.
+        scale = tokens / 1000
+        cost = scale * ctx.cols.cost_per_1k[best]
+        for j in order[pos + 1 :]:
+            if scale * ctx.cols.cost_per_1k[j] != cost:
+                break
+            if j < best and ctx.viable(j, tokens):
+                best = j
+        return best
+
+    def ranked(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> list[tuple[int, str]]:
+        costs = ctx.costs(tokens)
+        candidates = ctx.candidates(tokens)
+        if not candidates:
+            return [(i, self.FALLBACK) for i in ctx.fitting_by_cost(tokens)]
+        key, higher_is_better, rationale = self._rule(ctx, task_type, prompt_chars, costs)
+        # sorted() is stable in both directions, so ties keep registry order like max/min.
+        return [(i, rationale) for i in sorted(candidates, key=key, reverse=higher_is_better)]
+
+    def describe(
+        self, ctx: PolicyContext, index: int, branch: str, task_type: str, tokens: int
+    ) -> RoutingDecision:
+        cost = tokens / 1000 * ctx.cols.cost_per_1k[index]
+        return _decision(self.name, task_type, ctx.cols.models[index], cost, branch)
 
-class ScorePolicy(BasePolicy):
+
+class ScorePolicy(ColumnarPolicy):
     name = "score"
 
+    FALLBACK = "No model fit budget constraints; used cheapest fallback."
+
     def __init__(self, quality_weight: float, cost_weight: float, latency_weight: float) -> None:
         self.quality_weight = quality_weight
         self.cost_weight = cost_weight
         self.latency_weight = latency_weight
 
-    def choose(
-        self,
-        prompt: str,
-        task_type: str,
-        models: list[ModelSpec],
-        budget_cost: float,
-        budget_latency: float,
-    ) -> RoutingDecision:
-        if not models:
-            raise ValueError("No models available")
-
-        viable: list[tuple[ModelSpec, float, float]] = []
-        for model in models:
-            est_cost = _estimate_cost(prompt, model)
-            if est_cost <= budget_cost and model.expected_latency_ms <= budget_latency:
-                utility = (
-                    self.quality_weight * model.expected_quality
-                    - self.cost_weight * est_cost
-                    - self.latency_weight * (model.expected_latency_ms / 1000)
-                )
-                if task_type == "reasoning":
-                    utility += 0.05 * model.expected_quality
-                viable.append((model, est_cost, utility))
+    def _terms(self, cols: ModelColumns) -> dict[str, tuple[float, ...]]:
+        # Prompt-independent utility terms, evaluated once per registry in the same
+        # operation order as the scalar formula so results are bit-identical.
+        terms = {
+            "quality": tuple(self.quality_weight * q for q in cols.quality),
+            "latency": tuple(self.latency_weight * (lat / 1000) for lat in cols.latency_ms),
+            "reasoning_bonus": tuple(0.05 * q for q in cols.quality),
+        }
+        # Utility at zero cost bounds the utility at any non-negative cost, so walking
+        # models by descending bound can stop once the bound drops below the best found.
+        for bounds_key, order_key, task_type in (
+            ("bound", "by_bound", ""),
+            ("reasoning_bound", "by_reasoning_bound", "reasoning"),
+        ):
+            bounds = tuple(self._utility_terms(terms, i, 0.0, task_type) for i in range(len(cols)))
+            terms[bounds_key] = bounds
+            terms[order_key] = order_by(bounds, descending=True)
+        return terms
+
+    def _utility_terms(
+        self, terms: dict[str, tuple[float, ...]], i: int, cost: float, task_type: str
+    ) -> float:
+        utility = terms["quality"][i] - self.cost_weight * cost - terms["latency"][i]
+        if task_type == "reasoning":
+            utility += terms["reasoning_bonus"][i]
+        return utility
+
+    def _utility(self, ctx: PolicyContext, i: int, cost: float, task_type: str) -> float:
+        return self._utility_terms(ctx.terms, i, cost, task_type)
 
+    def select(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> tuple[int, str]:
+        scale = tokens / 1000
+        cost_per_1k = ctx.cols.cost_per_1k
+        if self.cost_weight >= 0 and ctx.cols.sorted_cost[0] >= 0:
+            reasoning = task_type == "reasoning"
+            bounds = ctx.terms["reasoning_bound" if reasoning else "bound"]
+            order = ctx.terms["by_reasoning_bound" if reasoning else "by_bound"]
+        else:
+            # A negative cost term can raise utility above the bound: check every model.
+            bounds, order = (), ctx.candidates(tokens)
+        best = -1
+        best_utility = 0.0
+        for i in order:
+            # Equal bounds can still tie the best utility at a lower index, so only a
+            # strictly smaller bound ends the search.
+            if bounds and best >= 0 and bounds[i] < best_utility:
+                break
+            if not ctx.viable(i, tokens):
+                continue
+            utility = self._utility(ctx, i, scale * cost_per_1k[i], task_type)
+            # max() semantics: the lowest registry index wins a tie.
+            if best < 0 or utility > best_utility or (utility == best_utility and i < best):
+                best, best_utility = i, utility
+        if best < 0:
+            return ctx.cheapest_fitting(tokens), self.FALLBACK
+        return best, ""
+
+    def ranked(
+        self, ctx: PolicyContext, task_type: str, tokens: int, prompt_chars: int
+    ) -> list[tuple[int, str]]:
+        costs = ctx.costs(tokens)
+        viable = [(i, self._utility(ctx, i, costs[i], task_type)) for i in ctx.candidates(tokens)]
         if not viable:
-            cheapest = min(models, key=lambda m: m.expected_cost_per_1k_tokens)
-            cost = _estimate_cost(prompt, cheapest)
-            return RoutingDecision(
-                model_name=cheapest.name,
-                policy=self.name,
-                task_type=task_type,
-                rationale="No model fit budget constraints; used cheapest fallback.",
-                expected_quality=cheapest.expected_quality,
-                expected_cost=cost,
-                expected_latency_ms=cheapest.expected_latency_ms,
-            )
+            return [(i, self.FALLBACK) for i in ctx.fitting_by_cost(tokens)]
+        return [(i, "") for i, _ in sorted(viable, key=lambda v: v[1], reverse=True)]
 
-        chosen, cost, utility = max(viable, key=lambda v: v[2])
-        return RoutingDecision(
-            model_name=chosen.name,
-            policy=self.name,
-            task_type=task_type,
-            rationale=(
-                f"Selected via utility score={utility:.3f} using weights "
-                f"q={self.quality_weight}, c={self.cost_weight}, l={self.latency_weight}."
-            ),
-            expected_quality=chosen.expected_quality,
-            expected_cost=cost,
-            expected_latency_ms=chosen.expected_latency_ms,
+    def describe(
+        self, ctx: PolicyContext, index: int, branch: str, task_type: str, tokens: int
+    ) -> RoutingDecision:
+        cost = tokens / 1000 * ctx.cols.cost_per_1k[index]
+        model = ctx.cols.models[index]
+        if branch:
+            return _decision(self.name, task_type, model, cost, branch)
+        utility = self._utility(ctx, index, cost, task_type)
+        return _decision(
+            self.name,
+            task_type,
+            model,
+            cost,
+            f"Selected via utility score={utility:.3f} using weights "
+            f"q={self.quality_weight}, c={self.cost_weight}, l={self.latency_weight}.",
         )
+
+    def breakpoints(self, ctx: PolicyContext, task_type: str) -> list[float]:
+        # Utilities are linear in the token count, so the argmax can only change where
+        # two models' utility lines cross.
+        points = super().breakpoints(ctx, task_type)
+        n = len(ctx.cols)
+        intercepts = ctx.terms["reasoning_bound" if task_type == "reasoning" else "bound"]
+        slopes = [-self.cost_weight * c / 1000 for c in ctx.cols.cost_per_1k]
+        for i in range(n):
+            for j in range(i + 1, n):
+                if slopes[i] != slopes[j]:
+                    points.append((intercepts[j] - intercepts[i]) / (slopes[i] - slopes[j]))
+        return points
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict
+from itertools import islice
+from typing import Any
+
+from .config import RouterConfig, default_config
+from .router import DecisionRouter
+
+_worker_router: DecisionRouter | None = None
+
+
+def _init_worker(config: RouterConfig) -> None:
+    global _worker_router
+    _worker_router = DecisionRouter(config)
+    # Warm the classifier pattern, token memo and policy before real traffic arrives.
+    _worker_router.explain("warm up")
+
+
+def _route_chunk(prompts: list[str], execute: bool) -> list[dict[str, Any]]:
+    router = _worker_router
+    if router is None:
+        raise RuntimeError("RouterPool worker was not initialized")
+    if not execute:
+        return [asdict(d) for d in router.explain_batch(prompts)]
+    results = router.run_batch(prompts)
+    # Pool workers exit without running atexit hooks, so write this chunk's traces now.
+    router.trace.flush()
+    return results
+
+
+class RouterPool:
+    """Shards prompts across a process pool of pre-warmed routers.
+
+    Each worker builds its own :class:`DecisionRouter` from ``config`` once, at start.
+    Prompts are sent in chunks of ``chunk_size`` with at most two chunks in flight per
+    worker, so memory stays bounded on large inputs; results come back in input order.
+    """
+
+    def __init__(
+        self, config: RouterConfig | None = None, workers: int = 2, chunk_size: int = 64
+    ) -> None:
+        self.config = config or default_config()
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.config,)
+        )
+
+    def map(self, prompts: Iterable[str], execute: bool = True) -> Iterator[dict[str, Any]]:
+        """Route (and, with ``execute``, run) ``prompts``; yields one result per prompt."""
+        it = iter(prompts)
+        pending: deque[Future[list[dict[str, Any]]]] = deque()
+        while True:
+            while len(pending) < 2 * self.workers:
+                chunk = list(islice(it, self.chunk_size))
+                if not chunk:
+                    break
+                pending.append(self._executor.submit(_route_chunk, chunk, execute))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> RouterPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from .router import DecisionRouter
+
+# Stands in for the id of an input record without a prompt in the pending queue.
+_SKIPPED = object()
+
+
+@dataclass
+class ReplayProgress:
+    records: int
+    offset: int
+    output_offset: int
+    elapsed_s: float
+    skipped: int = 0
+
+
+def iter_jsonl_offsets(
+    path: str | Path, offset: int = 0, field: str = "prompt"
+) -> Iterator[tuple[dict[str, Any], int]]:
+    """Stream ``(record, end_offset)`` pairs from a JSONL file, starting at byte ``offset``.
+
+    ``end_offset`` is the byte position just after the record's line, i.e. where a resumed
+    replay should start. Bare JSON strings become ``{field: value}``.
+    """
+    with Path(path).open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield (record if isinstance(record, dict) else {field: record}), offset
+
+
+def checkpoint_path(output_path: str | Path) -> Path:
+    return Path(f"{output_path}.checkpoint")
+
+
+def replay(
+    router: DecisionRouter,
+    input_path: str | Path,
+    output_path: str | Path,
+    field: str = "prompt",
+    execute: bool = True,
+    offset: int = 0,
+    resume: bool = False,
+    batch_size: int = 256,
+    progress_every: int = 10_000,
+    on_progress: Callable[[ReplayProgress], None] | None = None,
+) -> ReplayProgress:
+    """Re-route a JSONL request log into a JSONL results file in constant memory.
+
+    Every ``progress_every`` records the output is flushed and ``<output>.checkpoint``
+    records the input and output byte offsets reached. ``resume=True`` truncates the
+    output back to the last checkpoint and continues from the matching input offset, so
+    an interrupted replay neither skips nor duplicates records. Records without ``field``
+    are not routed and are counted in ``skipped``.
+    """
+    checkpoint = checkpoint_path(output_path)
+    records = output_offset = skipped = 0
+    if resume and checkpoint.exists():
+        state = json.loads(checkpoint.read_text(encoding="utf-8"))
+        offset, records, output_offset = state["offset"], state["records"], state["output_offset"]
+        skipped = state.get("skipped", 0)
+    pending: deque[tuple[Any, int]] = deque()
+
+    def prompts() -> Iterator[str]:
+        for record, end in iter_jsonl_offsets(input_path, offset, field):
+            if field not in record:
+                pending.append((_SKIPPED, end))
+                continue
+            pending.append((record.get("id"), end))
+            yield record[field]
+
+    start = time.perf_counter()
+    progress = ReplayProgress(records, offset, output_offset, 0.0, skipped)
+    out_path = Path(output_path)
+    with out_path.open("r+b" if resume and out_path.exists() else "wb") as out:
+        out.truncate(output_offset)
+        out.seek(output_offset)
+        for result in router.route_stream(prompts(), execute=execute, batch_size=batch_size):
+            record_id = _next_routed(pending, progress)
+            row = {"id": record_id, **result} if record_id is not None else result
+            out.write(json.dumps(row).encode() + b"\n")
+            progress.records += 1
+            if progress.records % progress_every == 0:
+                _checkpoint(checkpoint, out, progress, start)
+                if on_progress is not None:
+                    on_progress(progress)
+        # Only skipped records can follow the last routed one.
+        while pending:
+            _, progress.offset = pending.popleft()
+            progress.skipped += 1
+        _checkpoint(checkpoint, out, progress, start)
+    return progress
+
+
+def _next_routed(pending: deque[tuple[Any, int]], progress: ReplayProgress) -> Any:
+    """Pop up to the next routed record, counting skipped ones; returns its id.
+
+    Skipped records are accounted in input order, so a checkpoint's ``skipped`` covers
+    exactly the records before its ``offset``.
+    """
+    while True:
+        record_id, progress.offset = pending.popleft()
+        if record_id is not _SKIPPED:
+            return record_id
+        progress.skipped += 1
+
+
+def _checkpoint(path: Path, out: BinaryIO, progress: ReplayProgress, start: float) -> None:
+    out.flush()
+    progress.output_offset = out.tell()
+    progress.elapsed_s = time.perf_counter() - start
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(asdict(progress)), encoding="utf-8")
+    os.replace(tmp, path)
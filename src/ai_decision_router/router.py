@@ -1,19 +1,98 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import asdict, dataclass, replace
+from itertools import islice
 
 from .adapters import BaseAdapter, MockAdapter, OpenAIAdapter
-from .classifier import classify_task
+from .batching import MicroBatcher
+from .cache import NearDuplicateCache, ResponseCache, SQLiteCacheBackend, cache_key
+from .classifier import classify_many, classify_task
 from .config import RouterConfig, default_config
-from .models import ModelSpec, RoutingDecision
-from .policies import BasePolicy, RulesPolicy, ScorePolicy
+from .latency import LatencyTracker
+from .learned_policy import LearnedPolicy
+from .limits import GLOBAL, BudgetExhausted, Limit, SharedLimits
+from .metrics import Metrics
+from .models import ModelColumns, ModelResponse, ModelSpec, RoutingDecision
+from .policies import BasePolicy, ColumnarPolicy, RulesPolicy, ScorePolicy
+from .routing_table import MAX_MODELS, RoutingTable
+from .tokens import count_tokens
 from .tracing import TraceLogger
 
 
-class DecisionRouter:
-    def __init__(self, config: RouterConfig | None = None) -> None:
-        self.config = config or default_config()
-        self.models: dict[str, ModelSpec] = {
+def build_policy(config: RouterConfig) -> BasePolicy:
+    policy_name = config.policy.name.lower()
+    if policy_name == "score":
+        return ScorePolicy(
+            quality_weight=config.policy.quality_weight,
+            cost_weight=config.policy.cost_weight,
+            latency_weight=config.policy.latency_weight,
+        )
+    if policy_name == "learned":
+        return LearnedPolicy.load(
+            config.policy.model_path,
+            quality_weight=config.policy.quality_weight,
+            cost_weight=config.policy.cost_weight,
+            latency_weight=config.policy.latency_weight,
+        )
+    return RulesPolicy()
+
+
+def build_limits(config: RouterConfig) -> dict[str, Limit]:
+    """Per-key limits for :class:`SharedLimits` from the ``[limits]`` config section."""
+    cfg = config.limits
+    limits = {f"model:{name}": Limit(**c.model_dump()) for name, c in cfg.models.items()}
+    limits.update(
+        {f"provider:{name}": Limit(**c.model_dump()) for name, c in cfg.providers.items()}
+    )
+    if cfg.max_cost_usd:
+        limits[GLOBAL] = Limit(max_cost_usd=cfg.max_cost_usd)
+    return limits
+
+
+@dataclass
+class ResponseStream:
+    """Text chunks of one :meth:`DecisionRouter.run_stream` call, in arrival order.
+
+    ``result`` holds the same dict :meth:`DecisionRouter.run` returns (with ``ttft_ms``
+    and ``inter_token_ms``) once the stream has been consumed.
+    """
+
+    decision: RoutingDecision
+    chunks: Iterator[str] = iter(())
+    result: dict | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        return self.chunks
+
+
+@dataclass(frozen=True)
+class RouterSnapshot:
+    """Immutable routing state derived from one config: registry, policy, routing table.
+
+    A request captures the current snapshot once and uses it throughout, so swapping in
+    a new snapshot never changes the state under an in-flight request.
+    """
+
+    config: RouterConfig
+    models: dict[str, ModelSpec]
+    columns: ModelColumns | None
+    policy: BasePolicy
+    routing_table: RoutingTable | None
+    policy_fingerprint: str
+    version: int = 0
+
+    @classmethod
+    def build(cls, config: RouterConfig, version: int = 0) -> RouterSnapshot:
+        config = config.model_copy(deep=True)
+        models = {
             m.name: ModelSpec(
                 name=m.name,
                 provider=m.provider,
@@ -22,59 +101,991 @@ class DecisionRouter:
                 expected_latency_ms=m.expected_latency_ms,
                 max_context_tokens=m.max_context_tokens,
             )
-            for m in self.config.model_registry
+            for m in config.model_registry
         }
-        self.trace = TraceLogger(self.config.trace.output_path, enabled=self.config.trace.enabled)
-        self._cache: dict[str, dict] = {}
+        columns = ModelColumns.from_specs(list(models.values())) if models else None
+        policy = build_policy(config)
+        fingerprint = json.dumps(config.policy.model_dump(), sort_keys=True)
+        if isinstance(policy, LearnedPolicy):
+            # Retraining changes decisions without changing the config.
+            fingerprint += policy.fingerprint
+        return cls(
+            config=config,
+            models=models,
+            columns=columns,
+            policy=policy,
+            routing_table=_build_routing_table(config, columns, policy),
+            policy_fingerprint=fingerprint,
+            version=version,
+        )
+
+
+def _build_routing_table(
+    config: RouterConfig, columns: ModelColumns | None, policy: BasePolicy
+) -> RoutingTable | None:
+    # Observed latencies change the registry on every response, so only a static
+    # registry can be compiled ahead of time.
+    if (
+        not config.routing_table
+        or columns is None
+        or len(columns) > MAX_MODELS
+        or config.policy.latency_source != "static"
+        or not isinstance(policy, ColumnarPolicy)
+        or not policy.tabulable
+    ):
+        return None
+    return RoutingTable(policy, columns, config.budgets.max_cost_usd, config.budgets.max_latency_ms)
+
+
+class _ProviderSemaphore:
+    """A provider's concurrency semaphore, resized in place when a reload changes its limit.
+
+    Replacing it would let calls still holding permits on the old semaphore run alongside
+    a full set on the new one. Raising the limit releases the extra permits; lowering it
+    starts a task that takes the surplus permits as calls finish and keeps them, so
+    concurrency drains down to the new limit without ever exceeding the old one.
+    """
+
+    __slots__ = ("semaphore", "limit", "version", "_absorbers")
+
+    def __init__(self, limit: int, version: int) -> None:
+        self.semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.version = version
+        self._absorbers: set[asyncio.Task] = set()
+
+    def resize(self, limit: int, version: int) -> None:
+        self.version = version
+        surplus, self.limit = self.limit - limit, limit
+        for _ in range(-surplus):
+            self.semaphore.release()
+        if surplus > 0:
+            # The loop keeps only weak references to tasks; finished ones are dropped.
+            task = asyncio.ensure_future(self._absorb(surplus))
+            self._absorbers.add(task)
+            task.add_done_callback(self._absorbers.discard)
+
+    async def _absorb(self, permits: int) -> None:
+        for _ in range(permits):
+            await self.semaphore.acquire()
+
+
+class DecisionRouter:
+    def __init__(
+        self,
+        config: RouterConfig | None = None,
+        adapters: dict[str, BaseAdapter] | None = None,
+    ) -> None:
+        self._snapshot = RouterSnapshot.build(config or default_config())
+        self.adapters = dict(adapters or {})
+        self.latency = LatencyTracker(alpha=self.config.policy.latency_ewma_alpha)
+        self.ttft = LatencyTracker(alpha=self.config.policy.latency_ewma_alpha)
+        self.inter_token = LatencyTracker(alpha=self.config.policy.latency_ewma_alpha)
+        trace_cfg = self.config.trace
+        self.trace = TraceLogger(
+            trace_cfg.output_path,
+            enabled=trace_cfg.enabled,
+            buffer_size=trace_cfg.buffer_size,
+            flush_batch_size=trace_cfg.flush_batch_size,
+            flush_interval_s=trace_cfg.flush_interval_s,
+            when_full=trace_cfg.when_full,
+            max_bytes=trace_cfg.max_bytes,
+            rotate_interval_s=trace_cfg.rotate_interval_s,
+            compress=trace_cfg.compress,
+            backup_count=trace_cfg.backup_count,
+            format=trace_cfg.format,
+        )
+        metrics_cfg = self.config.metrics
+        self.metrics = Metrics(
+            enabled=metrics_cfg.enabled,
+            slow_request_ms=metrics_cfg.slow_request_ms,
+            profile_sample_rate=metrics_cfg.profile_sample_rate,
+            profile_dir=metrics_cfg.profile_dir,
+        )
+        limits = self.config.limits
+        self.limits = (
+            SharedLimits(
+                limits.path,
+                build_limits(self.config),
+                window_s=limits.window_s,
+                window_buckets=limits.window_buckets,
+                slots=limits.slots,
+            )
+            if limits.enabled
+            else None
+        )
+        self.cache = self._build_cache()
+        near = self.config.cache.near_duplicate
+        self.near_cache = NearDuplicateCache(
+            max_entries=near.max_entries,
+            num_perm=near.num_perm,
+            bands=near.bands,
+            shingle_words=near.shingle_words,
+            ttl_seconds=self.config.cache.ttl_seconds,
+        )
+        execution = self.config.execution
+        self.batcher = MicroBatcher(
+            max_size=execution.batch_max_size,
+            max_wait_ms=execution.batch_max_wait_ms,
+            latency_factor=execution.batch_latency_factor,
+        )
+        self._semaphores: dict[str, _ProviderSemaphore] = {}
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+        self._reload_lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._coalesced_calls = 0
+        self._adapter_cache: dict[str, BaseAdapter] = {}
+        self._adapter_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> RouterSnapshot:
+        return self._snapshot
+
+    @property
+    def config(self) -> RouterConfig:
+        return self._snapshot.config
+
+    @property
+    def models(self) -> dict[str, ModelSpec]:
+        return self._snapshot.models
+
+    @property
+    def columns(self) -> ModelColumns | None:
+        return self._snapshot.columns
+
+    @property
+    def policy(self) -> BasePolicy:
+        return self._snapshot.policy
+
+    @property
+    def routing_table(self) -> RoutingTable | None:
+        return self._snapshot.routing_table
+
+    def reload(self, config: RouterConfig) -> RouterSnapshot:
+        """Atomically swap in the registry, policy and routing table built from ``config``.
+
+        Requests already in flight finish on the snapshot they started with. The response
+        cache, latency estimates, metrics, trace writer and adapters are kept, so cached
+        responses whose model and policy are unchanged stay valid. Cache size limits, TTL,
+        metrics settings, rate/spend limits, batching settings and provider concurrency
+        limits apply immediately (a lowered limit as in-flight calls finish);
+        trace, cache backend and the limits file's path and layout take effect on restart.
+        """
+        with self._reload_lock:
+            snapshot = RouterSnapshot.build(config, version=self._snapshot.version + 1)
+            self.cache.resize(
+                max_entries=snapshot.config.cache.max_entries,
+                max_bytes=snapshot.config.cache.max_bytes,
+                ttl_seconds=snapshot.config.cache.ttl_seconds,
+            )
+            self.near_cache.resize(
+                max_entries=snapshot.config.cache.near_duplicate.max_entries,
+                ttl_seconds=snapshot.config.cache.ttl_seconds,
+            )
+            metrics = snapshot.config.metrics
+            self.metrics.enabled = metrics.enabled
+            self.metrics.slow_request_ms = metrics.slow_request_ms
+            self.metrics.profile_sample_rate = metrics.profile_sample_rate
+            self.metrics.profile_dir = metrics.profile_dir
+            if self.limits is not None:
+                self.limits.limits = build_limits(snapshot.config)
+            execution = snapshot.config.execution
+            self.batcher.max_size = execution.batch_max_size
+            self.batcher.max_wait_ms = execution.batch_max_wait_ms
+            self.batcher.latency_factor = execution.batch_latency_factor
+            # Provider semaphores pick up changed limits on their next use (see _semaphore).
+            self._snapshot = snapshot
+        return snapshot
+
+    def _build_cache(self) -> ResponseCache:
+        cfg = self.config.cache
+        backend = None
+        if self.config.enable_cache and cfg.backend == "sqlite":
+            backend = SQLiteCacheBackend(cfg.path)
+        elif cfg.backend not in ("memory", "sqlite"):
+            raise ValueError(f"Unknown cache backend: {cfg.backend}")
+        return ResponseCache(
+            max_entries=cfg.max_entries,
+            max_bytes=cfg.max_bytes,
+            ttl_seconds=cfg.ttl_seconds,
+            backend=backend,
+        )
+
+    def close(self) -> None:
+        """Flush buffered traces and release cache/trace file handles and pooled connections."""
+        self.trace.close()
+        self.cache.close()
+        if self.limits is not None:
+            self.limits.close()
+        with self._adapter_lock:
+            for adapter in self._adapter_cache.values():
+                adapter.close()
+            self._adapter_cache.clear()
+
+    @property
+    def cache_stats(self) -> dict[str, int]:
+        return asdict(self.cache.stats)
+
+    @property
+    def near_duplicate_stats(self) -> dict[str, int]:
+        """Near-duplicate tier hits/misses, plus verified hits and how many were false."""
+        return asdict(self.near_cache.stats)
+
+    @property
+    def batch_stats(self) -> dict:
+        """Micro-batches dispatched, prompts in them and each model's current batch size."""
+        return self.batcher.stats
+
+    @property
+    def limit_stats(self) -> dict[str, dict[str, float]]:
+        """Shared rate-limit and spend state per limited key (empty when disabled)."""
+        return {} if self.limits is None else self.limits.usage()
+
+    @property
+    def coalesce_stats(self) -> dict[str, int]:
+        """Calls that waited on an identical in-flight call instead of hitting the adapter."""
+        with self._inflight_lock:
+            return {"coalesced": self._coalesced_calls, "in_flight": len(self._inflight)}
 
     def _adapter(self, provider: str) -> BaseAdapter:
+        """The override passed in ``adapters``, else one shared instance per provider so
+        pooled connections are reused across requests."""
+        if provider in self.adapters:
+            return self.adapters[provider]
+        adapter = self._adapter_cache.get(provider)
+        if adapter is not None:
+            return adapter
+        with self._adapter_lock:
+            if provider not in self._adapter_cache:
+                self._adapter_cache[provider] = self._build_adapter(provider)
+            return self._adapter_cache[provider]
+
+    def _build_adapter(self, provider: str) -> BaseAdapter:
         if provider == "openai":
-            return OpenAIAdapter()
+            http = self.config.http
+            return OpenAIAdapter(
+                base_url=http.base_url,
+                pool_size=http.pool_size,
+                timeout_s=self.config.execution.timeout_s,
+                max_retries=http.max_retries,
+                backoff_s=http.retry_backoff_s,
+            )
         return MockAdapter()
 
-    def _policy(self) -> BasePolicy:
-        policy_name = self.config.policy.name.lower()
-        if policy_name == "score":
-            return ScorePolicy(
-                quality_weight=self.config.policy.quality_weight,
-                cost_weight=self.config.policy.cost_weight,
-                latency_weight=self.config.policy.latency_weight,
+    def _semaphore(self, snap: RouterSnapshot, provider: str) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they are first used on, so start fresh per loop.
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        execution = snap.config.execution
+        limit = execution.provider_concurrency.get(provider, execution.max_concurrency)
+        entry = self._semaphores.get(provider)
+        if entry is None:
+            entry = self._semaphores[provider] = _ProviderSemaphore(limit, snap.version)
+        elif snap.version > entry.version:
+            # Calls still on an older snapshot must not size it back.
+            if limit != entry.limit:
+                entry.resize(limit, snap.version)
+            entry.version = snap.version
+        return entry.semaphore
+
+    def _routing_models(self, snap: RouterSnapshot) -> ModelColumns | None:
+        """Registry view used for routing, with observed latencies swapped in when
+        ``policy.latency_source = "observed"`` and a model has enough samples.
+        ``latency_metric = "ttft"`` uses time to first streamed token instead."""
+        policy = snap.config.policy
+        if policy.latency_source == "static" or snap.columns is None:
+            return snap.columns
+        if policy.latency_source != "observed":
+            raise ValueError(f"Unknown latency source: {policy.latency_source}")
+        trackers = {"total": self.latency, "ttft": self.ttft}
+        if policy.latency_metric not in trackers:
+            raise ValueError(f"Unknown latency metric: {policy.latency_metric}")
+        tracker = trackers[policy.latency_metric]
+        specs = []
+        for model in snap.columns.models:
+            observed = tracker.estimate(
+                model.name, policy.observed_latency_stat, policy.latency_min_samples
+            )
+            specs.append(
+                model if observed is None else replace(model, expected_latency_ms=observed)
             )
-        return RulesPolicy()
+        return ModelColumns.from_specs(specs)
 
     def explain(self, prompt: str) -> RoutingDecision:
-        task_type = classify_task(prompt)
-        return self._policy().choose(
+        return self._explain(self._snapshot, prompt)
+
+    def explain_batch(self, prompts: list[str]) -> list[RoutingDecision]:
+        """Route many prompts in one policy pass over the precomputed model columns."""
+        return self._explain_batch(self._snapshot, prompts)
+
+    def _explain(self, snap: RouterSnapshot, prompt: str) -> RoutingDecision:
+        metrics = self.metrics
+        with metrics.span("classify"):
+            task_type = classify_task(prompt)
+        with metrics.span("policy"):
+            if snap.routing_table is not None:
+                decision = snap.routing_table.decide(prompt, task_type)
+                if snap.config.verify_routing_table:
+                    self._verify(snap, prompt, decision)
+            else:
+                decision = snap.policy.choose(
+                    prompt=prompt,
+                    task_type=task_type,
+                    models=self._routing_models(snap) or [],
+                    budget_cost=snap.config.budgets.max_cost_usd,
+                    budget_latency=snap.config.budgets.max_latency_ms,
+                )
+        if metrics.enabled:
+            self._count_decision(snap, prompt, decision)
+        return decision
+
+    def _count_decision(self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision) -> None:
+        budgets = snap.config.budgets
+        tokens = count_tokens(prompt)
+        for model in snap.models.values():
+            if tokens / 1000 * model.expected_cost_per_1k_tokens > budgets.max_cost_usd:
+                self.metrics.inc("budget_rejections_total", model=model.name, budget="cost")
+            if model.expected_latency_ms > budgets.max_latency_ms:
+                self.metrics.inc("budget_rejections_total", model=model.name, budget="latency")
+        if decision.rationale == getattr(snap.policy, "FALLBACK", None):
+            self.metrics.inc("fallbacks_total", model=decision.model_name)
+
+    def _explain_batch(self, snap: RouterSnapshot, prompts: list[str]) -> list[RoutingDecision]:
+        if not prompts:
+            return []
+        if snap.routing_table is not None:
+            decisions = [
+                snap.routing_table.decide(p, t)
+                for p, t in zip(prompts, classify_many(prompts), strict=True)
+            ]
+            if snap.config.verify_routing_table:
+                for prompt, decision in zip(prompts, decisions, strict=True):
+                    self._verify(snap, prompt, decision)
+            return decisions
+        models = self._routing_models(snap)
+        if models is None:
+            raise ValueError("No models available")
+        return snap.policy.choose_batch(
+            prompts=prompts,
+            task_types=classify_many(prompts),
+            models=models,
+            budget_cost=snap.config.budgets.max_cost_usd,
+            budget_latency=snap.config.budgets.max_latency_ms,
+        )
+
+    def _verify(self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision) -> None:
+        live = snap.policy.choose(
             prompt=prompt,
-            task_type=task_type,
-            models=list(self.models.values()),
-            budget_cost=self.config.budgets.max_cost_usd,
-            budget_latency=self.config.budgets.max_latency_ms,
+            task_type=decision.task_type,
+            models=snap.columns or [],
+            budget_cost=snap.config.budgets.max_cost_usd,
+            budget_latency=snap.config.budgets.max_latency_ms,
         )
+        if live != decision:
+            raise RuntimeError(f"Routing table diverged from live policy: {decision} != {live}")
 
     def run(self, prompt: str) -> dict:
-        if self.config.enable_cache and prompt in self._cache:
-            cached = {**self._cache[prompt], "cache_hit": True}
-            self.trace.log(prompt, {**cached, "cached": True})
-            return cached
+        snap = self._snapshot
+        with self.metrics.request(prompt):
+            return self._run_decided(snap, prompt, self._explain(snap, prompt))
+
+    def run_batch(self, prompts: list[str]) -> list[dict]:
+        """Route many prompts in one pass via :meth:`explain_batch`, then execute each."""
+        snap = self._snapshot
+        results = []
+        for prompt, decision in zip(prompts, self._explain_batch(snap, prompts), strict=True):
+            with self.metrics.request(prompt):
+                results.append(self._run_decided(snap, prompt, decision))
+        return results
 
-        decision = self.explain(prompt)
-        model = self.models[decision.model_name]
+    def route_stream(
+        self, prompts: Iterable[str], execute: bool = True, batch_size: int = 256
+    ) -> Iterator[dict]:
+        """Lazily route (and with ``execute``, run) prompts from any iterable.
+
+        Prompts are pulled ``batch_size`` at a time, so memory stays constant however long
+        the input is. Yields run results, or ``asdict(RoutingDecision)`` without ``execute``.
+        """
+        it = iter(prompts)
+        while batch := list(islice(it, batch_size)):
+            if execute:
+                yield from self.run_batch(batch)
+            else:
+                yield from (asdict(d) for d in self.explain_batch(batch))
+
+    def run_stream(self, prompt: str) -> ResponseStream:
+        """Route ``prompt`` and stream the response through ``BaseAdapter.stream``.
+
+        Iterate the returned :class:`ResponseStream` for text chunks as they arrive; time to
+        first token and mean inter-token latency are recorded in ``result`` and the trace.
+        A cache hit is yielded as a single chunk. Streams are not coalesced or hedged.
+        """
+        snap = self._snapshot
+        stream = ResponseStream(self._explain(snap, prompt))
+        stream.chunks = self._stream_decided(snap, prompt, stream)
+        return stream
+
+    async def arun(self, prompt: str) -> dict:
+        """Async :meth:`run`: the adapter call is bounded by the provider's concurrency
+        limit and ``execution.timeout_s``."""
+        snap = self._snapshot
+        with self.metrics.request(prompt, profile=False):
+            return await self._arun_decided(snap, prompt, self._explain(snap, prompt))
+
+    async def arun_batch(self, prompts: list[str]) -> list[dict]:
+        """Run a batch concurrently; results are returned in input order."""
+        snap = self._snapshot
+        decisions = self._explain_batch(snap, prompts)
+        return list(
+            await asyncio.gather(
+                *(self._arun_decided(snap, p, d) for p, d in zip(prompts, decisions, strict=True))
+            )
+        )
+
+    def _run_decided(self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision) -> dict:
+        key, hit = self._lookup(snap, prompt, decision)
+        if hit is not None:
+            return hit
+        flight, leader = self._join_flight(snap, key)
+        if not leader:
+            try:
+                return self._coalesced(prompt, flight.result())
+            except _LeaderGone:
+                return self._run_decided(snap, prompt, decision)
+        try:
+            decision, throttled = self._admit(snap, prompt, decision)
+            try:
+                if snap.config.execution.hedge:
+                    decision, response, hedge = self._hedged(snap, prompt, decision)
+                else:
+                    with self.metrics.span("adapter"):
+                        response = self._generate(snap, decision, prompt)
+                    hedge = None
+            except BaseException:
+                self._refund(snap, decision)
+                raise
+            result = self._record(snap, prompt, decision, response, key, _merge(throttled, hedge))
+        except BaseException as exc:
+            self._land(key, flight, exc=exc)
+            raise
+        self._land(key, flight, result)
+        return result
+
+    async def _arun_decided(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> dict:
+        key, hit = self._lookup(snap, prompt, decision)
+        if hit is not None:
+            return hit
+        flight, leader = self._join_flight(snap, key)
+        if not leader:
+            try:
+                return self._coalesced(prompt, await asyncio.wrap_future(flight))
+            except _LeaderGone:
+                return await self._arun_decided(snap, prompt, decision)
+        try:
+            decision, throttled = self._admit(snap, prompt, decision)
+            try:
+                if snap.config.execution.hedge:
+                    decision, response, hedge = await self._ahedged(snap, prompt, decision)
+                else:
+                    with self.metrics.span("adapter"):
+                        response = await self._agenerate(snap, decision, prompt)
+                    hedge = None
+            except BaseException:
+                self._refund(snap, decision)
+                raise
+            result = self._record(snap, prompt, decision, response, key, _merge(throttled, hedge))
+        except BaseException as exc:
+            self._land(key, flight, exc=exc)
+            raise
+        self._land(key, flight, result)
+        return result
+
+    def _stream_decided(
+        self, snap: RouterSnapshot, prompt: str, stream: ResponseStream
+    ) -> Iterator[str]:
+        decision = stream.decision
+        key, hit = self._lookup(snap, prompt, decision)
+        if hit is not None:
+            stream.result = hit
+            yield hit["response"]
+            return
+        decision, throttled = self._admit(snap, prompt, decision)
+        stream.decision = decision
+        model = snap.models[decision.model_name]
+        parts: list[str] = []
+        arrivals: list[float] = []
+        start = time.perf_counter()
+        try:
+            for chunk in self._adapter(model.provider).stream(prompt, model):
+                arrivals.append(time.perf_counter())
+                parts.append(chunk)
+                yield chunk
+        except BaseException:
+            # Includes GeneratorExit when the caller abandons the stream.
+            self._refund(snap, decision)
+            raise
+        end = time.perf_counter()
+        gaps = [b - a for a, b in zip(arrivals, arrivals[1:], strict=False)]
+        response = ModelResponse(
+            text="".join(parts),
+            model_name=model.name,
+            latency_ms=(end - start) * 1000,
+            estimated_cost_usd=count_tokens(prompt) / 1000 * model.expected_cost_per_1k_tokens,
+            metadata={"chunks": len(parts)},
+            ttft_ms=(arrivals[0] - start) * 1000 if arrivals else None,
+            inter_token_ms=sum(gaps) / len(gaps) * 1000 if gaps else None,
+        )
+        stream.result = self._record(snap, prompt, decision, response, key, throttled)
+
+    def _generate(
+        self, snap: RouterSnapshot, decision: RoutingDecision, prompt: str
+    ) -> ModelResponse:
+        model = snap.models[decision.model_name]
+        adapter = self._adapter(model.provider)
+        if snap.config.execution.batch and adapter.supports_batching:
+            return self.batcher.generate(adapter, prompt, model)
+        return adapter.generate(prompt, model)
+
+    async def _agenerate(
+        self,
+        snap: RouterSnapshot,
+        decision: RoutingDecision,
+        prompt: str,
+        dispatched: set[str] | None = None,
+    ) -> ModelResponse:
+        """Call the decided model; its name is added to ``dispatched`` once the call may
+        have reached the provider (past the concurrency limit, or handed to the batcher)."""
+        model = snap.models[decision.model_name]
         adapter = self._adapter(model.provider)
-        response = adapter.generate(prompt, model)
+        if snap.config.execution.batch and adapter.supports_batching:
+            if dispatched is not None:
+                dispatched.add(model.name)
+            # One concurrency slot per batch rather than per prompt.
+            return await asyncio.wait_for(
+                self.batcher.agenerate(
+                    adapter, prompt, model, self._semaphore(snap, model.provider)
+                ),
+                timeout=snap.config.execution.timeout_s,
+            )
+        async with self._semaphore(snap, model.provider):
+            if dispatched is not None:
+                dispatched.add(model.name)
+            return await asyncio.wait_for(
+                adapter.agenerate(prompt, model), timeout=snap.config.execution.timeout_s
+            )
+
+    async def _ahedged(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> tuple[RoutingDecision, ModelResponse, dict | None]:
+        """Race the primary against the next-best model once the primary is overdue.
+
+        Returns the winning decision and response plus the hedge fields for the trace
+        (``None`` when no backup was fired). The losing call is cancelled; it keeps its
+        reserved spend unless it never reached the provider (see :meth:`_settle_loser`).
+        """
+        dispatched: set[str] = set()
+        primary = asyncio.ensure_future(self._agenerate(snap, decision, prompt, dispatched))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay_s(snap, decision))
+        except BaseException:
+            # asyncio.wait does not cancel what it waits on; don't orphan the primary.
+            primary.cancel()
+            raise
+        backup_decision = None if done else self._hedge_backup(snap, prompt, decision)
+        if backup_decision is None:
+            return decision, await primary, None
+        backup = asyncio.ensure_future(self._agenerate(snap, backup_decision, prompt, dispatched))
+        pending = {primary, backup}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                ok = [task for task in done if task.exception() is None]
+                if ok or not pending:
+                    break
+        except BaseException:
+            # Cancelled mid-race; the caller returns the primary's reservation.
+            for task in pending:
+                task.cancel()
+            self._settle_loser(
+                snap, backup_decision, backup, backup_decision.model_name in dispatched
+            )
+            raise
+        for task in pending:
+            task.cancel()
+        if not ok:
+            # Both failed: the backup's reservation is returned here, the primary's by the
+            # caller when primary.result() raises.
+            self._refund(snap, backup_decision)
+            return decision, primary.result(), None
+        won_backup = primary not in ok
+        winner, loser = (backup, primary) if won_backup else (primary, backup)
+        loser_decision = decision if won_backup else backup_decision
+        self._settle_loser(snap, loser_decision, loser, loser_decision.model_name in dispatched)
+        return self._hedge_outcome(decision, backup_decision, won_backup, winner.result())
+
+    def _hedged(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> tuple[RoutingDecision, ModelResponse, dict | None]:
+        """Sync :meth:`_ahedged`. Each call gets its own thread rather than a slot in a
+        shared pool, so the hedge delay counts only the primary's running time, never time
+        queued behind other callers. A losing call cannot be interrupted; it runs to the
+        end and its spend is settled then, but its response is discarded."""
+
+        def generate(d: RoutingDecision) -> ModelResponse:
+            return self._generate(snap, d, prompt)
+
+        primary = _call_in_thread(generate, decision)
+        done, _ = wait([primary], timeout=self._hedge_delay_s(snap, decision))
+        backup_decision = None if done else self._hedge_backup(snap, prompt, decision)
+        if backup_decision is None:
+            return decision, primary.result(), None
+        backup = _call_in_thread(generate, backup_decision)
+        pending = {primary, backup}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            ok = [future for future in done if future.exception() is None]
+            if ok or not pending:
+                break
+        if not ok:
+            # Both failed: the backup's reservation is returned here, the primary's by the
+            # caller when primary.result() raises.
+            self._refund(snap, backup_decision)
+            return decision, primary.result(), None
+        won_backup = primary not in ok
+        winner, loser = (backup, primary) if won_backup else (primary, backup)
+        self._settle_loser(snap, decision if won_backup else backup_decision, loser, True)
+        return self._hedge_outcome(decision, backup_decision, won_backup, winner.result())
+
+    def _hedge_delay_s(self, snap: RouterSnapshot, decision: RoutingDecision) -> float:
+        """How long the primary may run before a backup is fired: the observed
+        ``hedge_stat`` latency once there are enough samples, else the expected latency."""
+        execution = snap.config.execution
+        observed = self.latency.estimate(
+            decision.model_name, execution.hedge_stat, execution.hedge_min_samples
+        )
+        expected = decision.expected_latency_ms if observed is None else observed
+        return expected * execution.hedge_multiplier / 1000
+
+    def _hedge_backup(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> RoutingDecision | None:
+        ranking = snap.policy.rank(
+            prompt=prompt,
+            task_type=decision.task_type,
+            models=self._routing_models(snap) or [],
+            budget_cost=snap.config.budgets.max_cost_usd,
+            budget_latency=snap.config.budgets.max_latency_ms,
+        )
+        for backup in ranking:
+            if backup.model_name == decision.model_name:
+                continue
+            if self.limits is None or self._acquire(snap, prompt, backup) is None:
+                return backup
+        return None
+
+    def _settle_loser(
+        self,
+        snap: RouterSnapshot,
+        decision: RoutingDecision,
+        call: Future | asyncio.Future,
+        dispatched: bool,
+    ) -> None:
+        """Settle a losing hedge call's reserved spend once it ends.
+
+        A call that never reached the provider gets its reservation back. Otherwise the
+        provider may bill it: a response settles to its actual cost, a call cancelled
+        after dispatch keeps the expected cost (as ``hedge_extra_cost_usd`` reports), and
+        a failed call is refunded like any other failure.
+        """
+        if not dispatched:
+            self._refund(snap, decision)
+            return
+
+        def settle(done: Future | asyncio.Future) -> None:
+            if done.cancelled():
+                return
+            if done.exception() is not None:
+                self._refund(snap, decision)
+            else:
+                self._settle(snap, decision, done.result())
 
+        call.add_done_callback(settle)
+
+    def _hedge_outcome(
+        self,
+        primary: RoutingDecision,
+        backup: RoutingDecision,
+        won_backup: bool,
+        response: ModelResponse,
+    ) -> tuple[RoutingDecision, ModelResponse, dict]:
+        winner, loser = (backup, primary) if won_backup else (primary, backup)
+        hedge = {
+            "hedged": True,
+            "hedge_primary": primary.model_name,
+            "hedge_model": backup.model_name,
+            "hedge_winner": winner.model_name,
+            "hedge_extra_cost_usd": loser.expected_cost,
+        }
+        return winner, response, hedge
+
+    def _admit(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> tuple[RoutingDecision, dict | None]:
+        """Take rate-limit and spend capacity for the decided model before calling it.
+
+        A throttled model is skipped for the policy's next-ranked one (by ``policy.rank``,
+        within the request budgets). Returns the decision to execute and, if any model
+        was skipped, ``{"throttled": [{"model", "reason"}, ...]}`` for the trace. Raises
+        :class:`BudgetExhausted` when every ranked model is throttled.
+        """
+        if self.limits is None:
+            return decision, None
+        reason = self._acquire(snap, prompt, decision)
+        if reason is None:
+            return decision, None
+        throttled = [{"model": decision.model_name, "reason": reason}]
+        ranking = snap.policy.rank(
+            prompt=prompt,
+            task_type=decision.task_type,
+            models=self._routing_models(snap) or [],
+            budget_cost=snap.config.budgets.max_cost_usd,
+            budget_latency=snap.config.budgets.max_latency_ms,
+        )
+        admitted = None
+        for candidate in ranking:
+            if candidate.model_name == decision.model_name:
+                continue
+            reason = self._acquire(snap, prompt, candidate)
+            if reason is None:
+                admitted = candidate
+                break
+            throttled.append({"model": candidate.model_name, "reason": reason})
+        for entry in throttled:
+            self.metrics.inc("throttled_total", model=entry["model"], limit=entry["reason"])
+        if admitted is None:
+            raise BudgetExhausted(
+                "Every model is throttled: "
+                + ", ".join(f"{t['model']} ({t['reason']})" for t in throttled)
+            )
+        return admitted, {"throttled": throttled}
+
+    def _acquire(self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision) -> str | None:
+        model = snap.models[decision.model_name]
+        return self.limits.acquire(
+            model.name, model.provider, count_tokens(prompt), decision.expected_cost
+        )
+
+    def _settle(
+        self, snap: RouterSnapshot, decision: RoutingDecision, response: ModelResponse
+    ) -> None:
+        """Admission reserved the expected cost; settle the spend windows to the actual."""
+        if self.limits is None or response.estimated_cost_usd == decision.expected_cost:
+            return
+        model = snap.models[decision.model_name]
+        self.limits.charge(
+            model.name, model.provider, response.estimated_cost_usd - decision.expected_cost
+        )
+
+    def _refund(self, snap: RouterSnapshot, decision: RoutingDecision) -> None:
+        """Return the spend reserved by admission for a call that produced no response
+        (it failed, was cancelled, or its stream was abandoned). The request and token
+        buckets keep their share: the provider may already have counted it."""
+        if self.limits is None:
+            return
+        model = snap.models[decision.model_name]
+        self.limits.charge(model.name, model.provider, -decision.expected_cost)
+
+    def _lookup(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> tuple[str, dict | None]:
+        key = cache_key(prompt, decision.model_name, snap.policy_fingerprint)
+        if not snap.config.enable_cache:
+            return key, None
+        with self.metrics.span("cache_lookup"):
+            cached = self.cache.get(key)
+            if cached is None:
+                near = self._lookup_near(snap, prompt, decision)
+        if cached is None:
+            if near is not None:
+                self.metrics.inc("cache_hits_total", tier="near_duplicate")
+            return key, near
+        self.metrics.inc("cache_hits_total", tier="exact")
+        hit = {**cached, "cache_hit": True}
+        self.trace.log(prompt, {**hit, "cached": True})
+        return key, hit
+
+    def _near_enabled(self, snap: RouterSnapshot, decision: RoutingDecision) -> bool:
+        near = snap.config.cache.near_duplicate
+        return snap.config.enable_cache and near.enabled and decision.task_type in near.task_types
+
+    def _lookup_near(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision
+    ) -> dict | None:
+        """Serve a near-duplicate of ``prompt`` cached for the same model and policy.
+
+        A ``verify_rate`` share of would-be hits is executed instead, and :meth:`_record`
+        compares the fresh response with the cached one to measure false hits.
+        """
+        if not self._near_enabled(snap, decision):
+            return None
+        near = snap.config.cache.near_duplicate
+        signature = self.near_cache.signature(prompt)
+        if signature is None:
+            return None
+        verify = bool(near.verify_rate) and random.random() < near.verify_rate
+        found = self.near_cache.get(
+            f"{snap.policy_fingerprint}:{decision.model_name}",
+            signature,
+            near.threshold,
+            count=not verify,
+        )
+        if found is None or verify:
+            return None
+        value, similarity, matched = found
+        hit = {
+            **value,
+            "cache_hit": True,
+            "near_duplicate": True,
+            "similarity": similarity,
+            "matched_prompt_hash": matched,
+        }
+        self.trace.log(prompt, {**hit, "cached": True})
+        return hit
+
+    def _join_flight(self, snap: RouterSnapshot, key: str) -> tuple[Future | None, bool]:
+        """Single-flight: the first caller for ``key`` leads and executes; concurrent
+        callers with the same key get the leader's future to wait on. Followers share the
+        leader's result or provider error, but retry if the leader itself is cancelled."""
+        if not snap.config.coalesce_inflight:
+            return None, True
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self._coalesced_calls += 1
+                return flight, False
+            flight = self._inflight[key] = Future()
+            return flight, True
+
+    def _land(
+        self,
+        key: str,
+        flight: Future | None,
+        result: dict | None = None,
+        exc: BaseException | None = None,
+    ) -> None:
+        if flight is None:
+            return
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if exc is not None and not isinstance(exc, Exception):
+            # The leader was cancelled or interrupted, which says nothing about the call
+            # itself: followers retry, and the first to re-join the flight leads it.
+            flight.set_exception(_LeaderGone())
+        elif exc is not None:
+            flight.set_exception(exc)
+        else:
+            flight.set_result(result)
+
+    def _coalesced(self, prompt: str, result: dict) -> dict:
+        shared = {**result, "coalesced": True}
+        self.trace.log(prompt, shared)
+        return shared
+
+    def _record(
+        self,
+        snap: RouterSnapshot,
+        prompt: str,
+        decision: RoutingDecision,
+        response: ModelResponse,
+        key: str,
+        extra: dict | None = None,
+    ) -> dict:
+        self.latency.observe(decision.model_name, response.latency_ms)
+        self._settle(snap, decision, response)
+        if response.ttft_ms is not None:
+            self.ttft.observe(decision.model_name, response.ttft_ms)
+        if response.inter_token_ms is not None:
+            self.inter_token.observe(decision.model_name, response.inter_token_ms)
         result = {
             "task_type": decision.task_type,
             "policy": decision.policy,
             "chosen_model": decision.model_name,
             "rationale": decision.rationale,
             "response": response.text,
+            "prompt_tokens": count_tokens(prompt),
             "latency_ms": response.latency_ms,
             "est_cost": response.estimated_cost_usd,
             "metadata": response.metadata,
             "cache_hit": False,
         }
-        self.trace.log(prompt, {**asdict(decision), **result})
-        if self.config.enable_cache:
-            self._cache[prompt] = result
+        if response.ttft_ms is not None:
+            result["ttft_ms"] = response.ttft_ms
+            result["inter_token_ms"] = response.inter_token_ms
+        if snap.config.enable_cache:
+            self.cache.set(key, result)
+        if self._near_enabled(snap, decision):
+            check = self._store_near(snap, prompt, decision, result)
+            if check is not None:
+                result = {**result, "near_duplicate_check": check}
+        if extra is not None:
+            result = {**result, **extra}
+        with self.metrics.span("trace"):
+            self.trace.log(prompt, {**asdict(decision), **result})
         return result
+
+    def _store_near(
+        self, snap: RouterSnapshot, prompt: str, decision: RoutingDecision, result: dict
+    ) -> dict | None:
+        """Index ``result`` in the near-duplicate tier. When verifying, first compare it
+        with the entry that would have been served; returns that diagnostic, if any."""
+        signature = self.near_cache.signature(prompt)
+        if signature is None:
+            return None
+        near = snap.config.cache.near_duplicate
+        namespace = f"{snap.policy_fingerprint}:{decision.model_name}"
+        check = None
+        if near.verify_rate:
+            found = self.near_cache.get(namespace, signature, near.threshold, count=False)
+            if found is not None:
+                value, similarity, matched = found
+                # Exact, not a MinHash estimate: responses are short, and an estimate
+                # near the threshold would flip false_hit from one call to the next.
+                response_similarity = self.near_cache.jaccard(value["response"], result["response"])
+                false_hit = response_similarity < near.threshold
+                self.near_cache.record_verification(false_hit)
+                check = {
+                    "similarity": similarity,
+                    "matched_prompt_hash": matched,
+                    "response_similarity": response_similarity,
+                    "false_hit": false_hit,
+                }
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()[:16]
+        self.near_cache.set(namespace, signature, result, prompt_hash)
+        return check
+
+
+class _LeaderGone(Exception):
+    """Set on a coalesced flight whose leader was cancelled before it finished."""
+
+
+def _call_in_thread(fn: Callable[[RoutingDecision], ModelResponse], arg: RoutingDecision) -> Future:
+    future: Future = Future()
+
+    def target() -> None:
+        try:
+            future.set_result(fn(arg))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=target, name="router-hedge", daemon=True).start()
+    return future
+
+
+def _merge(*parts: dict | None) -> dict | None:
+    merged = {k: v for part in parts if part for k, v in part.items()}
+    return merged or None
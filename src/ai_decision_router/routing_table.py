@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .classifier import TASK_TYPES
+from .models import ModelColumns, ModelSpec, RoutingDecision
+from .policies import ColumnarPolicy, prompt_tokens
+
+# Score-policy breakpoints are pairwise crossings, quadratic in the registry size; larger
+# registries route through the policy's sorted indexes instead.
+MAX_MODELS = 256
+
+
+@dataclass(frozen=True)
+class TableMismatch:
+    task_type: str
+    length_class: int
+    tokens: int
+    table_model: str
+    live_model: str
+
+
+class RoutingTable:
+    """Precompiled routing decisions for a fixed registry, policy and budget.
+
+    A columnar policy's choice depends only on the task type, the prompt's token count
+    and which of the policy's prompt-length classes it falls in. For every
+    ``(task_type, length_class)`` the table stores the token-count buckets over which the
+    choice is constant, derived from the policy's breakpoints, so routing a prompt is a
+    dict lookup plus a bisect. Decisions are still built by the policy's own
+    ``describe``, so expected cost and rationale match the live path exactly.
+    """
+
+    def __init__(
+        self,
+        policy: ColumnarPolicy,
+        models: Sequence[ModelSpec] | ModelColumns,
+        budget_cost: float,
+        budget_latency: float,
+    ) -> None:
+        self.policy = policy
+        self.ctx = policy.prepare(models, budget_cost, budget_latency)
+        self._entries: dict[tuple[str, int], tuple[list[int], list[tuple[int, str]]]] = {}
+        for task_type in TASK_TYPES:
+            bounds = self._bounds(task_type)
+            for length_class in range(len(policy.length_thresholds) + 1):
+                chars = self._representative_chars(length_class)
+                starts: list[int] = []
+                choices: list[tuple[int, str]] = []
+                for tokens in bounds:
+                    choice = policy.select(self.ctx, task_type, tokens, chars)
+                    if not choices or choices[-1] != choice:
+                        starts.append(tokens)
+                        choices.append(choice)
+                self._entries[(task_type, length_class)] = (starts, choices)
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts, _ in self._entries.values())
+
+    def decide(self, prompt: str, task_type: str) -> RoutingDecision:
+        tokens = prompt_tokens(prompt, self.ctx.max_context)
+        entry = self._entries.get((task_type, self._length_class(len(prompt))))
+        if entry is None:
+            index, branch = self.policy.select(self.ctx, task_type, tokens, len(prompt))
+        else:
+            starts, choices = entry
+            index, branch = choices[bisect_right(starts, tokens) - 1]
+        return self.policy.describe(self.ctx, index, branch, task_type, tokens)
+
+    def verify(self) -> list[TableMismatch]:
+        """Compare the table with the live policy at every token count it can serve."""
+        mismatches = []
+        names = [m.name for m in self.ctx.cols.models]
+        for (task_type, length_class), (starts, choices) in self._entries.items():
+            chars = self._representative_chars(length_class)
+            for tokens in range(self.ctx.max_context + 1):
+                table = choices[bisect_right(starts, tokens) - 1]
+                live = self.policy.select(self.ctx, task_type, tokens, chars)
+                if table != live:
+                    mismatches.append(
+                        TableMismatch(
+                            task_type, length_class, tokens, names[table[0]], names[live[0]]
+                        )
+                    )
+        return mismatches
+
+    def _bounds(self, task_type: str) -> list[int]:
+        # Every integer next to a breakpoint starts a bucket; float rounding can move
+        # where a comparison flips by at most one token either way. An empty prompt costs
+        # nothing on every model, which can tie cost comparisons, so it gets its own bucket.
+        limit = self.ctx.max_context
+        bounds = {0, min(1, limit)}
+        for point in self.policy.breakpoints(self.ctx, task_type):
+            if not math.isfinite(point) or point < -1 or point > limit + 1:
+                continue
+            base = math.floor(point)
+            bounds.update(b for b in range(base - 1, base + 3) if 0 <= b <= limit)
+        return sorted(bounds)
+
+    def _length_class(self, prompt_chars: int) -> int:
+        return bisect_right(self.policy.length_thresholds, prompt_chars)
+
+    def _representative_chars(self, length_class: int) -> int:
+        return self.policy.length_thresholds[length_class - 1] if length_class else 0
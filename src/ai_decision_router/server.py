@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import asdict
+from http import HTTPStatus
+
+from .limits import BudgetExhausted
+from .router import DecisionRouter
+
+_MAX_HEADER_LINES = 100
+
+
+class _RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class RouterServer:
+    """Minimal asyncio HTTP/1.1 JSON service around one resident :class:`DecisionRouter`.
+
+    Endpoints (request and response bodies are JSON):
+
+    - ``POST /route`` ``{"prompt": ...}``: :meth:`DecisionRouter.arun` result.
+    - ``POST /explain`` ``{"prompt": ...}``: the routing decision, without execution.
+    - ``POST /batch`` ``{"prompts": [...], "explain": false}``: ``{"results": [...]}`` in
+      input order, routed in one policy pass.
+    - ``GET /health``: status, config version and cache counters.
+    - ``GET /stats``: :meth:`Metrics.snapshot` of the router's stage timings and counters.
+    - ``GET /metrics``: the same in the Prometheus text format.
+
+    A request that every model's rate or spend limit refuses gets ``429``.
+
+    Connections are kept alive, so a client pays connection setup once. The config, the
+    response cache, the adapters (and their connection pools) and the trace writer live
+    as long as the server.
+    """
+
+    def __init__(
+        self,
+        router: DecisionRouter,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_body_bytes: int = 1024 * 1024,
+        max_batch: int = 1024,
+    ) -> None:
+        self.router = router
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self.max_batch = max_batch
+        self.requests = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> RouterServer:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 binds an ephemeral port; report the real one.
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    return
+                keep_alive = await self._respond(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        # Until the body has been read, the stream position is unknown; close on errors.
+        keep_alive = False
+        try:
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError as exc:
+                raise _RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line") from exc
+            headers = await _read_headers(reader)
+            connection = headers.get("connection", "").lower()
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError as exc:
+                raise _RequestError(HTTPStatus.BAD_REQUEST, "Bad Content-Length") from exc
+            if length > self.max_body_bytes:
+                raise _RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+            body = await reader.readexactly(length) if length else b""
+            keep_alive = connection != "close" and (
+                version == "HTTP/1.1" or connection == "keep-alive"
+            )
+            self.requests += 1
+            status, payload = HTTPStatus.OK, await self._dispatch(method, target, body)
+        except _RequestError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except BudgetExhausted as exc:
+            status, payload = HTTPStatus.TOO_MANY_REQUESTS, {"error": str(exc)}
+        except ValueError as exc:
+            # Routing rejects prompts no model can take (e.g. beyond every context window).
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:
+            # An adapter failure fails this request, not the connection or the server.
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(exc)}
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + data
+        )
+        return keep_alive
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> dict | str:
+        path = target.split("?", 1)[0].rstrip("/") or "/"
+        routes = {
+            "/route": ("POST", self._route),
+            "/explain": ("POST", self._explain),
+            "/batch": ("POST", self._batch),
+            "/health": ("GET", self._health),
+            "/stats": ("GET", self._stats),
+            "/metrics": ("GET", self._metrics),
+        }
+        if path not in routes:
+            raise _RequestError(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+        allowed, handler = routes[path]
+        if method != allowed:
+            raise _RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {allowed} for {path}")
+        if method == "GET":
+            return await handler()
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as exc:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from exc
+        if not isinstance(request, dict):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return await handler(request)
+
+    async def _route(self, request: dict) -> dict:
+        return await self.router.arun(_prompt(request))
+
+    async def _explain(self, request: dict) -> dict:
+        return asdict(self.router.explain(_prompt(request)))
+
+    async def _batch(self, request: dict) -> dict:
+        prompts = request.get("prompts")
+        if not isinstance(prompts, list) or not all(isinstance(p, str) for p in prompts):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, '"prompts" must be a list of strings')
+        if len(prompts) > self.max_batch:
+            raise _RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {self.max_batch} prompts per batch"
+            )
+        if request.get("explain"):
+            return {"results": [asdict(d) for d in self.router.explain_batch(prompts)]}
+        return {"results": await self.router.arun_batch(prompts)}
+
+    async def _health(self) -> dict:
+        return {
+            "status": "ok",
+            "config_version": self.router.snapshot.version,
+            "requests": self.requests,
+            "cache": self.router.cache_stats,
+        }
+
+    async def _stats(self) -> dict:
+        return self.router.metrics.snapshot()
+
+    async def _metrics(self) -> str:
+        return self.router.metrics.prometheus()
+
+
+def _prompt(request: dict) -> str:
+    prompt = request.get("prompt")
+    if not isinstance(prompt, str):
+        raise _RequestError(HTTPStatus.BAD_REQUEST, '"prompt" must be a string')
+    return prompt
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers = {}
+    for _ in range(_MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise _RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many header lines")
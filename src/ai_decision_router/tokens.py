@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class TokenCounter(ABC):
+    @abstractmethod
+    def count(self, text: str) -> int:
+        raise NotImplementedError
+
+
+# GPT-style pre-tokenizer: contractions, letter runs with their leading space, digit
+# groups of up to three, punctuation runs and whitespace.
+_PIECES = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+
+class ApproxBPETokenCounter(TokenCounter):
+    """Offline approximation of byte-pair-encoding token counts.
+
+    Text is split like a BPE pre-tokenizer; common-length words cost one token, longer
+    words roughly one token per six characters, and punctuation runs one token per two
+    characters. Tracks cl100k-style counts closely on English prose and code.
+    """
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for piece in _PIECES.findall(text):
+            word = piece.lstrip(" ")
+            if not word:
+                tokens += 1
+            elif word[0].isalpha():
+                tokens += 1 if len(word) <= 10 else -(-len(word) // 6)
+            elif word[0].isdigit() or word[0] == "'" or word.isspace():
+                tokens += 1
+            else:
+                tokens += -(-len(word) // 2)
+        return tokens
+
+
+class MemoizedTokenCounter(TokenCounter):
+    """LRU memo over another counter, keyed on a digest of the text so the memo does
+    not keep prompts alive."""
+
+    def __init__(self, inner: TokenCounter, max_entries: int = 4096) -> None:
+        self.inner = inner
+        self.max_entries = max_entries
+        self._memo: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+        tokens = self.inner.count(text)
+        with self._lock:
+            self._memo[key] = tokens
+            if len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return tokens
+
+
+_counter: TokenCounter = MemoizedTokenCounter(ApproxBPETokenCounter())
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text`` using the process-wide counter shared by policies and adapters."""
+    return _counter.count(text)
+
+
+def set_token_counter(counter: TokenCounter, memoize: bool = True) -> None:
+    """Install a different counter (e.g. a real tokenizer) for the whole process."""
+    global _counter
+    _counter = MemoizedTokenCounter(counter) if memoize else counter
+
+
+def get_token_counter() -> TokenCounter:
+    return _counter
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO
+
+# A file is one or more segments, each starting with MAGIC and its own string table, so a
+# writer can append to an existing file without reading it first.
+MAGIC = b"ADRT\x01\n"
+TRACE_FORMATS = ("jsonl", "binary")
+
+STR_FIELDS = ("model_name", "chosen_model", "policy", "task_type", "rationale")
+NUM_FIELDS = (
+    "expected_quality",
+    "expected_cost",
+    "expected_latency_ms",
+    "latency_ms",
+    "est_cost",
+    "ttft_ms",
+    "inter_token_ms",
+    "hedge_extra_cost_usd",
+)
+BOOL_FIELDS = ("cache_hit", "cached", "coalesced", "hedged")
+# Field name -> (kind, position, presence bit or, for booleans, the "set" flag bit).
+_SLOTS: dict[str, tuple[type, int, int]] = {
+    **{name: (str, i, 1 << i) for i, name in enumerate(STR_FIELDS)},
+    **{name: (float, i, 1 << (len(STR_FIELDS) + i)) for i, name in enumerate(NUM_FIELDS)},
+    **{name: (bool, i, 1 << (4 + i)) for i, name in enumerate(BOOL_FIELDS)},
+    "response": (bytes, 0, 0),
+}
+
+_TAG_STRING = 1
+_TAG_ROW = 2
+_MAX_STRINGS = 0xFFFF
+_STRING = struct.Struct("<BHI")
+# tag, timestamp (us), prompt hash, string ids, presence mask, numbers, booleans,
+# response length, extras length.
+_ROW = struct.Struct(f"<Bq8s{len(STR_FIELDS)}HH{len(NUM_FIELDS)}dBII")
+# Presence bits: string fields, then numeric fields, then response/hash/timestamp.
+_RESPONSE_BIT = 1 << (len(STR_FIELDS) + len(NUM_FIELDS))
+_HASH_BIT = _RESPONSE_BIT << 1
+_TS_BIT = _HASH_BIT << 1
+
+
+class BinaryTraceEncoder:
+    """Encodes trace rows as fixed-layout records.
+
+    Model, task, policy and rationale strings are interned: each distinct string is
+    written once per segment and rows refer to it by a 16-bit id. Numeric fields are
+    packed as doubles and flags as bits; the response text is length-prefixed, and any
+    other key (e.g. ``metadata``) goes into a small JSON "extras" blob, so converting
+    JSONL to binary and back preserves every row.
+    """
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+
+    def segment_header(self) -> bytes:
+        """Start a new segment; call once per opened file handle."""
+        self._ids = {}
+        return MAGIC
+
+    def encode(
+        self, ts: float | None, prompt_hash: bytes | str | None, payload: dict[str, Any]
+    ) -> bytes:
+        """One row (plus any new string definitions). ``prompt_hash`` is 8 bytes or their
+        16-character hex form."""
+        out = bytearray()
+        present = 0
+        ids = [0] * len(STR_FIELDS)
+        numbers = [0.0] * len(NUM_FIELDS)
+        flags = 0
+        extras = {}
+        intern = self._ids
+        for name, value in payload.items():
+            slot = _SLOTS.get(name)
+            kind = slot[0] if slot else None
+            if kind is str and type(value) is str:
+                sid = intern.get(value)
+                if sid is None:
+                    sid = self._intern(value, out)
+                if sid is not None:
+                    ids[slot[1]] = sid
+                    present |= slot[2]
+                    continue
+            elif kind is float and type(value) in (float, int):
+                numbers[slot[1]] = value
+                present |= slot[2]
+                continue
+            elif kind is bool and type(value) is bool:
+                flags |= slot[2] | (slot[2] >> 4 if value else 0)
+                continue
+            elif kind is bytes:
+                continue
+            extras[name] = value
+        response = payload.get("response")
+        response_bytes = b""
+        if type(response) is str:
+            response_bytes = response.encode("utf-8")
+            present |= _RESPONSE_BIT
+        elif "response" in payload:
+            extras["response"] = response
+        hash_bytes = b"\0" * 8
+        if isinstance(prompt_hash, str) and len(prompt_hash) == 16:
+            try:
+                hash_bytes, present = bytes.fromhex(prompt_hash), present | _HASH_BIT
+            except ValueError:
+                extras["prompt_hash"] = prompt_hash
+        elif isinstance(prompt_hash, bytes) and len(prompt_hash) == 8:
+            hash_bytes, present = prompt_hash, present | _HASH_BIT
+        elif prompt_hash is not None:
+            extras["prompt_hash"] = prompt_hash
+        ts_us = 0
+        if ts is not None:
+            ts_us = round(ts * 1_000_000)
+            present |= _TS_BIT
+        extras_bytes = json.dumps(extras).encode("utf-8") if extras else b""
+        out += _ROW.pack(
+            _TAG_ROW,
+            ts_us,
+            hash_bytes,
+            *ids,
+            present,
+            *numbers,
+            flags,
+            len(response_bytes),
+            len(extras_bytes),
+        )
+        out += response_bytes
+        out += extras_bytes
+        return bytes(out)
+
+    def _intern(self, value: str, out: bytearray) -> int | None:
+        """Define a new string in ``out``; ``None`` once the table is full."""
+        if len(self._ids) >= _MAX_STRINGS:
+            return None
+        sid = self._ids[value] = len(self._ids)
+        data = value.encode("utf-8")
+        out += _STRING.pack(_TAG_STRING, sid, len(data))
+        out += data
+        return sid
+
+
+def iter_binary_rows(f: BinaryIO) -> Iterator[dict[str, Any]]:
+    """Decode a binary trace stream into the same dicts the JSONL format holds."""
+    strings: list[str] = []
+    read = f.read
+    while tag := read(1):
+        if tag == MAGIC[:1]:
+            if tag + read(len(MAGIC) - 1) != MAGIC:
+                raise ValueError("Corrupt binary trace: bad segment header")
+            strings = []
+        elif tag[0] == _TAG_STRING:
+            _, sid, size = _STRING.unpack(tag + read(_STRING.size - 1))
+            if sid != len(strings):
+                raise ValueError("Corrupt binary trace: out-of-order string id")
+            strings.append(read(size).decode("utf-8"))
+        elif tag[0] == _TAG_ROW:
+            fields = _ROW.unpack(tag + read(_ROW.size - 1))
+            yield _decode_row(fields, strings, read)
+        else:
+            raise ValueError(f"Corrupt binary trace: unknown record tag {tag[0]}")
+
+
+def _decode_row(fields: tuple, strings: list[str], read) -> dict[str, Any]:
+    n_str, n_num = len(STR_FIELDS), len(NUM_FIELDS)
+    _, ts_us, hash_bytes = fields[:3]
+    ids = fields[3 : 3 + n_str]
+    present = fields[3 + n_str]
+    numbers = fields[4 + n_str : 4 + n_str + n_num]
+    flags, response_len, extras_len = fields[4 + n_str + n_num :]
+    row: dict[str, Any] = {}
+    if present & _TS_BIT:
+        ts = datetime.fromtimestamp(ts_us // 1_000_000, timezone.utc)
+        row["timestamp"] = ts.replace(microsecond=ts_us % 1_000_000).isoformat()
+    if present & _HASH_BIT:
+        row["prompt_hash"] = hash_bytes.hex()
+    for i, name in enumerate(STR_FIELDS):
+        if present & (1 << i):
+            row[name] = strings[ids[i]]
+    for i, name in enumerate(NUM_FIELDS):
+        if present & (1 << (n_str + i)):
+            row[name] = numbers[i]
+    response = read(response_len).decode("utf-8")
+    if present & _RESPONSE_BIT:
+        row["response"] = response
+    for i, name in enumerate(BOOL_FIELDS):
+        if flags & (1 << (4 + i)):
+            row[name] = bool(flags & (1 << i))
+    if extras_len:
+        row.update(json.loads(read(extras_len)))
+    return row
+
+
+def is_binary_trace(path: str | Path) -> bool:
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def iter_trace_rows(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Rows of a trace file in either format, plain or gzipped; malformed JSONL lines are
+    skipped."""
+    binary = is_binary_trace(path)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        if binary:
+            yield from iter_binary_rows(f)
+            return
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def convert_trace(input_path: str | Path, output_path: str | Path) -> int:
+    """Convert a trace file to the other format: binary to JSONL, JSONL to binary.
+
+    Returns the number of rows written.
+    """
+    rows = 0
+    if is_binary_trace(input_path):
+        with open(output_path, "w", encoding="utf-8") as out:
+            for row in iter_trace_rows(input_path):
+                out.write(json.dumps(row) + "\n")
+                rows += 1
+        return rows
+    encoder = BinaryTraceEncoder()
+    with open(output_path, "wb") as out:
+        out.write(encoder.segment_header())
+        for row in iter_trace_rows(input_path):
+            row = dict(row)
+            prompt_hash = row.pop("prompt_hash", None)
+            ts = None
+            if isinstance(row.get("timestamp"), str):
+                try:
+                    parsed = datetime.fromisoformat(row["timestamp"])
+                except ValueError:
+                    parsed = None
+                # Only UTC timestamps round-trip to the same text.
+                if parsed is not None and parsed.utcoffset() == timedelta(0):
+                    ts = parsed.timestamp()
+                    del row["timestamp"]
+            out.write(encoder.encode(ts, prompt_hash, row))
+            rows += 1
+    return rows
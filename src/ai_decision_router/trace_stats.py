@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .latency import LogHistogram
+from .trace_format import is_binary_trace, iter_trace_rows
+
+GROUP_FIELDS = {"model": "chosen_model", "task": "task_type"}
+_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class GroupStats:
+    """Aggregates for one group of trace rows.
+
+    ``requests`` counts every row; cost and latency cover only ``executed`` rows, those
+    that called an adapter rather than being served from the cache or a coalesced call.
+    """
+
+    requests: int = 0
+    executed: int = 0
+    cache_hits: int = 0
+    near_hits: int = 0
+    near_verified: int = 0
+    near_false_hits: int = 0
+    coalesced: int = 0
+    hedged: int = 0
+    throttled: int = 0
+    cost_usd: float = 0.0
+    hedge_cost_usd: float = 0.0
+    latency: LogHistogram = field(default_factory=LogHistogram)
+    ttft: LogHistogram = field(default_factory=LogHistogram)
+
+    def add(self, row: dict) -> None:
+        self.requests += 1
+        if row.get("cache_hit"):
+            self.cache_hits += 1
+            self.near_hits += bool(row.get("near_duplicate"))
+            return
+        if row.get("coalesced"):
+            self.coalesced += 1
+            return
+        self.executed += 1
+        self.cost_usd += row.get("est_cost") or 0.0
+        check = row.get("near_duplicate_check")
+        if check:
+            self.near_verified += 1
+            self.near_false_hits += bool(check.get("false_hit"))
+        if row.get("hedged"):
+            self.hedged += 1
+            self.hedge_cost_usd += row.get("hedge_extra_cost_usd") or 0.0
+        if row.get("throttled"):
+            self.throttled += 1
+        if row.get("latency_ms") is not None:
+            self.latency.add(row["latency_ms"])
+        if row.get("ttft_ms") is not None:
+            self.ttft.add(row["ttft_ms"])
+
+    def merge(self, other: GroupStats) -> None:
+        self.requests += other.requests
+        self.executed += other.executed
+        self.cache_hits += other.cache_hits
+        self.near_hits += other.near_hits
+        self.near_verified += other.near_verified
+        self.near_false_hits += other.near_false_hits
+        self.coalesced += other.coalesced
+        self.hedged += other.hedged
+        self.throttled += other.throttled
+        self.cost_usd += other.cost_usd
+        self.hedge_cost_usd += other.hedge_cost_usd
+        self.latency.merge(other.latency)
+        self.ttft.merge(other.ttft)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "executed": self.executed,
+            "cache_hit_rate": self.cache_hits / self.requests if self.requests else 0.0,
+            "near_duplicate_hits": self.near_hits,
+            "near_duplicate_false_hit_rate": (
+                self.near_false_hits / self.near_verified if self.near_verified else None
+            ),
+            "coalesced": self.coalesced,
+            "hedged": self.hedged,
+            "throttled": self.throttled,
+            "cost_usd": self.cost_usd,
+            "hedge_cost_usd": self.hedge_cost_usd,
+            "latency_ms": {f"p{q}": self.latency.quantile(q / 100) for q in (50, 95, 99)},
+            "ttft_ms": (
+                {f"p{q}": self.ttft.quantile(q / 100) for q in (50, 95, 99)}
+                if self.ttft.count
+                else None
+            ),
+        }
+
+
+@dataclass
+class TraceStats:
+    """Per-group trace aggregates in memory bounded by the number of groups."""
+
+    by: tuple[str, ...] = ("model",)
+    groups: dict[tuple[str, ...], GroupStats] = field(default_factory=dict)
+    rows: int = 0
+    malformed: int = 0
+
+    def add_line(self, line: bytes | str) -> None:
+        if not line.strip():
+            return
+        try:
+            row = json.loads(line)
+            key = tuple(str(row.get(GROUP_FIELDS[name], "?")) for name in self.by)
+        except (ValueError, AttributeError):
+            self.malformed += 1
+            return
+        self._add(key, row)
+
+    def add_row(self, row: dict) -> None:
+        self._add(tuple(str(row.get(GROUP_FIELDS[name], "?")) for name in self.by), row)
+
+    def _add(self, key: tuple[str, ...], row: dict) -> None:
+        self.rows += 1
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats()
+        group.add(row)
+
+    def merge(self, other: TraceStats) -> None:
+        self.rows += other.rows
+        self.malformed += other.malformed
+        for key, group in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(group)
+            else:
+                self.groups[key] = group
+
+    def report(self) -> dict:
+        total = GroupStats()
+        for group in self.groups.values():
+            total.merge(group)
+        return {
+            "by": list(self.by),
+            "rows": self.rows,
+            "malformed": self.malformed,
+            "total": total.summary(),
+            "groups": [
+                {**dict(zip(self.by, key, strict=True)), **self.groups[key].summary()}
+                for key in sorted(self.groups)
+            ],
+        }
+
+
+def _byte_ranges(path: Path, chunk_bytes: int) -> Iterator[tuple[str, int, int]]:
+    if path.suffix == ".gz" or is_binary_trace(path):
+        # Compressed streams and binary traces (whose rows refer back to an earlier string
+        # table) cannot be split; one worker reads the whole file.
+        yield str(path), 0, -1
+        return
+    size = path.stat().st_size
+    for start in range(0, max(size, 1), chunk_bytes):
+        yield str(path), start, min(start + chunk_bytes, size)
+
+
+def _aggregate_range(path: str, start: int, end: int, by: tuple[str, ...]) -> TraceStats:
+    """Aggregate the lines that *start* within ``[start, end)`` (``end=-1``: whole file)."""
+    stats = TraceStats(by=by)
+    if end < 0:
+        if is_binary_trace(path):
+            for row in iter_trace_rows(path):
+                stats.add_row(row)
+            return stats
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                stats.add_line(line)
+        return stats
+    with open(path, "rb") as f:
+        if start > 0:
+            # Skip the line straddling ``start``; the previous range owns it.
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            stats.add_line(line)
+            pos += len(line)
+    return stats
+
+
+def trace_stats(
+    paths: Iterable[str | Path],
+    by: Iterable[str] = ("model",),
+    workers: int = 1,
+    chunk_bytes: int = _CHUNK_BYTES,
+) -> TraceStats:
+    """Aggregate trace files (JSONL or binary, plain or ``.gz``) into :class:`TraceStats`.
+
+    Files are streamed line by line, so memory does not grow with file size. With
+    ``workers > 1``, plain files are split into ``chunk_bytes`` ranges aggregated in
+    separate processes and merged.
+    """
+    by = tuple(by)
+    unknown = [name for name in by if name not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown group field(s): {', '.join(unknown)}")
+    ranges = [r for p in paths for r in _byte_ranges(Path(p), chunk_bytes)]
+    stats = TraceStats(by=by)
+    if workers <= 1 or len(ranges) <= 1:
+        for path, start, end in ranges:
+            stats.merge(_aggregate_range(path, start, end, by))
+        return stats
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges), os.cpu_count() or 1)) as pool:
+        futures = [
+            pool.submit(_aggregate_range, path, start, end, by) for path, start, end in ranges
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
@@ -1,26 +1,271 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import gzip
 import hashlib
 import json
+import shutil
+import threading
+import time
+import weakref
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, TextIO
+
+from .trace_format import TRACE_FORMATS, BinaryTraceEncoder
+
+WHEN_FULL_POLICIES = ("drop", "block")
 
 
 class TraceLogger:
-    def __init__(self, output_path: str, enabled: bool = True) -> None:
+    """JSONL trace sink.
+
+    With ``buffer_size=0`` every row is written before :meth:`log` returns. Otherwise rows
+    are queued in a bounded in-memory buffer and written by a background thread in
+    batches of ``flush_batch_size`` rows or every ``flush_interval_s`` seconds, whichever
+    comes first; timestamp formatting and prompt hashing happen on that thread too. When
+    the buffer is full, ``when_full="drop"`` discards the row (counted in ``dropped``)
+    and ``"block"`` waits for the flusher to make room. Pending rows are flushed on
+    :meth:`close` and at interpreter exit; rows logged after :meth:`close` are dropped.
+
+    The file is rotated once it reaches ``max_bytes`` or is ``rotate_interval_s`` old
+    (0 disables either): it is renamed to ``<stem>.<UTC timestamp><suffix>``, gzipped in
+    the background with ``compress=True``, and only the newest ``backup_count`` rotated
+    files are kept (0 keeps all). See :func:`rotated_files`.
+
+    ``format="binary"`` writes struct-packed records with interned strings instead of
+    JSONL (see :mod:`ai_decision_router.trace_format`).
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        enabled: bool = True,
+        buffer_size: int = 0,
+        flush_batch_size: int = 256,
+        flush_interval_s: float = 1.0,
+        when_full: str = "block",
+        max_bytes: int = 0,
+        rotate_interval_s: float = 0.0,
+        compress: bool = False,
+        backup_count: int = 0,
+        format: str = "jsonl",
+    ) -> None:
+        if when_full not in WHEN_FULL_POLICIES:
+            raise ValueError(f"Unknown when_full policy: {when_full}")
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format: {format}")
         self.output_path = Path(output_path)
         self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.flush_batch_size = max(1, flush_batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.when_full = when_full
+        self.max_bytes = max_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self.compress = compress
+        self.backup_count = backup_count
+        self.format = format
+        self._encoder = BinaryTraceEncoder() if format == "binary" else None
+        self.dropped = 0
+        self._opened_at = 0.0
+        self._compressors: list[threading.Thread] = []
+        self._buffer: deque[tuple[float, str, dict[str, Any]]] = deque()
+        self._cond = threading.Condition()
+        self._file: TextIO | BinaryIO | None = None
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        # Batches the flusher has taken from the buffer but not yet written.
+        self._writing = 0
+        self._closed = False
+        # Set once close() has closed the file; later writes are dropped, never reopen it.
+        self._shut = False
+        # A weak reference, so the exit hook does not keep unused loggers (and their
+        # buffers and file handles) alive; close() removes the hook.
+        self._at_exit = functools.partial(_close_at_exit, weakref.ref(self))
         if self.enabled:
             self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            atexit.register(self._at_exit)
 
     def log(self, prompt: str, payload: dict[str, Any]) -> None:
         if not self.enabled:
             return
-        row = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "prompt_hash": hashlib.sha256(prompt.encode()).hexdigest()[:16],
-            **payload,
-        }
-        with self.output_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(row) + "\n")
+        if self._closed:
+            self.dropped += 1
+            return
+        row = (time.time(), prompt, payload)
+        if self.buffer_size > 0:
+            with self._cond:
+                if self._thread is None and not self._closed:
+                    self._start()
+                while len(self._buffer) >= self.buffer_size and not self._closed:
+                    if self.when_full == "drop":
+                        self.dropped += 1
+                        return
+                    self._cond.wait()
+                if not self._closed:
+                    self._buffer.append(row)
+                    if len(self._buffer) >= self.flush_batch_size:
+                        self._cond.notify_all()
+                    return
+        self._write([row])
+
+    def flush(self) -> None:
+        """Write everything buffered so far before returning."""
+        with self._cond:
+            # A batch the flusher already took is not in the buffer any more; wait for it,
+            # which also keeps it ahead of the rows written here.
+            while self._writing:
+                self._cond.wait()
+            pending = list(self._buffer)
+            self._buffer.clear()
+            self._cond.notify_all()
+        if pending:
+            self._write(pending)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        atexit.unregister(self._at_exit)
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._write_lock:
+            self._shut = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            compressors, self._compressors = self._compressors, []
+        for thread in compressors:
+            thread.join()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="trace-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.flush_batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval_s)
+                batch = list(self._buffer)
+                self._buffer.clear()
+                if batch:
+                    self._writing += 1
+                self._cond.notify_all()
+                closed = self._closed
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    with self._cond:
+                        self._writing -= 1
+                        self._cond.notify_all()
+            if closed:
+                return
+
+    def _write(self, rows: list[tuple[float, str, dict[str, Any]]]) -> None:
+        if self._encoder is not None:
+            self._write_binary(rows)
+            return
+        lines = []
+        for ts, prompt, payload in rows:
+            row = {
+                "timestamp": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
+                "prompt_hash": hashlib.sha256(prompt.encode()).hexdigest()[:16],
+                **payload,
+            }
+            lines.append(json.dumps(row) + "\n")
+        with self._write_lock:
+            if self._shut:
+                self.dropped += len(rows)
+                return
+            if self._file is None:
+                self._file = self.output_path.open("a", encoding="utf-8")
+                self._opened_at = time.time()
+            self._file.write("".join(lines))
+            self._file.flush()
+            self._maybe_rotate()
+
+    def _write_binary(self, rows: list[tuple[float, str, dict[str, Any]]]) -> None:
+        encoder = self._encoder
+        with self._write_lock:
+            if self._shut:
+                self.dropped += len(rows)
+                return
+            # Encoding shares the per-segment string table, so it happens under the lock.
+            if self._file is None:
+                self._file = self.output_path.open("ab")
+                self._opened_at = time.time()
+                self._file.write(encoder.segment_header())
+            self._file.write(
+                b"".join(
+                    encoder.encode(ts, hashlib.sha256(prompt.encode()).digest()[:8], payload)
+                    for ts, prompt, payload in rows
+                )
+            )
+            self._file.flush()
+            self._maybe_rotate()
+
+    def _maybe_rotate(self) -> None:
+        if (self.max_bytes and self._file.tell() >= self.max_bytes) or (
+            self.rotate_interval_s and time.time() - self._opened_at >= self.rotate_interval_s
+        ):
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Move the current file aside; the next write opens a fresh one. Caller holds
+        ``_write_lock``."""
+        self._file.close()
+        self._file = None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = self.output_path
+        rotated = path.rename(path.with_name(f"{path.stem}.{stamp}{path.suffix}"))
+        if self.compress:
+            self._compressors = [t for t in self._compressors if t.is_alive()]
+            thread = threading.Thread(
+                target=self._compress, args=(rotated,), name="trace-compress", daemon=True
+            )
+            self._compressors.append(thread)
+            thread.start()
+        else:
+            self._prune()
+
+    def _compress(self, path: Path) -> None:
+        tmp = path.with_name(path.name + ".gz.tmp")
+        with path.open("rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        tmp.rename(path.with_name(path.name + ".gz"))
+        path.unlink()
+        self._prune()
+
+    def _prune(self) -> None:
+        if self.backup_count > 0:
+            for old in rotated_files(self.output_path)[: -self.backup_count]:
+                old.unlink(missing_ok=True)
+
+
+def _close_at_exit(ref: weakref.ref[TraceLogger]) -> None:
+    logger = ref()
+    if logger is not None:
+        logger.close()
+
+
+def rotated_files(output_path: str | Path) -> list[Path]:
+    """Rotated siblings of ``output_path`` (plain or gzipped), oldest first."""
+    path = Path(output_path)
+    if not path.parent.exists():
+        return []
+    prefix, suffix = f"{path.stem}.", path.suffix
+    return sorted(
+        p
+        for p in path.parent.iterdir()
+        if p.name.startswith(prefix)
+        and p != path
+        and (p.name.endswith(suffix) or p.name.endswith(suffix + ".gz"))
+    )
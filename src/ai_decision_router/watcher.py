@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from .config import RouterConfig
+from .router import DecisionRouter, RouterSnapshot
+
+
+class ConfigWatcher:
+    """Reloads a router when its ``router.toml`` changes.
+
+    Change detection is a single ``stat`` per poll comparing mtime, inode and size, so it
+    also notices editors that replace the file by rename. A config that fails to parse or
+    validate is reported to ``on_error`` and the router keeps its current snapshot.
+    """
+
+    def __init__(
+        self,
+        router: DecisionRouter,
+        path: str | Path,
+        interval_s: float = 1.0,
+        on_reload: Callable[[RouterSnapshot], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        self.router = router
+        self.path = Path(path)
+        self.interval_s = interval_s
+        self.on_reload = on_reload
+        self.on_error = on_error
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last check; returns whether it reloaded."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            snapshot = self.router.reload(RouterConfig.from_toml(self.path))
+        except Exception as exc:  # keep serving on the previous snapshot
+            if self.on_error is not None:
+                self.on_error(exc)
+            return False
+        if self.on_reload is not None:
+            self.on_reload(snapshot)
+        return True
+
+    def start(self) -> ConfigWatcher:
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.check()
+
+    def __enter__(self) -> ConfigWatcher:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
@@ -0,0 +1,74 @@
+import asyncio
+import socket
+
+import pytest
+
+from ai_decision_router.adapters import OpenAIAdapter
+from ai_decision_router.config import ModelConfig, default_config
+from ai_decision_router.httpclient import HTTPConnectionPool
+from ai_decision_router.mock_server import MockOpenAIServer
+from ai_decision_router.models import ModelSpec
+from ai_decision_router.router import DecisionRouter
+
+
+def test_router_reuses_one_pooled_adapter_per_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with MockOpenAIServer() as server:
+        config = default_config()
+        config.trace.enabled = False
+        config.enable_cache = False
+        config.http.base_url = server.base_url
+        config.model_registry = [ModelConfig(name="gpt-test", provider="openai")]
+        router = DecisionRouter(config)
+
+        results = [router.run(f"prompt {i}") for i in range(5)]
+        asyncio.run(router.arun_batch([f"async prompt {i}" for i in range(5)]))
+        router.close()
+
+        assert results[0]["response"].startswith("[mock-server:gpt-test]")
+        assert server.requests == 10
+        assert server.connections <= config.http.pool_size
+
+
+def test_stream_yields_the_same_text_as_generate() -> None:
+    model = ModelSpec("gpt-test", "openai", 0.9, 0.01, 500)
+    with MockOpenAIServer() as server:
+        adapter = OpenAIAdapter(api_key="test", base_url=server.base_url, pool_size=1)
+        text = adapter.generate("hello there", model).text
+        assert "".join(adapter.stream("hello there", model)) == text
+        assert adapter.generate("again", model).text
+        adapter.close()
+        assert server.connections == 1
+
+
+def test_post_is_retried_only_before_the_request_is_sent() -> None:
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        port = unused.getsockname()[1]
+    refused = HTTPConnectionPool(f"http://127.0.0.1:{port}", max_retries=2, backoff_s=0)
+    with pytest.raises(ConnectionRefusedError):
+        refused.request("POST", "/chat/completions", {})
+    assert refused.connections_opened == 3
+
+    with MockOpenAIServer(latency_ms=300) as server:
+        pool = HTTPConnectionPool(server.base_url, timeout_s=0.1, max_retries=2, backoff_s=0)
+        # The server got the request and may bill it, so a read timeout is not retried.
+        with pytest.raises(TimeoutError):
+            pool.request("POST", "/chat/completions", {"messages": []})
+        assert server.requests == 1
+        pool.close()
+
+
+def test_pool_replaces_idle_connections_the_server_closed() -> None:
+    model = ModelSpec("gpt-test", "openai", 0.9, 0.01, 500)
+    with MockOpenAIServer() as server:
+        adapter = OpenAIAdapter(
+            api_key="test", base_url=server.base_url, pool_size=1, max_retries=0
+        )
+        adapter.generate("hello", model)
+        (idle,) = list(adapter.pool._idle.queue)
+        # Reads as EOF, like a keep-alive connection the server has timed out.
+        idle.sock.shutdown(socket.SHUT_RDWR)
+        assert adapter.generate("again", model).text
+        assert server.connections == 2
+        adapter.close()
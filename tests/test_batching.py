@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_decision_router.adapters import MockAdapter
+from ai_decision_router.batching import AdaptiveBatchSize, MicroBatcher
+from ai_decision_router.config import default_config
+from ai_decision_router.models import ModelSpec
+from ai_decision_router.router import DecisionRouter
+
+
+def test_batch_size_grows_with_backlog_and_halves_over_target() -> None:
+    controller = AdaptiveBatchSize(max_size=4, target_ms=100)
+    controller.update(items=1, limit=1, latency_ms=50, backlog=0)
+    assert controller.size == 1
+    for _ in range(5):
+        controller.update(items=controller.size, limit=controller.size, latency_ms=50, backlog=3)
+    assert controller.size == 4
+    # A full batch dispatched before the size grew does not count as underfilled.
+    controller.update(items=1, limit=1, latency_ms=50, backlog=3)
+    assert controller.size == 4
+    controller.update(items=4, limit=4, latency_ms=150, backlog=3)
+    assert controller.size == 2
+    # Dispatched on timeout with less than a full batch: follow the demand.
+    controller.update(items=1, limit=2, latency_ms=50, backlog=0)
+    assert controller.size == 1
+
+
+def test_async_requests_are_batched_per_model_and_fanned_back() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.batch = True
+    config.execution.max_concurrency = 2
+    router = DecisionRouter(config, adapters={"mock": MockAdapter(time_scale=0.001)})
+    prompts = [f"Write a python function number {i}" for i in range(60)]
+    results = asyncio.run(router.arun_batch(prompts))
+    router.close()
+
+    unbatched = MockAdapter()
+    for prompt, result in zip(prompts, results, strict=True):
+        spec = router.models[result["chosen_model"]]
+        assert result["response"] == unbatched.respond(prompt, spec).text
+    sizes = [r["metadata"]["batch_size"] for r in results]
+    assert max(sizes) > 1
+    stats = router.batch_stats
+    assert stats["items"] == 60 and stats["batches"] < 60
+
+
+def test_threads_share_batches() -> None:
+    model = ModelSpec("m", "mock", 0.8, 0.002, 1000)
+    adapter = MockAdapter(extra_delay_ms={"m": 20})
+    batcher = MicroBatcher(max_size=8, max_wait_ms=20)
+    prompts = [f"prompt {i}" for i in range(64)]
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda p: batcher.generate(adapter, p, model), prompts))
+    assert [r.text for r in responses] == [adapter.respond(p, model).text for p in prompts]
+    assert batcher.stats["batches"] < 64
+    assert max(r.metadata["batch_size"] for r in responses) > 1
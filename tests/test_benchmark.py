@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from ai_decision_router.benchmark import SUITES, run_benchmark
+from ai_decision_router.benchmark import SUITES, run_benchmark, run_load_test
 from ai_decision_router.config import default_config
 from ai_decision_router.router import DecisionRouter
 
@@ -19,3 +19,35 @@ def test_benchmark_empty_suite(tmp_path: Path) -> None:
         assert report["avg_quality_proxy"] == 0.0
     finally:
         del SUITES["empty"]
+
+
+def test_load_test_reports_overhead_quantiles(tmp_path: Path) -> None:
+    prompts = tmp_path / "requests.jsonl"
+    prompts.write_text(
+        '{"prompt": "Debug this python function"}\n{"prompt": "Write a blog post"}\n',
+        encoding="utf-8",
+    )
+    config = default_config()
+    config.trace.enabled = False
+    report = run_load_test(DecisionRouter(config), str(prompts), requests=20, concurrency=4)
+
+    assert report["num_requests"] == 20
+    assert report["cache_hit_rate"] == 0.9
+    overhead = report["router_overhead_ms"]
+    assert 0 <= overhead["p50"] <= overhead["p95"] <= overhead["p99"]
+    assert report["adapter_latency_ms"]["p50"] > 0
+
+
+def test_load_test_keeps_the_adapters_batching_path(tmp_path: Path) -> None:
+    prompts = tmp_path / "requests.jsonl"
+    prompts.write_text(
+        "".join(f'{{"prompt": "Debug this python function #{i}"}}\n' for i in range(16)),
+        encoding="utf-8",
+    )
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.batch = True
+    router = DecisionRouter(config)
+    run_load_test(router, str(prompts), concurrency=4)
+    assert router.batch_stats["items"] == 16
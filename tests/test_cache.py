@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from ai_decision_router.cache import (
+    NearDuplicateCache,
+    ResponseCache,
+    SQLiteCacheBackend,
+    cache_key,
+)
+from ai_decision_router.config import default_config
+from ai_decision_router.router import DecisionRouter
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats.evictions == 1
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_cache_respects_byte_cap_and_ttl() -> None:
+    cache = ResponseCache(max_entries=100, max_bytes=40)
+    cache.set("a", {"text": "x" * 20})
+    cache.set("b", {"text": "y" * 20})
+    assert len(cache) == 1 and cache.stats.bytes <= 40
+
+    expired = ResponseCache(ttl_seconds=-1)
+    expired.set("a", {"v": 1})
+    assert expired.get("a") is None
+    assert expired.stats.expirations == 1
+
+
+def test_sqlite_backend_survives_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    key = cache_key("hello", "mock-fast", "{}")
+    first = ResponseCache(backend=SQLiteCacheBackend(path))
+    first.set(key, {"response": "hi"})
+    first.close()
+
+    second = ResponseCache(backend=SQLiteCacheBackend(path))
+    assert second.get(key) == {"response": "hi"}
+    assert second.stats.hits == 1
+
+
+def test_near_duplicate_cache_matches_above_threshold_and_evicts() -> None:
+    cache = NearDuplicateCache(max_entries=2)
+    prompt = "Write a friendly blog post about our product launch for developers in Berlin"
+    cache.set("ns", cache.signature(prompt), {"response": "berlin"}, "h1")
+
+    same = cache.signature(
+        "  write a FRIENDLY blog post about our product launch for developers in berlin!"
+    )
+    assert cache.get("ns", same, threshold=0.99)[:2] == ({"response": "berlin"}, 1.0)
+    assert cache.get("other-model", same, threshold=0.5) is None
+    assert cache.get("ns", cache.signature("Write a haiku about autumn"), threshold=0.5) is None
+
+    cache.set("ns", cache.signature("first filler prompt here"), {}, "h2")
+    cache.set("ns", cache.signature("second filler prompt here"), {}, "h3")
+    assert cache.get("ns", same, threshold=0.5) is None
+    assert len(cache) == 2
+
+
+def test_near_duplicate_signatures_do_not_depend_on_the_hash_seed() -> None:
+    code = (
+        "from ai_decision_router.cache import NearDuplicateCache\n"
+        "print(NearDuplicateCache().signature('Write a blog post about the roadmap'))"
+    )
+    signatures = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("6", "19")
+    }
+    assert len(signatures) == 1
+
+
+def test_router_serves_near_duplicates_and_reports_false_hits() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.cache.near_duplicate.enabled = True
+    router = DecisionRouter(config)
+    prompt = "Write a blog post about the quarterly roadmap for the platform team"
+
+    first = router.run(prompt)
+    hit = router.run(prompt.upper() + "!!")
+    assert hit["near_duplicate"] and hit["similarity"] == 1.0
+    assert hit["response"] == first["response"]
+    assert router.run("Debug this python function")["cache_hit"] is False
+
+    config.cache.near_duplicate.verify_rate = 1.0
+    router.reload(config)
+    checked = router.run(prompt.upper())
+    assert "near_duplicate" not in checked
+    # MockAdapter echoes the prompt token count, which the upper-cased twin shares.
+    assert checked["near_duplicate_check"]["false_hit"] is False
+    check = router.run(prompt + " ...")["near_duplicate_check"]
+    assert check["false_hit"] is True and check["response_similarity"] < 0.9
+    assert router.near_duplicate_stats["hits"] == 1
+    assert router.near_duplicate_stats["verified"] == 2
+    assert router.near_duplicate_stats["false_hits"] == 1
@@ -1,4 +1,4 @@
-from ai_decision_router.classifier import classify_task
+from ai_decision_router.classifier import classify_many, classify_task
 
 
 def test_classifier_categories() -> None:
@@ -7,3 +7,8 @@ def test_classifier_categories() -> None:
     assert classify_task("Run SQL query on table data") == "data"
     assert classify_task("Rewrite this essay with better tone") == "writing"
     assert classify_task("Hello there") == "chat/general"
+
+
+def test_classify_many_keeps_priority_order() -> None:
+    prompts = ["Write a blog post about SQL", "Why is this python slow?", "```\nx = 1\n```", ""]
+    assert classify_many(prompts) == ["data", "code", "code", "chat/general"]
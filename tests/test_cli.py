@@ -1,3 +1,6 @@
+import json
+from pathlib import Path
+
 from typer.testing import CliRunner
 
 from ai_decision_router.cli import app
@@ -15,3 +18,44 @@ def test_cli_explain_smoke() -> None:
     result = runner.invoke(app, ["explain", "Summarize this essay"])
     assert result.exit_code == 0
     assert "policy=" in result.output
+
+
+def test_cli_run_file_writes_jsonl(tmp_path: Path) -> None:
+    source = tmp_path / "in.jsonl"
+    source.write_text(
+        '{"id": "a", "prompt": "Debug python"}\n{"id": "b"}\n{"prompt": 3}\n"Write a blog"\n',
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.jsonl"
+    result = runner.invoke(
+        app, ["run-file", str(source), "--output", str(out), "--workers", "2", "--explain-only"]
+    )
+    assert result.exit_code == 0
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert rows[0]["id"] == "a" and rows[0]["task_type"] == "code"
+    assert rows[1]["task_type"] == "writing" and len(rows) == 2
+    assert "skipped=2" in result.output
+
+
+def test_cli_verify_table() -> None:
+    result = runner.invoke(app, ["verify-table"])
+    assert result.exit_code == 0
+    assert "mismatches=0" in result.output
+
+
+def test_cli_train_policy_then_route_with_it(tmp_path: Path) -> None:
+    output = tmp_path / "learned.json"
+    result = runner.invoke(app, ["train-policy", "--suite", "quick", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+    assert output.exists() and "mock-fast=" in result.output
+    config = tmp_path / "router.toml"
+    example = Path("examples/router.toml").read_text(encoding="utf-8")
+    config.write_text(
+        example.replace('name = "score"', 'name = "learned"').replace(
+            "models/learned_policy.json", output.as_posix()
+        ),
+        encoding="utf-8",
+    )
+    result = runner.invoke(app, ["explain", "Summarize this essay", "--config", str(config)])
+    assert result.exit_code == 0
+    assert "policy=learned" in result.output
@@ -0,0 +1,22 @@
+import random
+
+from ai_decision_router.latency import LatencyTracker, P2Quantile
+
+
+def test_p2_quantile_tracks_exact_quantiles() -> None:
+    rng = random.Random(7)
+    samples = [rng.expovariate(1 / 300) for _ in range(5000)]
+    for q in (0.5, 0.95):
+        sketch = P2Quantile(q)
+        for x in samples:
+            sketch.add(x)
+        exact = sorted(samples)[int(q * len(samples))]
+        assert abs(sketch.value() - exact) / exact < 0.05
+
+
+def test_tracker_waits_for_min_samples() -> None:
+    tracker = LatencyTracker(alpha=0.5)
+    tracker.observe("m", 100.0)
+    assert tracker.estimate("m", "ewma", min_samples=2) is None
+    tracker.observe("m", 300.0)
+    assert tracker.estimate("m", "ewma", min_samples=2) == 200.0
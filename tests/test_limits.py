@@ -0,0 +1,129 @@
+import asyncio
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_decision_router.adapters import MockAdapter
+from ai_decision_router.config import RateLimitConfig, default_config
+from ai_decision_router.limits import BudgetExhausted, Limit, SharedLimits
+from ai_decision_router.models import ModelResponse, ModelSpec
+from ai_decision_router.router import DecisionRouter
+
+
+def _admitted(path: str, attempts: int) -> int:
+    with SharedLimits(path, {"provider:mock": Limit(requests_per_minute=25)}) as limits:
+        return sum(limits.acquire("m", "mock", 1, 0.0, now=1000.0) is None for _ in range(attempts))
+
+
+def test_processes_share_one_bucket(tmp_path: Path) -> None:
+    path = str(tmp_path / "limits.bin")
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        admitted = pool.starmap(_admitted, [(path, 20)] * 4)
+    # A frozen clock means no refill: exactly the burst is admitted across all workers.
+    assert sum(admitted) == 25
+
+
+def test_buckets_refill_and_cost_windows_roll(tmp_path: Path) -> None:
+    limits = SharedLimits(
+        tmp_path / "limits.bin",
+        {"model:a": Limit(tokens_per_minute=600, max_cost_usd=1.0)},
+        window_s=60,
+        window_buckets=6,
+    )
+    assert limits.acquire("a", "mock", 600, 0.4, now=0.0) is None
+    assert limits.acquire("a", "mock", 1, 0.0, now=0.0) == "model:a tokens_per_minute"
+    # 10 tokens per second refill; the refused call consumed nothing.
+    assert limits.acquire("a", "mock", 100, 0.5, now=10.0) is None
+    assert limits.acquire("a", "mock", 10, 0.2, now=11.0) == "model:a max_cost_usd"
+    # Spend from t=0 leaves the window after 60s, spend from t=10 after 70s.
+    assert limits.acquire("a", "mock", 10, 0.2, now=65.0) is None
+    assert limits.usage(now=65.0)["model:a"]["window_cost_usd"] == pytest.approx(0.7)
+    assert limits.acquire("b", "mock", 10**6, 100.0, now=65.0) is None
+    limits.close()
+    with pytest.raises(ValueError, match="different slots/window layout"):
+        SharedLimits(tmp_path / "limits.bin", {}, window_s=60, window_buckets=12)
+
+
+def test_router_skips_throttled_models_and_traces_it(tmp_path: Path) -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.limits.enabled = True
+    config.limits.path = str(tmp_path / "limits.bin")
+    config.limits.models = {"mock-premium": RateLimitConfig(requests_per_minute=1)}
+    router = DecisionRouter(config)
+    first = router.run("Write a python function")
+    second = router.run("Write a python function")
+    assert first["chosen_model"] == "mock-premium" and "throttled" not in first
+    assert second["chosen_model"] != "mock-premium"
+    assert second["throttled"] == [
+        {"model": "mock-premium", "reason": "model:mock-premium requests_per_minute"}
+    ]
+    assert router.limit_stats["model:mock-premium"]["requests_left"] < 1
+
+    config = router.config.model_copy(deep=True)
+    config.limits.providers = {"mock": RateLimitConfig(requests_per_minute=1)}
+    router.reload(config)
+    assert router.run("Write a python function")["throttled"][0]["model"] == "mock-premium"
+    with pytest.raises(BudgetExhausted, match="Every model is throttled"):
+        router.run("Write a python function")
+    router.close()
+
+
+class FailingAdapter(MockAdapter):
+    def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        raise ConnectionError("provider down")
+
+    async def agenerate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        raise ConnectionError("provider down")
+
+
+def test_calls_without_a_response_give_back_their_reserved_spend(tmp_path: Path) -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.limits.enabled = True
+    config.limits.path = str(tmp_path / "limits.bin")
+    config.limits.max_cost_usd = 1.0
+    router = DecisionRouter(config, adapters={"mock": FailingAdapter()})
+    with pytest.raises(ConnectionError):
+        router.run("Write a python function")
+    with pytest.raises(ConnectionError):
+        asyncio.run(router.arun("Write a python function"))
+    assert router.limit_stats["global"]["window_cost_usd"] == pytest.approx(0.0)
+
+    stream = router.run_stream("Write a blog post about the roadmap")
+    next(iter(stream))
+    stream.chunks.close()
+    assert router.limit_stats["global"]["window_cost_usd"] == pytest.approx(0.0)
+    router.close()
+
+    config.execution.hedge = True
+    config.execution.hedge_multiplier = 0.05
+    adapter = MockAdapter(time_scale=0.01, extra_delay_ms={"mock-premium": 300})
+    router = DecisionRouter(config, adapters={"mock": adapter})
+    results = [
+        router.run("Debug this python function"),
+        asyncio.run(router.arun("Debug this python function, again")),
+    ]
+    assert all(r["hedged"] for r in results)
+    time.sleep(0.4)  # the sync loser runs to the end before its spend is settled
+    # Losers reached the provider, so the window holds winners plus the hedge overhead.
+    spent = router.limit_stats["global"]["window_cost_usd"]
+    assert spent == pytest.approx(sum(r["est_cost"] + r["hedge_extra_cost_usd"] for r in results))
+    router.close()
+
+    # The backup's provider has no free slot, so it never reaches it: refunded in full.
+    config.limits.path = str(tmp_path / "no-slot.bin")
+    for model in config.model_registry:
+        if model.name != "mock-premium":
+            model.provider = "saturated"
+    config.execution.provider_concurrency = {"saturated": 0}
+    router = DecisionRouter(config, adapters={"mock": adapter, "saturated": adapter})
+    result = asyncio.run(router.arun("Debug this python function"))
+    assert result["hedged"] and result["hedge_winner"] == "mock-premium"
+    spent = router.limit_stats["global"]["window_cost_usd"]
+    assert spent == pytest.approx(result["est_cost"])
+    router.close()
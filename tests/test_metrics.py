@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from ai_decision_router.config import default_config
+from ai_decision_router.metrics import Histogram, Metrics, SlowRequest
+from ai_decision_router.router import DecisionRouter
+
+
+def test_router_records_stage_spans_and_counters() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.metrics.enabled = True
+    router = DecisionRouter(config)
+    router.run("Write a python function")
+    router.run("Write a python function")
+    # No model can answer within 1us: every model is rejected and the cheapest is used.
+    config = router.config.model_copy(deep=True)
+    config.budgets.max_latency_ms = 0.001
+    router.reload(config)
+    router.run("Summarize this essay")
+    router.close()
+
+    snapshot = router.metrics.snapshot()
+    assert {"request", "classify", "policy", "cache_lookup", "adapter"} <= set(snapshot["stages"])
+    assert snapshot["stages"]["request"]["count"] == 3
+    assert snapshot["stages"]["adapter"]["count"] == 2
+    counters = {
+        (c["name"], c.get("tier") or c.get("model")): c["value"] for c in snapshot["counters"]
+    }
+    assert counters[("requests_total", None)] == 3
+    assert counters[("cache_hits_total", "exact")] == 1
+    assert counters[("fallbacks_total", "mock-fast")] == 1
+    assert counters[("budget_rejections_total", "mock-premium")] == 1
+
+    text = router.metrics.prometheus()
+    assert "# TYPE adr_stage_seconds histogram" in text
+    assert 'adr_stage_seconds_bucket{stage="request",le="+Inf"} 3' in text
+    assert 'adr_budget_rejections_total{budget="latency",model="mock-fast"} 1' in text
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    router = DecisionRouter(config)
+    router.run("Write a python function")
+    router.close()
+    assert router.metrics.snapshot() == {"stages": {}, "counters": []}
+    assert router.metrics.span("classify") is router.metrics.request("prompt")
+
+
+def test_slow_requests_are_profiled(tmp_path: Path) -> None:
+    slow: list[SlowRequest] = []
+    metrics = Metrics(
+        enabled=True,
+        slow_request_ms=1e-6,
+        profile_sample_rate=1.0,
+        profile_dir=str(tmp_path),
+        on_slow=slow.append,
+    )
+    with metrics.request("a prompt"):
+        sum(range(1000))
+    assert len(slow) == 1 and slow[0].profile is not None
+    assert Path(slow[0].profile_path).exists()
+
+
+def test_histogram_quantile_interpolates_within_bucket() -> None:
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.counts == [1, 2, 1, 0]
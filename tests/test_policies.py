@@ -1,4 +1,7 @@
-from ai_decision_router.models import ModelSpec
+import random
+
+from ai_decision_router.learned_policy import LearnedPolicy, train_learned_policy
+from ai_decision_router.models import ModelColumns, ModelSpec
 from ai_decision_router.policies import RulesPolicy, ScorePolicy
 
 MODELS = [
@@ -21,3 +24,93 @@ def test_score_policy_selects_viable_model() -> None:
         "General question", "chat/general", MODELS, budget_cost=0.02, budget_latency=700
     )
     assert decision.model_name == "balanced"
+
+
+def test_choose_batch_matches_per_prompt_choose() -> None:
+    prompts = ["Write python code", "Why? " * 300, "short blog", "csv " * 2000, "hi"]
+    task_types = ["code", "reasoning", "writing", "data", "chat/general"]
+    for policy in (RulesPolicy(), ScorePolicy(0.6, 0.2, 0.2)):
+        batch = policy.choose_batch(prompts, task_types, MODELS, 0.02, 700)
+        single = [
+            policy.choose(p, t, MODELS, 0.02, 700) for p, t in zip(prompts, task_types, strict=True)
+        ]
+        assert batch == single
+
+
+def test_context_window_is_a_hard_filter() -> None:
+    models = [
+        ModelSpec("small", "mock", 0.95, 0.001, 100, max_context_tokens=16),
+        ModelSpec("large", "mock", 0.7, 0.002, 200, max_context_tokens=8192),
+    ]
+    long_prompt = "python " * 100
+    assert RulesPolicy().choose("python", "code", models, 1, 2000).model_name == "small"
+    assert RulesPolicy().choose(long_prompt, "code", models, 1, 2000).model_name == "large"
+    policy = ScorePolicy(0.6, 0.2, 0.2)
+    assert policy.choose(long_prompt, "code", models, 0, 0).model_name == "large"
+
+
+def test_learned_policy_uses_prompt_dependent_latency() -> None:
+    # "fast" is quick on short prompts but slows down sharply with prompt size.
+    rows = [
+        {
+            "chosen_model": name,
+            "task_type": "chat/general",
+            "prompt_tokens": tokens,
+            "latency_ms": latency(tokens),
+        }
+        for tokens in (5, 50, 200, 800, 1500)
+        for name, latency in (("fast", lambda t: 100 + 2 * t), ("balanced", lambda t: 500.0))
+    ]
+    model = train_learned_policy(rows, MODELS, ridge=0.01)
+    assert model["models"]["fast"]["samples"] == 5 and "premium" not in model["models"]
+    policy = LearnedPolicy(model, quality_weight=0.2, cost_weight=0.0, latency_weight=1.0)
+    short = policy.choose("hi there", "chat/general", MODELS, 1, 5000)
+    long = policy.choose("word " * 1000, "chat/general", MODELS, 1, 5000)
+    assert short.model_name == "fast" and long.model_name == "balanced"
+    assert "predicted quality" in long.rationale
+    assert policy.rank("hi there", "chat/general", MODELS, 1, 5000)[0] == short
+
+
+def test_indexed_selection_matches_a_linear_scan() -> None:
+    rng = random.Random(7)
+    # Coarse values so that ties in quality, cost and latency are common.
+    specs = [
+        ModelSpec(
+            f"m{i}",
+            "mock",
+            rng.choice([0.5, 0.6, 0.7, 0.8, 0.9]),
+            rng.choice([0.0005, 0.001, 0.002, 0.003, 0.01]),
+            rng.choice([80, 150, 300, 600, 1200]),
+            max_context_tokens=rng.choice([64, 512, 4096]),
+        )
+        for i in range(300)
+    ]
+    cols = ModelColumns.from_specs(specs)
+    policies = (RulesPolicy(), ScorePolicy(0.7, 0.2, 0.1), ScorePolicy(0.5, 0.0, 0.5))
+    for _ in range(200):
+        tokens = rng.choice([1, 40, 300, 2000])
+        chars = rng.choice([100, 1000])
+        task_type = rng.choice(["code", "writing", "data", "reasoning", "chat/general"])
+        budget_cost, budget_latency = rng.choice([0.00001, 0.001, 1.0]), rng.choice([100, 700])
+        for policy in policies:
+            ctx = policy.prepare(cols, budget_cost, budget_latency)
+            costs = ctx.costs(tokens)
+            viable = [
+                i
+                for i in range(len(cols))
+                if cols.latency_ms[i] <= budget_latency
+                and costs[i] <= budget_cost
+                and ctx.fits(i, tokens)
+            ]
+            if isinstance(policy, RulesPolicy):
+                key, higher, _ = policy._rule(ctx, task_type, chars, costs)
+            else:
+                utilities = [policy._utility(ctx, i, costs[i], task_type) for i in range(len(cols))]
+                key, higher = utilities.__getitem__, True
+            expected = (max if higher else min)(viable, key=key) if viable else None
+            index, branch = policy.select(ctx, task_type, tokens, chars)
+            assert ctx.candidates(tokens) == viable
+            if expected is None:
+                assert branch == policy.FALLBACK and index == ctx.cheapest_fitting(tokens)
+            else:
+                assert index == expected
@@ -0,0 +1,16 @@
+from ai_decision_router.config import default_config
+from ai_decision_router.pool import RouterPool
+from ai_decision_router.router import DecisionRouter
+
+
+def test_pool_preserves_order_and_matches_single_process() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    prompts = [f"Debug this python function #{i}" if i % 2 else f"hello #{i}" for i in range(50)]
+
+    with RouterPool(config, workers=2, chunk_size=7) as pool:
+        results = list(pool.map(prompts))
+
+    router = DecisionRouter(config)
+    assert [r["chosen_model"] for r in results] == [router.run(p)["chosen_model"] for p in prompts]
+    assert [r["response"] for r in results] == [router.run(p)["response"] for p in prompts]
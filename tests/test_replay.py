@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_decision_router.config import default_config
+from ai_decision_router.replay import replay
+from ai_decision_router.router import DecisionRouter
+
+
+def _router() -> DecisionRouter:
+    config = default_config()
+    config.trace.enabled = False
+    return DecisionRouter(config)
+
+
+def test_replay_resumes_from_checkpoint(tmp_path: Path) -> None:
+    source = tmp_path / "requests.jsonl"
+    source.write_text(
+        "".join(json.dumps({"id": i, "prompt": f"Debug python #{i}"}) + "\n" for i in range(7)),
+        encoding="utf-8",
+    )
+    output = tmp_path / "out.jsonl"
+
+    def interrupt(progress) -> None:
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        replay(_router(), source, output, progress_every=3, batch_size=2, on_progress=interrupt)
+    with output.open("a", encoding="utf-8") as f:
+        f.write('{"id": "partial row written after the checkpoint"}\n')
+
+    progress = replay(_router(), source, output, resume=True, progress_every=3)
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert progress.records == 7
+    assert [row["id"] for row in rows] == list(range(7))
+    assert progress.offset == source.stat().st_size
+
+
+def test_replay_skips_and_counts_records_without_a_prompt(tmp_path: Path) -> None:
+    source = tmp_path / "traces.jsonl"
+    records = [{"id": 0, "prompt": "hello"}, {"id": 1}, {"id": 2, "prompt": "Debug python"}, {}]
+    source.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+
+    progress = replay(_router(), source, output, execute=False)
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [row["id"] for row in rows] == [0, 2]
+    assert (progress.records, progress.skipped) == (2, 2)
+    assert progress.offset == source.stat().st_size
+
+
+def test_route_stream_is_lazy() -> None:
+    def prompts():
+        yield "Debug python"
+        raise AssertionError("read past the first batch")
+
+    stream = _router().route_stream(prompts(), execute=False, batch_size=1)
+    assert next(stream)["task_type"] == "code"
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from ai_decision_router.adapters import MockAdapter
+from ai_decision_router.config import RouterConfig, default_config
+from ai_decision_router.models import ModelResponse, ModelSpec
+from ai_decision_router.router import DecisionRouter
+
+PROMPTS = [
+    item["prompt"]
+    for item in json.loads(Path("benchmarks/medium.json").read_text(encoding="utf-8"))
+]
+
+
+def test_explain_batch_matches_explain() -> None:
+    for policy in ("rules", "score"):
+        config = default_config()
+        config.policy.name = policy
+        config.trace.enabled = False
+        router = DecisionRouter(config)
+        assert router.explain_batch(PROMPTS) == [router.explain(p) for p in PROMPTS]
+
+
+def test_run_batch_serves_repeats_from_cache() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    results = DecisionRouter(config).run_batch(["Debug this python", "Debug this python"])
+    assert [r["cache_hit"] for r in results] == [False, True]
+
+
+def test_router_exposes_cache_counters() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    router = DecisionRouter(config)
+    router.run("Summarize this essay")
+    router.run("Summarize this essay")
+    assert router.cache_stats["hits"] == 1
+    assert router.cache_stats["misses"] == 1
+
+
+def test_arun_batch_overlaps_adapter_calls() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    router = DecisionRouter(config, adapters={"mock": MockAdapter(time_scale=0.1)})
+    prompts = [f"Debug this python function #{i}" for i in range(8)]
+
+    start = time.perf_counter()
+    results = asyncio.run(router.arun_batch(prompts))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert [r["chosen_model"] for r in results] == [router.explain(p).model_name for p in prompts]
+    simulated_ms = sum(r["latency_ms"] for r in results) * 0.1
+    assert elapsed_ms < simulated_ms
+
+
+def test_arun_enforces_timeout() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.execution.timeout_s = 0.01
+    router = DecisionRouter(config, adapters={"mock": MockAdapter()})
+    with pytest.raises(TimeoutError):
+        asyncio.run(router.arun("Debug this python function"))
+
+
+def test_observed_latency_steers_routing_away_from_degraded_model() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.policy.latency_source = "observed"
+    config.policy.latency_min_samples = 3
+    router = DecisionRouter(config)
+    prompt = "Debug this python function"
+    assert router.explain(prompt).model_name == "mock-premium"
+
+    for _ in range(3):
+        router.latency.observe("mock-premium", 5000.0)
+    decision = router.explain(prompt)
+    assert decision.model_name != "mock-premium"
+    assert router.explain_batch([prompt]) == [decision]
+
+
+class SlowCountingAdapter(MockAdapter):
+    def __init__(self) -> None:
+        super().__init__(time_scale=0.05)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def respond(self, prompt: str, model: ModelSpec, extra_ms: float = 0.0) -> ModelResponse:
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.1)
+        return super().respond(prompt, model, extra_ms)
+
+
+def test_identical_inflight_calls_are_coalesced() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    adapter = SlowCountingAdapter()
+    router = DecisionRouter(config, adapters={"mock": adapter})
+
+    results = asyncio.run(router.arun_batch(["Debug this python function"] * 10))
+    assert adapter.calls == 1
+    assert sum(bool(r.get("coalesced")) for r in results) == 9
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(router.run, ["Write a blog post"] * 6))
+    assert adapter.calls == 2
+    assert len({r["response"] for r in results}) == 1
+    assert router.coalesce_stats == {"coalesced": 14, "in_flight": 0}
+
+
+class ConcurrencyAdapter(MockAdapter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = self.peak = 0
+
+    async def agenerate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.active -= 1
+        return self.respond(prompt, model)
+
+
+def test_reload_keeps_provider_concurrency_limits_for_inflight_calls() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.provider_concurrency = {"mock": 2}
+    adapter = ConcurrencyAdapter()
+    router = DecisionRouter(config, adapters={"mock": adapter})
+
+    async def wave(tag: str, reload: RouterConfig) -> None:
+        first = [asyncio.ensure_future(router.arun(f"Debug python {tag}{i}")) for i in range(4)]
+        await asyncio.sleep(0.01)
+        router.reload(reload)
+        await asyncio.gather(*first, *(router.arun(f"Write a post {tag}{i}") for i in range(4)))
+
+    async def main() -> list[tuple[int, int]]:
+        peaks = []
+        for tag, limit in (("a", 2), ("b", 1), ("c", 3)):
+            adapter.peak = 0
+            changed = router.config.model_copy(deep=True)
+            changed.execution.provider_concurrency = {"mock": limit}
+            await wave(tag, changed)
+            during, adapter.peak = adapter.peak, 0
+            await asyncio.gather(*(router.arun(f"Summarize essay {tag}{i}") for i in range(6)))
+            peaks.append((during, adapter.peak))
+        # The absorber from the lowered limit has taken its permits and is released.
+        assert not router._semaphores["mock"]._absorbers
+        return peaks
+
+    # Unchanged: still 2. Lowered: never above the old limit, then the new one. Raised:
+    # the new limit applies at once.
+    assert asyncio.run(main()) == [(2, 2), (2, 1), (3, 3)]
+
+
+def test_coalesced_followers_retry_when_the_leader_is_cancelled() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    router = DecisionRouter(config, adapters={"mock": MockAdapter(time_scale=0.2)})
+    prompt = "Debug this python function"
+
+    async def main() -> list[dict]:
+        leader = asyncio.ensure_future(router.arun(prompt))
+        await asyncio.sleep(0.01)
+        followers = [
+            asyncio.ensure_future(router.arun(prompt)),
+            asyncio.ensure_future(asyncio.to_thread(router.run, prompt)),
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+    assert [r["chosen_model"] for r in results] == ["mock-premium"] * 2
+    # Both joined the cancelled leader's flight before retrying.
+    assert router.coalesce_stats["coalesced"] >= 2
+    assert router.coalesce_stats["in_flight"] == 0
+
+
+def test_slow_primary_is_hedged_to_next_best_model(tmp_path: Path) -> None:
+    config = default_config()
+    config.trace.output_path = str(tmp_path / "traces.jsonl")
+    config.enable_cache = False
+    config.execution.hedge = True
+    config.execution.hedge_multiplier = 0.05
+    adapter = MockAdapter(time_scale=0.01, extra_delay_ms={"mock-premium": 300})
+    router = DecisionRouter(config, adapters={"mock": adapter})
+    prompt = "Debug this python function"
+    primary, backup = router.policy.rank(
+        prompt, "code", router.columns, config.budgets.max_cost_usd, config.budgets.max_latency_ms
+    )[:2]
+    assert primary == router.explain(prompt)
+
+    for result in (asyncio.run(router.arun(prompt)), router.run(prompt)):
+        assert result["chosen_model"] == backup.model_name
+        assert result["hedge_primary"] == primary.model_name
+        assert result["hedge_winner"] == backup.model_name
+        assert result["hedge_extra_cost_usd"] == primary.expected_cost
+    router.close()
+    rows = [json.loads(line) for line in Path(config.trace.output_path).read_text().splitlines()]
+    assert [row["hedged"] for row in rows] == [True, True]
+
+
+def test_cancelled_hedged_call_cancels_its_primary() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.hedge = True
+    config.execution.provider_concurrency = {"mock": 1}
+    adapter = ConcurrencyAdapter()
+    router = DecisionRouter(config, adapters={"mock": adapter})
+
+    async def main() -> None:
+        # The hedge delay (the model's expected latency) is far longer than this timeout.
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(router.arun("Debug this python function"), 0.005)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert adapter.active == 0
+        # The provider's only slot was given back.
+        await asyncio.wait_for(router.arun("Write a blog post"), 1)
+
+    asyncio.run(main())
+
+
+class SleepingAdapter(MockAdapter):
+    def generate(self, prompt: str, model: ModelSpec) -> ModelResponse:
+        time.sleep(0.06)
+        return self.respond(prompt, model)
+
+
+def test_concurrent_sync_callers_do_not_trigger_hedges() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.enable_cache = False
+    config.execution.hedge = True
+    config.execution.hedge_multiplier = 0.2
+    config.execution.max_concurrency = 1
+    router = DecisionRouter(config, adapters={"mock": SleepingAdapter()})
+    prompts = [f"Debug this python function #{i}" for i in range(8)]
+    # Each call takes well under its hedge delay, however many callers are in flight.
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(router.run, prompts))
+    assert {r["chosen_model"] for r in results} == {"mock-premium"}
+    assert not any(r.get("hedged") for r in results)
+
+
+def test_run_stream_records_time_to_first_token(tmp_path: Path) -> None:
+    config = default_config()
+    config.trace.output_path = str(tmp_path / "traces.jsonl")
+    config.trace.buffer_size = 0
+    adapter = MockAdapter(time_scale=0.05, ttft_fraction=0.5, chunk_words=2)
+    router = DecisionRouter(config, adapters={"mock": adapter})
+
+    stream = router.run_stream("Write a short blog intro")
+    chunks = list(stream)
+    assert len(chunks) > 1
+    assert (
+        "".join(chunks)
+        == stream.result["response"]
+        == router.run("Write a short blog intro")["response"]
+    )
+    assert 0 < stream.result["ttft_ms"] < stream.result["latency_ms"]
+    row = json.loads(Path(config.trace.output_path).read_text().splitlines()[0])
+    assert row["ttft_ms"] == stream.result["ttft_ms"]
+    assert row["inter_token_ms"] > 0
+
+
+def test_observed_ttft_is_a_policy_input() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    config.policy.latency_source = "observed"
+    config.policy.latency_metric = "ttft"
+    config.policy.latency_min_samples = 1
+    router = DecisionRouter(config)
+    prompt = "Write a short blog intro"
+    assert router.explain(prompt).model_name == "mock-fast"
+
+    router.latency.observe("mock-fast", 5000)
+    assert router.explain(prompt).model_name == "mock-fast"
+    router.ttft.observe("mock-fast", 5000)
+    assert router.explain(prompt).model_name != "mock-fast"
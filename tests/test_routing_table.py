@@ -0,0 +1,29 @@
+from ai_decision_router.config import default_config
+from ai_decision_router.models import ModelSpec
+from ai_decision_router.policies import RulesPolicy, ScorePolicy
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.routing_table import RoutingTable
+
+MODELS = [
+    ModelSpec("fast", "mock", 0.6, 0.001, 100, max_context_tokens=2048),
+    ModelSpec("balanced", "mock", 0.8, 0.003, 500, max_context_tokens=4096),
+    ModelSpec("premium", "mock", 0.93, 0.009, 900, max_context_tokens=4096),
+]
+
+
+def test_routing_table_matches_live_policy_at_every_token_count() -> None:
+    for policy in (RulesPolicy(), ScorePolicy(0.6, 20.0, 0.2)):
+        table = RoutingTable(policy, MODELS, budget_cost=0.02, budget_latency=1000)
+        assert table.verify() == []
+
+
+def test_router_table_path_matches_live_path() -> None:
+    prompts = ["Debug this python", "Short blog", "Write a blog " * 60, "csv " * 3000, ""]
+    for policy in ("rules", "score"):
+        config = default_config()
+        config.trace.enabled = False
+        config.policy.name = policy
+        config.verify_routing_table = True
+        router = DecisionRouter(config)
+        assert router.routing_table is not None
+        assert router.explain_batch(prompts) == [router.explain(p) for p in prompts]
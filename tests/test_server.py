@@ -0,0 +1,60 @@
+import asyncio
+import http.client
+import json
+import subprocess
+import sys
+
+from ai_decision_router.config import default_config
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.server import RouterServer
+
+
+def test_server_routes_explains_and_batches_on_one_connection() -> None:
+    config = default_config()
+    config.trace.enabled = False
+    router = DecisionRouter(config)
+
+    def client(port: int) -> list[tuple[int, dict]]:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        responses = []
+        for method, path, body in [
+            ("POST", "/route", {"prompt": "Write a python function"}),
+            ("POST", "/route", {"prompt": "Write a python function"}),
+            ("POST", "/explain", {"prompt": "Summarize this essay"}),
+            ("POST", "/batch", {"prompts": ["Debug python", "Write a blog"], "explain": True}),
+            ("POST", "/route", {"text": "missing prompt"}),
+            ("GET", "/route", None),
+            ("GET", "/health", None),
+        ]:
+            conn.request(method, path, body=None if body is None else json.dumps(body))
+            response = conn.getresponse()
+            responses.append((response.status, json.loads(response.read())))
+        conn.close()
+        return responses
+
+    async def main() -> list[tuple[int, dict]]:
+        server = await RouterServer(router, port=0).start()
+        try:
+            return await asyncio.to_thread(client, server.port)
+        finally:
+            await server.stop()
+
+    responses = asyncio.run(main())
+    router.close()
+    (s1, first), (s2, second), (s3, explained), (s4, batch), (s5, _), (s6, _), (s7, health) = (
+        responses
+    )
+    assert (s1, s2, s3, s4, s5, s6, s7) == (200, 200, 200, 200, 400, 405, 200)
+    assert first["task_type"] == "code" and second["cache_hit"] is True
+    assert explained["task_type"] == "writing" and "response" not in explained
+    assert [r["task_type"] for r in batch["results"]] == ["code", "writing"]
+    assert health["requests"] == 7 and health["cache"]["hits"] == 1
+
+
+def test_cli_import_skips_router_and_pydantic() -> None:
+    code = (
+        "import sys, ai_decision_router.cli; "
+        "print(sorted(m for m in ('pydantic', 'ai_decision_router.router') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,28 @@
+from ai_decision_router.tokens import ApproxBPETokenCounter, MemoizedTokenCounter, TokenCounter
+
+
+class CountingCounter(TokenCounter):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def count(self, text: str) -> int:
+        self.calls += 1
+        return len(text)
+
+
+def test_approx_counter_on_prose_and_code() -> None:
+    counter = ApproxBPETokenCounter()
+    assert counter.count("") == 0
+    assert counter.count("Write a Python function to reverse a list") == 8
+    assert counter.count("def foo(x):\n    return x ** 2\n") > 8
+
+
+def test_memoized_counter_counts_each_prompt_once() -> None:
+    inner = CountingCounter()
+    counter = MemoizedTokenCounter(inner, max_entries=2)
+    assert counter.count("abc") == counter.count("abc") == 3
+    assert inner.calls == 1
+    counter.count("d")
+    counter.count("ef")
+    counter.count("abc")
+    assert inner.calls == 4
@@ -0,0 +1,38 @@
+import gzip
+import json
+from pathlib import Path
+
+from ai_decision_router.trace_stats import trace_stats
+
+
+def _write_traces(path: Path, rows: int) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(rows):
+            row = {
+                "chosen_model": ["mock-fast", "mock-premium"][i % 2],
+                "task_type": ["code", "writing", "data"][i % 3],
+                "latency_ms": float(100 + i),
+                "est_cost": 0.001,
+                "cache_hit": i % 5 == 0,
+            }
+            f.write(json.dumps(row) + "\n")
+        f.write("not json\n")
+
+
+def test_parallel_byte_ranges_match_sequential_scan(tmp_path: Path) -> None:
+    plain = tmp_path / "traces.jsonl"
+    _write_traces(plain, 500)
+    compressed = tmp_path / "traces.old.jsonl.gz"
+    with gzip.open(compressed, "wb") as f:
+        f.write(plain.read_bytes())
+
+    sequential = trace_stats([plain, compressed], by=["model", "task"], chunk_bytes=1000).report()
+    parallel = trace_stats(
+        [plain, compressed], by=["model", "task"], workers=2, chunk_bytes=1000
+    ).report()
+
+    assert parallel == sequential
+    assert sequential["rows"] == 1000
+    assert sequential["malformed"] == 2
+    assert sequential["total"]["cache_hit_rate"] == 0.2
+    assert abs(sequential["total"]["latency_ms"]["p50"] - 350) / 350 < 0.02
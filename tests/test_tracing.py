@@ -1,7 +1,13 @@
+import gc
+import gzip
 import json
+import threading
+import time
+import weakref
 from pathlib import Path
 
-from ai_decision_router.tracing import TraceLogger
+from ai_decision_router.trace_format import convert_trace
+from ai_decision_router.tracing import TraceLogger, rotated_files
 
 
 def test_trace_logger_writes_jsonl(tmp_path: Path) -> None:
@@ -14,3 +20,131 @@ def test_trace_logger_writes_jsonl(tmp_path: Path) -> None:
     assert row["policy"] == "rules"
     assert row["chosen_model"] == "mock-fast"
     assert "prompt_hash" in row
+
+
+def test_trace_logger_exit_hook_does_not_keep_it_alive(tmp_path: Path) -> None:
+    logger = TraceLogger(str(tmp_path / "trace.jsonl"), buffer_size=10)
+    logger.log("hello", {"i": 0})
+    logger.close()
+    unclosed = TraceLogger(str(tmp_path / "other.jsonl"))
+    refs = [weakref.ref(logger), weakref.ref(unclosed)]
+    del logger, unclosed
+    gc.collect()
+    assert [ref() for ref in refs] == [None, None]
+
+
+def test_buffered_trace_logger_flushes_in_batches(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    logger = TraceLogger(str(trace_file), buffer_size=100, flush_interval_s=60)
+    for i in range(10):
+        logger.log(f"prompt {i}", {"i": i})
+    logger.close()
+
+    rows = [json.loads(line) for line in trace_file.read_text(encoding="utf-8").splitlines()]
+    assert [row["i"] for row in rows] == list(range(10))
+
+
+def test_rows_logged_after_close_are_dropped(tmp_path: Path) -> None:
+    for buffer_size in (0, 10):
+        trace_file = tmp_path / f"trace-{buffer_size}.jsonl"
+        logger = TraceLogger(str(trace_file), buffer_size=buffer_size)
+        logger.log("prompt", {"i": 0})
+        logger.close()
+        logger.log("prompt", {"i": 1})
+        logger._write([(0.0, "prompt", {"i": 2})])
+        assert logger._file is None
+        assert logger.dropped == 2
+        assert len(trace_file.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_flush_waits_for_the_batch_the_flusher_is_writing(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    logger = TraceLogger(str(trace_file), buffer_size=10, flush_batch_size=1)
+    taken = threading.Event()
+    write = logger._write
+
+    def slow_write(rows: list) -> None:
+        taken.set()
+        time.sleep(0.2)
+        write(rows)
+
+    logger._write = slow_write
+    logger.log("prompt", {"i": 0})
+    assert taken.wait(5)
+    logger.flush()
+    assert len(trace_file.read_text(encoding="utf-8").splitlines()) == 1
+    logger.close()
+
+
+def test_buffered_trace_logger_drops_when_full(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    logger = TraceLogger(
+        str(trace_file), buffer_size=2, flush_batch_size=10, flush_interval_s=60, when_full="drop"
+    )
+    for i in range(5):
+        logger.log("prompt", {"i": i})
+    dropped = logger.dropped
+    logger.close()
+
+    written = len(trace_file.read_text(encoding="utf-8").splitlines())
+    assert dropped == 3
+    assert written == 2
+
+
+def test_trace_logger_rotates_and_compresses_by_size(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    logger = TraceLogger(str(trace_file), max_bytes=500, compress=True)
+    for i in range(40):
+        logger.log(f"prompt {i}", {"i": i})
+    logger.close()
+
+    rotated = rotated_files(trace_file)
+    assert len(rotated) > 1
+    assert all(path.suffix == ".gz" for path in rotated)
+    lines = [line for path in rotated for line in gzip.open(path, "rt").read().splitlines()]
+    if trace_file.exists():
+        lines += trace_file.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["i"] for line in lines] == list(range(40))
+
+    pruned = TraceLogger(str(tmp_path / "pruned.jsonl"), max_bytes=500, backup_count=2)
+    for i in range(40):
+        pruned.log(f"prompt {i}", {"i": i})
+    pruned.close()
+    assert len(rotated_files(tmp_path / "pruned.jsonl")) == 2
+
+
+def test_binary_trace_round_trips_through_jsonl(tmp_path: Path) -> None:
+    payloads = [
+        {
+            "model_name": "mock-fast",
+            "chosen_model": "mock-fast",
+            "task_type": ["code", "writing"][i % 2],
+            "rationale": "Short writing prompt prioritized low latency.",
+            "latency_ms": 120.5 + i,
+            "est_cost": 0.0001,
+            "ttft_ms": None,
+            "response": f"response {i} ✓",
+            "metadata": {"seed": i},
+            "cache_hit": i % 3 == 0,
+        }
+        for i in range(20)
+    ]
+    text_logger = TraceLogger(str(tmp_path / "trace.jsonl"))
+    binary_logger = TraceLogger(str(tmp_path / "trace.bin"), format="binary")
+    for i, payload in enumerate(payloads):
+        text_logger.log(f"prompt {i}", payload)
+        binary_logger.log(f"prompt {i}", payload)
+    text_logger.close()
+    binary_logger.close()
+
+    assert (tmp_path / "trace.bin").stat().st_size < (tmp_path / "trace.jsonl").stat().st_size
+    assert convert_trace(tmp_path / "trace.bin", tmp_path / "decoded.jsonl") == 20
+    assert convert_trace(tmp_path / "decoded.jsonl", tmp_path / "reencoded.bin") == 20
+    assert convert_trace(tmp_path / "reencoded.bin", tmp_path / "again.jsonl") == 20
+
+    def rows(name: str) -> list[dict]:
+        lines = (tmp_path / name).read_text(encoding="utf-8").splitlines()
+        return [{k: v for k, v in json.loads(line).items() if k != "timestamp"} for line in lines]
+
+    assert rows("decoded.jsonl") == rows("trace.jsonl")
+    assert (tmp_path / "again.jsonl").read_text() == (tmp_path / "decoded.jsonl").read_text()
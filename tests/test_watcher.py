@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+
+from ai_decision_router.config import RouterConfig
+from ai_decision_router.router import DecisionRouter
+from ai_decision_router.watcher import ConfigWatcher
+
+CONFIG = """
+[policy]
+name = "{policy}"
+
+[trace]
+enabled = false
+
+[[model_registry]]
+name = "mock-fast"
+expected_quality = 0.7
+expected_latency_ms = 200
+
+[[model_registry]]
+name = "mock-premium"
+expected_quality = 0.9
+expected_cost_per_1k_tokens = 0.009
+expected_latency_ms = 900
+"""
+
+
+def _write(path: Path, policy: str, mtime_ns: int) -> None:
+    path.write_text(CONFIG.format(policy=policy), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_watcher_swaps_snapshot_and_keeps_cache(tmp_path: Path) -> None:
+    path = tmp_path / "router.toml"
+    _write(path, "rules", 1_000_000_000)
+    router = DecisionRouter(RouterConfig.from_toml(path))
+    watcher = ConfigWatcher(router, path)
+    old = router.snapshot
+    router.run("Debug this python function")
+
+    assert watcher.check() is False
+    _write(path, "rules", 2_000_000_000)
+    assert watcher.check() is True
+    assert router.snapshot is not old and router.snapshot.version == 1
+    assert router.run("Debug this python function")["cache_hit"] is True
+
+    _write(path, "score", 3_000_000_000)
+    watcher.check()
+    assert router.config.policy.name == "score"
+    assert old.config.policy.name == "rules"
+
+
+def test_watcher_keeps_old_snapshot_on_invalid_config(tmp_path: Path) -> None:
+    path = tmp_path / "router.toml"
+    _write(path, "rules", 1_000_000_000)
+    router = DecisionRouter()
+    errors: list[Exception] = []
+    watcher = ConfigWatcher(router, path, on_error=errors.append)
+    path.write_text("model_registry = 3", encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+    assert watcher.check() is False
+    assert router.snapshot.version == 0
+    assert len(errors) == 1